@@ -1,73 +1,87 @@
 from __future__ import annotations
 
 import time
-from datetime import datetime
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List
 
-import cv2
-import matplotlib.pyplot as plt
-import pandas as pd
 import streamlit as st
 
+from src.backends import BACKENDS
 from src.config import (
+    CAPTURE_TRANSPORT,
     CONFIDENCE_THRESHOLD,
+    DETECTOR_ENGINE,
+    DETECTOR_ENGINES,
     DISPLAY_FPS,
-    FRAME_HEIGHT,
-    FRAME_WIDTH,
+    ENGINE_CLOCK,
+    ENGINE_CLOCKS,
     IOU_THRESHOLD,
     LANE_IDS,
     LANE_NAMES,
-    LOG_FILE,
+    MODEL_BACKEND,
     MODEL_PATH,
+    REALTIME_MODE,
+    SYNTHETIC_PROFILE,
+    SYNTHETIC_PROFILES,
     VIDEOS_DIR,
 )
-from src.detector import VehicleDetector
-from src.lane_counter import LaneCounter
-from src.signal_controller import AdaptiveSignalController
+from src.engine import DEFAULT_VIDEO_PATHS, EngineConfig, EngineSnapshot, TrafficEngine
+from src.compositor import JunctionCompositor
+from src.metrics import metrics
+from src.model_registry import model_status, preload_model
 from src.utils import (
-    append_traffic_log,
-    build_junction_canvas,
     ensure_project_directories,
     generate_dummy_traffic_videos,
-    open_video_captures,
-    read_simulation_frames,
-    release_captures,
     save_uploaded_video,
-    split_webcam_into_lanes,
 )
 
-DEFAULT_VIDEO_PATHS = {lane_id: VIDEOS_DIR / f"lane{lane_id}.mp4" for lane_id in LANE_IDS}
-FRAME_SIZE = (FRAME_WIDTH, FRAME_HEIGHT)
-
 
 def init_session_state() -> None:
     defaults = {
         "running": False,
         "needs_reinit": False,
         "config_signature": None,
-        "detector": None,
-        "lane_counter": None,
-        "controller": None,
-        "captures": {},
-        "webcam_capture": None,
         "history": [],
-        "last_tick": None,
-        "last_log_time": 0.0,
+        "compositor": None,
     }
     for key, value in defaults.items():
         if key not in st.session_state:
             st.session_state[key] = value
 
 
-def release_runtime_resources() -> None:
-    release_captures(st.session_state.get("captures", {}))
-    st.session_state.captures = {}
+@st.cache_resource
+def prepare_project() -> bool:
+    # Once per server process rather than on every rerun.
+    ensure_project_directories()
+    return True
+
+
+@st.cache_resource
+def get_engine_slot() -> dict:
+    # Process-wide, so the pipeline keeps running when the browser tab goes away.
+    return {"engine": None, "config_signature": None}
+
 
-    webcam_capture = st.session_state.get("webcam_capture")
-    if webcam_capture is not None:
-        webcam_capture.release()
-    st.session_state.webcam_capture = None
+def get_engine() -> TrafficEngine | None:
+    return get_engine_slot()["engine"]
+
+
+def attach_running_engine() -> None:
+    slot = get_engine_slot()
+    engine = slot["engine"]
+    if engine is not None and engine.is_running and not st.session_state.running:
+        st.session_state.running = True
+        st.session_state.config_signature = slot["config_signature"]
+
+
+def release_runtime_resources() -> None:
+    slot = get_engine_slot()
+    engine = slot["engine"]
+    if engine is not None:
+        engine.stop()
+        st.session_state.history = engine.history()
+    slot["engine"] = None
+    slot["config_signature"] = None
 
 
 def prepare_simulation_sources(uploaded_files: Dict[int, object]) -> Dict[int, Path]:
@@ -90,58 +104,31 @@ def initialize_runtime(
     iou_threshold: float,
     uploaded_files: Dict[int, object],
     webcam_index: int,
+    backend: str,
+    realtime: bool,
+    synthetic_profile: str = SYNTHETIC_PROFILE,
+    predecoded: bool = False,
+    clock: str = ENGINE_CLOCK,
+    detector_engine: str = DETECTOR_ENGINE,
 ) -> None:
     release_runtime_resources()
-    ensure_project_directories()
+    st.session_state.history = []
 
-    st.session_state.detector = VehicleDetector(
-        model_path=MODEL_PATH,
+    config = EngineConfig(
+        mode=mode,
+        lane_ids=list(LANE_IDS),
+        video_paths=prepare_simulation_sources(uploaded_files) if mode == "Simulation" else dict(DEFAULT_VIDEO_PATHS),
+        webcam_index=webcam_index,
+        synthetic_profile=synthetic_profile,
         confidence_threshold=confidence_threshold,
         iou_threshold=iou_threshold,
+        backend=backend,
+        realtime=realtime,
+        capture_transport="mmap" if predecoded else CAPTURE_TRANSPORT,
+        clock=clock,
+        detector_engine=detector_engine,
     )
-    st.session_state.lane_counter = LaneCounter(lane_ids=LANE_IDS, smoothing_window=4)
-    st.session_state.controller = AdaptiveSignalController(lane_ids=LANE_IDS)
-    st.session_state.controller.bootstrap({lane_id: 0 for lane_id in LANE_IDS})
-    st.session_state.history = []
-    st.session_state.last_tick = time.time()
-    st.session_state.last_log_time = 0.0
-
-    if mode == "Simulation":
-        sources = prepare_simulation_sources(uploaded_files)
-        try:
-            st.session_state.captures = open_video_captures(sources)
-        except RuntimeError as error:
-            using_default_sources = all(uploaded_files.get(lane_id) is None for lane_id in LANE_IDS)
-            if not using_default_sources:
-                raise RuntimeError(
-                    f"Could not read one or more uploaded lane videos: {error}"
-                ) from error
-
-            generate_dummy_traffic_videos(video_dir=VIDEOS_DIR, lane_ids=LANE_IDS)
-            fallback_sources = {
-                lane_id: DEFAULT_VIDEO_PATHS[lane_id] for lane_id in LANE_IDS
-            }
-            st.session_state.captures = open_video_captures(fallback_sources)
-    else:
-        webcam_capture = cv2.VideoCapture(webcam_index)
-        if not webcam_capture.isOpened():
-            raise RuntimeError(f"Unable to open webcam index {webcam_index}.")
-        st.session_state.webcam_capture = webcam_capture
-
-
-def read_input_frames(mode: str) -> Dict[int, object]:
-    if mode == "Simulation":
-        captures = st.session_state.get("captures", {})
-        return read_simulation_frames(captures, frame_size=FRAME_SIZE)
-
-    webcam_capture = st.session_state.get("webcam_capture")
-    if webcam_capture is None:
-        raise RuntimeError("Webcam capture is not initialized.")
-
-    success, frame = webcam_capture.read()
-    if not success:
-        raise RuntimeError("Could not read frame from webcam.")
-    return split_webcam_into_lanes(frame, lane_ids=LANE_IDS, frame_size=FRAME_SIZE)
+    get_engine_slot()["engine"] = TrafficEngine(config).start()
 
 
 def build_traffic_light_html(signal_state: dict) -> str:
@@ -170,8 +157,13 @@ def build_traffic_light_html(signal_state: dict) -> str:
     return f'<div class="signal-grid">{"".join(cards)}</div>'
 
 
-def render_dashboard(canvas: object, lane_counts: Dict[int, int], signal_state: dict) -> None:
-    st.image(cv2.cvtColor(canvas, cv2.COLOR_BGR2RGB), channels="RGB", use_container_width=True)
+def render_dashboard(
+    canvas: object,
+    lane_counts: Dict[int, int],
+    signal_state: dict,
+    lane_stats: Dict[int, dict] | None = None,
+) -> None:
+    st.image(canvas, channels="RGB", use_container_width=True)
 
     metrics_row = st.columns(4)
     metrics_row[0].metric("Current Green Lane", f"Lane {signal_state['current_green_lane']}")
@@ -188,28 +180,37 @@ def render_dashboard(canvas: object, lane_counts: Dict[int, int], signal_state:
 
     table_rows = []
     for lane_id in LANE_IDS:
-        table_rows.append(
-            {
-                "Lane": f"Lane {lane_id} ({LANE_NAMES[lane_id]})",
-                "Vehicle Count": lane_counts[lane_id],
-                "Waiting Time (s)": round(signal_state["waiting_times"][lane_id], 2),
-                "Priority Score": round(signal_state["priority_scores"][lane_id], 2),
-                "Signal": "GREEN" if lane_id == signal_state["current_green_lane"] else "RED",
-            }
-        )
+        row = {
+            "Lane": f"Lane {lane_id} ({LANE_NAMES[lane_id]})",
+            "Vehicle Count": lane_counts[lane_id],
+            "Waiting Time (s)": round(signal_state["waiting_times"][lane_id], 2),
+            "Priority Score": round(signal_state["priority_scores"][lane_id], 2),
+            "Signal": "GREEN" if lane_id == signal_state["current_green_lane"] else "RED",
+        }
+        stats = (lane_stats or {}).get(lane_id, {})
+        if "queue_length" in stats:
+            row["Queue Length"] = stats["queue_length"]
+            row["Arrivals/s"] = stats["arrivals_per_second"]
+            row["Departures (green)"] = stats["departures_during_green"]
+        table_rows.append(row)
+
+    import pandas as pd
 
     st.markdown("### Lane Analytics")
     st.dataframe(pd.DataFrame(table_rows), use_container_width=True, hide_index=True)
 
 
-def render_history_graph() -> None:
-    history = st.session_state.get("history", [])
+def render_history_graph(history: List[dict]) -> None:
     st.markdown("### Vehicle Count Over Time")
 
     if len(history) < 2:
         st.info("Graph will appear after a few frames are processed.")
         return
 
+    # Plotting libraries are only needed once there is something to plot.
+    import matplotlib.pyplot as plt
+    import pandas as pd
+
     data = pd.DataFrame(history)
     figure, axis = plt.subplots(figsize=(12, 4))
 
@@ -230,57 +231,58 @@ def render_history_graph() -> None:
     plt.close(figure)
 
 
-def process_one_frame(mode: str) -> None:
-    frames = read_input_frames(mode)
-    detector = st.session_state.detector
-    lane_counter = st.session_state.lane_counter
-    controller = st.session_state.controller
-
-    detected_frames = {}
-    for lane_id in LANE_IDS:
-        frame = frames[lane_id]
-        detections = detector.detect(frame)
-        lane_counter.update(lane_id, len(detections))
-        detected_frames[lane_id] = detector.draw_detections(frame.copy(), detections)
-
-    lane_counts = lane_counter.get_counts()
-
-    now = time.time()
-    delta_seconds = max(now - st.session_state.last_tick, 1e-3)
-    st.session_state.last_tick = now
-
-    controller.update_vehicle_counts(lane_counts)
-    controller.tick(delta_seconds)
-    signal_state = controller.get_state()
-
-    canvas = build_junction_canvas(
-        lane_frames=detected_frames,
-        lane_counts=lane_counts,
-        signal_state=signal_state,
-        lane_names=LANE_NAMES,
+def render_snapshot(engine: TrafficEngine, snapshot: EngineSnapshot) -> None:
+    if st.session_state.compositor is None:
+        st.session_state.compositor = JunctionCompositor(lane_ids=LANE_IDS, lane_names=LANE_NAMES)
+    with metrics.span("dashboard.compose"):
+        canvas = st.session_state.compositor.compose(
+            lane_frames=snapshot.lane_frames,
+            lane_counts=snapshot.lane_counts,
+            signal_state=snapshot.signal_state,
+        )
+    with metrics.span("dashboard.transfer"):
+        render_dashboard(
+            canvas=canvas,
+            lane_counts=snapshot.lane_counts,
+            signal_state=snapshot.signal_state,
+            lane_stats=snapshot.lane_stats,
+        )
+    skipped = ", ".join(f"L{lane_id} {ratio:.0%}" for lane_id, ratio in snapshot.skip_ratios.items())
+    if not snapshot.model_ready:
+        st.caption(f"Pipeline step {snapshot.step} | loading detection model, showing live frames")
+        return
+    realtime_text = ""
+    if snapshot.realtime_stats:
+        latency = ", ".join(
+            f"L{lane_id} {stats['mean_latency_ms']:.0f}ms" for lane_id, stats in snapshot.realtime_stats["lanes"].items()
+        )
+        dropped = sum(snapshot.realtime_stats["dropped_frames"].values())
+        realtime_text = f" | latency: {latency} | dropped: {dropped} | scale {snapshot.realtime_stats['scale']:.0%}"
+    engine_text = ""
+    if snapshot.detector_stats:
+        occupancy = ", ".join(f"L{lane_id} {ratio:.0%}" for lane_id, ratio in snapshot.detector_stats["occupancy"].items())
+        engine_text = f" | counting: {snapshot.detector_stats['engine']} | occupancy: {occupancy}"
+    st.caption(
+        f"Pipeline step {snapshot.step} at {snapshot.fps:.1f} FPS"
+        + (f" | inference skipped: {skipped}" if skipped else "")
+        + realtime_text
+        + engine_text
+        + (f" | detection cache hits: {snapshot.cache_stats['hit_rate']:.0%}" if snapshot.cache_stats else "")
     )
-    render_dashboard(canvas=canvas, lane_counts=lane_counts, signal_state=signal_state)
+    render_history_graph(engine.history())
+    if metrics.enabled:
+        render_metrics_panel()
 
-    next_step = st.session_state.history[-1]["step"] + 1 if st.session_state.history else 0
-    history_entry = {
-        "step": next_step,
-        "timestamp": datetime.now().isoformat(timespec="seconds"),
-    }
-    for lane_id in LANE_IDS:
-        history_entry[f"lane_{lane_id}"] = lane_counts[lane_id]
-    st.session_state.history.append(history_entry)
-    st.session_state.history = st.session_state.history[-500:]
-
-    if now - st.session_state.last_log_time >= 1.0:
-        append_traffic_log(
-            log_file=LOG_FILE,
-            timestamp=history_entry["timestamp"],
-            lane_counts=lane_counts,
-            signal_state=signal_state,
-        )
-        st.session_state.last_log_time = now
 
-    render_history_graph()
+def render_metrics_panel() -> None:
+    snapshot = metrics.snapshot()
+    if not snapshot["spans"]:
+        return
+    import pandas as pd
+
+    st.markdown("### Pipeline Timings")
+    rows = [{"Stage": name, **summary} for name, summary in snapshot["spans"].items()]
+    st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
 
 
 def apply_theme() -> None:
@@ -347,7 +349,8 @@ def main() -> None:
         initial_sidebar_state="expanded",
     )
     init_session_state()
-    ensure_project_directories()
+    prepare_project()
+    attach_running_engine()
     apply_theme()
 
     st.title("Smart Traffic AI")
@@ -355,7 +358,7 @@ def main() -> None:
 
     with st.sidebar:
         st.header("System Controls")
-        mode = st.radio("Input Mode", ["Simulation", "Webcam"], index=0)
+        mode = st.radio("Input Mode", ["Simulation", "Webcam", "Synthetic"], index=0)
         confidence_threshold = st.slider(
             "YOLO Confidence Threshold",
             min_value=0.1,
@@ -370,9 +373,30 @@ def main() -> None:
             value=float(IOU_THRESHOLD),
             step=0.05,
         )
+        backend = st.selectbox("Inference Backend", BACKENDS, index=BACKENDS.index(MODEL_BACKEND))
+        detector_engine = st.selectbox(
+            "Counting Engine",
+            DETECTOR_ENGINES,
+            index=DETECTOR_ENGINES.index(DETECTOR_ENGINE),
+            help="'bgsub' uses background subtraction on low-power boxes; 'auto' switches to it while YOLO is too slow.",
+        )
+        if detector_engine != "bgsub":
+            # Start loading the model while the operator is still on the sidebar.
+            preload_model(MODEL_PATH, backend)
+            st.caption(f"Model: {model_status(MODEL_PATH, backend)}")
+        metrics.enabled = st.checkbox("Collect Pipeline Timings", value=metrics.enabled)
+        realtime = st.checkbox("Real-time Mode", value=REALTIME_MODE, help="Always process the newest frame.")
+        clock = st.selectbox(
+            "Controller Clock",
+            ENGINE_CLOCKS,
+            index=ENGINE_CLOCKS.index(ENGINE_CLOCK),
+            help="'video' and 'simulated' give reproducible signal timelines and can run faster than real time.",
+        )
 
         uploaded_files: Dict[int, object] = {}
         webcam_index = 0
+        synthetic_profile = SYNTHETIC_PROFILE
+        predecoded = False
 
         if mode == "Simulation":
             st.subheader("Lane Video Sources")
@@ -385,6 +409,14 @@ def main() -> None:
             if st.button("Generate Dummy Videos", use_container_width=True):
                 generate_dummy_traffic_videos(video_dir=VIDEOS_DIR, lane_ids=LANE_IDS)
                 st.success("Dummy lane videos generated in /videos.")
+            predecoded = st.checkbox(
+                "Pre-decoded Frames",
+                value=CAPTURE_TRANSPORT == "mmap",
+                help="Decode each clip once into a memory-mapped cache shared by all sessions.",
+            )
+        elif mode == "Synthetic":
+            profiles = list(SYNTHETIC_PROFILES)
+            synthetic_profile = st.selectbox("Arrival Profile", profiles, index=profiles.index(SYNTHETIC_PROFILE))
         else:
             webcam_index = int(
                 st.number_input("Webcam Index", min_value=0, max_value=10, value=0, step=1)
@@ -411,15 +443,12 @@ def main() -> None:
             uploaded_files[lane_id].name if uploaded_files[lane_id] is not None else str(DEFAULT_VIDEO_PATHS[lane_id])
             for lane_id in LANE_IDS
         )
+    elif mode == "Synthetic":
+        source_signature = (synthetic_profile,)
     else:
         source_signature = (webcam_index,)
 
-    config_signature = (
-        mode,
-        round(confidence_threshold, 2),
-        round(iou_threshold, 2),
-        source_signature,
-    )
+    config_signature = (mode, backend, detector_engine, realtime, predecoded, clock, source_signature)
 
     if st.session_state.running and st.session_state.config_signature != config_signature:
         st.session_state.needs_reinit = True
@@ -427,7 +456,7 @@ def main() -> None:
     if not st.session_state.running:
         st.info("Press **Start System** to begin processing traffic input.")
         if st.session_state.history:
-            render_history_graph()
+            render_history_graph(st.session_state.history)
         return
 
     try:
@@ -438,11 +467,27 @@ def main() -> None:
                 iou_threshold=iou_threshold,
                 uploaded_files=uploaded_files,
                 webcam_index=webcam_index,
+                backend=backend,
+                realtime=realtime,
+                synthetic_profile=synthetic_profile,
+                predecoded=predecoded,
+                clock=clock,
+                detector_engine=detector_engine,
             )
             st.session_state.config_signature = config_signature
+            get_engine_slot()["config_signature"] = config_signature
             st.session_state.needs_reinit = False
 
-        process_one_frame(mode=mode)
+        engine = get_engine()
+        if engine is None:
+            raise RuntimeError("Traffic engine is not running.")
+        engine.set_detection_thresholds(confidence_threshold, iou_threshold)
+
+        snapshot = engine.wait_for_snapshot(timeout=5.0)
+        if engine.error is not None:
+            raise engine.error
+        if snapshot is not None:
+            render_snapshot(engine, snapshot)
         time.sleep(1.0 / DISPLAY_FPS)
         st.rerun()
     except Exception as error:
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from src.backends import BACKENDS
+from src.config import FRAME_HEIGHT, FRAME_WIDTH, LANE_IDS, MODEL_PATH, VIDEOS_DIR
+from src.detector import VehicleDetector
+from src.utils import open_video_captures, read_simulation_frames, release_captures
+
+
+def load_frames(frames_per_lane: int) -> List[np.ndarray]:
+    video_paths = {lane_id: VIDEOS_DIR / f"lane{lane_id}.mp4" for lane_id in LANE_IDS}
+    captures = open_video_captures(video_paths)
+    try:
+        frames: List[np.ndarray] = []
+        for _ in range(frames_per_lane):
+            frames.extend(read_simulation_frames(captures, frame_size=(FRAME_WIDTH, FRAME_HEIGHT)).values())
+        return frames
+    finally:
+        release_captures(captures)
+
+
+def box_iou(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    top_left = np.maximum(boxes_a[:, None, :2], boxes_b[None, :, :2])
+    bottom_right = np.minimum(boxes_a[:, None, 2:], boxes_b[None, :, 2:])
+    intersection = np.clip(bottom_right - top_left, 0, None).prod(axis=2)
+    area_a = (boxes_a[:, 2:] - boxes_a[:, :2]).prod(axis=1)
+    area_b = (boxes_b[:, 2:] - boxes_b[:, :2]).prod(axis=1)
+    return intersection / np.maximum(area_a[:, None] + area_b[None, :] - intersection, 1e-6)
+
+
+def as_boxes(detections: np.ndarray) -> np.ndarray:
+    return np.stack([detections[name] for name in ("x1", "y1", "x2", "y2")], axis=1).astype(np.float32)
+
+
+def matched_pairs(reference: np.ndarray, candidate: np.ndarray, iou_threshold: float = 0.5) -> int:
+    if len(reference) == 0 or len(candidate) == 0:
+        return 0
+    ious = box_iou(as_boxes(reference), as_boxes(candidate))
+    matches = 0
+    while ious.size and ious.max() >= iou_threshold:
+        row, column = np.unravel_index(np.argmax(ious), ious.shape)
+        ious[row, :] = -1
+        ious[:, column] = -1
+        matches += 1
+    return matches
+
+
+def run_backend(backend: str, frames: List[np.ndarray]) -> Dict[str, object]:
+    load_started = time.perf_counter()
+    detector = VehicleDetector(model_path=MODEL_PATH, backend=backend).load()
+    load_seconds = time.perf_counter() - load_started
+
+    latencies = []
+    outputs = []
+    for frame in frames:
+        started = time.perf_counter()
+        outputs.append(detector.detect(frame))
+        latencies.append((time.perf_counter() - started) * 1000.0)
+    return {"load_seconds": load_seconds, "latencies_ms": np.array(latencies), "outputs": outputs}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare inference backends on the bundled lane clips.")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--frames", type=int, default=50, help="Frames per lane.")
+    args = parser.parse_args()
+
+    frames = load_frames(args.frames)
+    reference = run_backend("torch", frames)
+
+    print(f"{len(frames)} frames from {len(LANE_IDS)} lanes, reference backend: torch")
+    print(f"{'backend':<14}{'load s':>8}{'mean ms':>10}{'p95 ms':>9}{'fps':>8}{'count MAE':>11}{'F1@0.5':>9}")
+    for backend in args.backends:
+        result = reference if backend == "torch" else run_backend(backend, frames)
+        latencies = result["latencies_ms"]
+
+        matches = reference_total = candidate_total = 0
+        count_errors = []
+        for expected, actual in zip(reference["outputs"], result["outputs"]):
+            matches += matched_pairs(expected, actual)
+            reference_total += len(expected)
+            candidate_total += len(actual)
+            count_errors.append(abs(len(expected) - len(actual)))
+        f1 = 2 * matches / max(reference_total + candidate_total, 1)
+
+        print(
+            f"{backend:<14}{result['load_seconds']:>8.2f}{latencies.mean():>10.2f}"
+            f"{np.percentile(latencies, 95):>9.2f}{1000.0 / latencies.mean():>8.1f}"
+            f"{np.mean(count_errors):>11.2f}{f1:>9.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import argparse
+import time
+
+from src.config import ENGINE_CLOCKS, MODEL_BACKEND
+from src.engine import EngineConfig, TrafficEngine
+
+
+def run(args: argparse.Namespace, clock: str, preview_frames: int = 0) -> dict:
+    config = EngineConfig(
+        backend=args.backend,
+        capture_transport=args.capture_transport,
+        clock=clock,
+        log_file=None,
+        annotate=False,
+    )
+    engine = TrafficEngine(config).open()
+    timeline = []
+    try:
+        # Raw frames shown while the model loads, as TrafficEngine._run does before control starts.
+        for _ in range(preview_frames):
+            engine.preview_step()
+        engine.detector.load()
+        engine._start_control()
+        started = time.perf_counter()
+        for _ in range(args.ticks):
+            snapshot = engine.step()
+            state = snapshot.signal_state
+            timeline.append((state["current_green_lane"], state["countdown"], tuple(snapshot.lane_counts.values())))
+        elapsed = time.perf_counter() - started
+    finally:
+        engine.stop()
+    return {"timeline": timeline, "wall_seconds": elapsed, "clock_seconds": snapshot.clock_time}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Signal timeline reproducibility and speed under each engine clock.")
+    parser.add_argument("--ticks", type=int, default=1000)
+    parser.add_argument("--backend", default=MODEL_BACKEND)
+    parser.add_argument("--capture-transport", default="thread", help="Use a transport that delivers every frame.")
+    parser.add_argument("--preview", type=int, default=37, help="Frames previewed during model load in the second run.")
+    args = parser.parse_args()
+
+    print(f"{'clock':<11}{'controlled':>12}{'wall':>9}{'speed':>9}{'switches':>10}  reproducible")
+    for clock in ENGINE_CLOCKS:
+        # The second run previews frames first, like a slower model load would.
+        first, second = run(args, clock), run(args, clock, preview_frames=args.preview)
+        switches = sum(a[0] != b[0] for a, b in zip(first["timeline"], first["timeline"][1:]))
+        print(
+            f"{clock:<11}{first['clock_seconds']:>11.1f}s{first['wall_seconds']:>8.1f}s"
+            f"{first['clock_seconds'] / first['wall_seconds']:>8.1f}x{switches:>10}  "
+            f"{'yes' if first['timeline'] == second['timeline'] else 'no'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
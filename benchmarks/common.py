@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from typing import Dict, List
+
+import numpy as np
+
+from src.config import FRAME_HEIGHT, FRAME_WIDTH, LANE_IDS, VIDEOS_DIR
+from src.utils import open_video_captures, read_simulation_frames, release_captures
+
+
+def load_ticks(tick_count: int) -> List[Dict[int, np.ndarray]]:
+    video_paths = {lane_id: VIDEOS_DIR / f"lane{lane_id}.mp4" for lane_id in LANE_IDS}
+    captures = open_video_captures(video_paths)
+    try:
+        return [
+            read_simulation_frames(captures, frame_size=(FRAME_WIDTH, FRAME_HEIGHT))
+            for _ in range(tick_count)
+        ]
+    finally:
+        release_captures(captures)
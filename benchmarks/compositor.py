@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+from typing import Callable, Dict
+
+import cv2
+import numpy as np
+
+from src.compositor import JunctionCompositor
+from src.config import LANE_IDS, LANE_NAMES
+from src.utils import build_junction_canvas
+
+from .common import load_ticks
+
+
+def make_state(step: int, lane_ids) -> tuple[Dict[int, int], dict]:
+    green_lane = lane_ids[(step // 40) % len(lane_ids)]
+    lane_counts = {lane_id: (step + lane_id * 7) % 30 for lane_id in lane_ids}
+    signal_state = {
+        "current_green_lane": green_lane,
+        "countdown": 15 - (step // 8) % 15,
+        "cycle_elapsed": 15,
+        "waiting_times": {lane_id: 0.0 if lane_id == green_lane else step * 0.125 for lane_id in lane_ids},
+        "priority_scores": {lane_id: lane_counts[lane_id] * 0.6 + step * 0.05 for lane_id in lane_ids},
+    }
+    return lane_counts, signal_state
+
+
+def measure(label: str, compose: Callable[[int], np.ndarray], steps: int) -> None:
+    for step in range(5):
+        compose(step)
+
+    started = time.perf_counter()
+    for step in range(steps):
+        compose(step)
+    compose_ms = (time.perf_counter() - started) * 1000.0 / steps
+
+    tracemalloc.start()
+    transient_bytes = 0
+    for step in range(steps):
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        compose(step)
+        _, peak = tracemalloc.get_traced_memory()
+        transient_bytes += peak - baseline
+    tracemalloc.stop()
+
+    print(f"{label:<34}{compose_ms:>9.3f} ms/frame{transient_bytes / steps / 1e6:>10.3f} MB allocated/frame")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare junction canvas compose cost before and after the compositor.")
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--lanes", type=int, default=len(LANE_IDS), help="Lane count; >4 replays lanes in an NxM grid.")
+    args = parser.parse_args()
+
+    source_ticks = load_ticks(min(args.steps, 40))
+    lane_ids = list(range(1, args.lanes + 1))
+    lane_names = {lane_id: LANE_NAMES.get(lane_id, f"Approach {lane_id}") for lane_id in lane_ids}
+    ticks = [
+        {lane_id: frames[LANE_IDS[(lane_id - 1) % len(LANE_IDS)]] for lane_id in lane_ids} for frames in source_ticks
+    ]
+
+    def legacy(step: int) -> np.ndarray:
+        lane_counts, signal_state = make_state(step, lane_ids)
+        canvas = build_junction_canvas(ticks[step % len(ticks)], lane_counts, signal_state, lane_names)
+        return cv2.cvtColor(canvas, cv2.COLOR_BGR2RGB)
+
+    compositor = JunctionCompositor(lane_ids, lane_names)
+
+    def cached(step: int) -> np.ndarray:
+        lane_counts, signal_state = make_state(step, lane_ids)
+        return compositor.compose(ticks[step % len(ticks)], lane_counts, signal_state)
+
+    if args.lanes == 4:
+        measure("build_junction_canvas + cvtColor", legacy, args.steps)
+    measure("JunctionCompositor (RGB)", cached, args.steps)
+    print(
+        f"header re-rendered {compositor.header_renders} times, lane borders {compositor.border_renders} times "
+        f"over {args.steps + 5} frames"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+
+from src.config import BGSUB_WARMUP_FRAMES, FRAME_HEIGHT, FRAME_WIDTH, LANE_IDS, MODEL_BACKEND, MODEL_PATH, VIDEOS_DIR
+from src.density import BackgroundSubtractionDetector
+from src.detector import VehicleDetector
+from src.synthetic import default_scenarios, generate_synthetic_videos, load_ground_truth, truth_path
+from src.utils import generate_dummy_traffic_videos, open_video_captures, read_simulation_frames, release_captures
+
+FRAME_SIZE = (FRAME_WIDTH, FRAME_HEIGHT)
+
+
+def evaluate(video_dir: Path, engines: Dict[str, object], frames: int) -> dict:
+    sources = {lane_id: video_dir / f"lane{lane_id}.mp4" for lane_id in LANE_IDS}
+    truth = {
+        lane_id: load_ground_truth(path) for lane_id, path in sources.items() if truth_path(path).exists()
+    }
+    captures = open_video_captures(sources)
+    counts = {name: [] for name in engines}
+    seconds = {name: 0.0 for name in engines}
+    truth_counts = []
+    try:
+        for index in range(frames):
+            lane_frames = read_simulation_frames(captures, frame_size=FRAME_SIZE)
+            for name, engine in engines.items():
+                started = time.perf_counter()
+                detections = engine.detect_batch(lane_frames)
+                seconds[name] += time.perf_counter() - started
+                counts[name].append([len(detections[lane_id]) for lane_id in LANE_IDS])
+            if len(truth) == len(LANE_IDS):
+                truth_counts.append([len(truth[lane_id][index % len(truth[lane_id])]) for lane_id in LANE_IDS])
+    finally:
+        release_captures(captures)
+
+    # Background subtraction reports nothing while it learns the empty road; score after that.
+    settled = slice(BGSUB_WARMUP_FRAMES + 20, None)
+    results = {}
+    for name in engines:
+        observed = np.asarray(counts[name])[settled]
+        result = {"ms_per_frame": seconds[name] * 1000.0 / (frames * len(LANE_IDS))}
+        if truth_counts:
+            error = observed - np.asarray(truth_counts)[settled]
+            result["truth_mae"], result["truth_bias"] = float(np.abs(error).mean()), float(error.mean())
+        if "yolo" in engines and name != "yolo":
+            result["yolo_mae"] = float(np.abs(observed - np.asarray(counts["yolo"])[settled]).mean())
+        results[name] = result
+    return results
+
+
+def report(label: str, results: dict) -> None:
+    print(label)
+    print(f"  {'engine':<8}{'ms/frame':>10}{'frames/s':>10}{'MAE truth':>11}{'bias':>8}{'MAE vs yolo':>13}")
+    for name, result in results.items():
+        print(
+            f"  {name:<8}{result['ms_per_frame']:>10.2f}{1000.0 / result['ms_per_frame']:>10.0f}"
+            f"{result.get('truth_mae', float('nan')):>11.2f}{result.get('truth_bias', float('nan')):>+8.2f}"
+            f"{result.get('yolo_mae', float('nan')):>13.2f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Background-subtraction counting against YOLO: speed and count accuracy.")
+    parser.add_argument("--frames", type=int, default=400, help="Frames per lane.")
+    parser.add_argument("--backend", default=MODEL_BACKEND)
+    parser.add_argument("--skip-model", action="store_true", help="Only run background subtraction.")
+    args = parser.parse_args()
+
+    sources = {lane_id: VIDEOS_DIR / f"lane{lane_id}.mp4" for lane_id in LANE_IDS}
+    if not all(path.exists() for path in sources.values()):
+        generate_dummy_traffic_videos(video_dir=VIDEOS_DIR, lane_ids=LANE_IDS)
+
+    def engines() -> Dict[str, object]:
+        # Fresh instances per clip set: background models must not carry over between videos.
+        selected: Dict[str, object] = {"bgsub": BackgroundSubtractionDetector()}
+        if not args.skip_model:
+            selected["yolo"] = VehicleDetector(model_path=MODEL_PATH, backend=args.backend).load()
+        return selected
+
+    # The bundled clips have no ground truth, so YOLO is the reference there; generated clips have both.
+    report(f"bundled clips ({VIDEOS_DIR})", evaluate(VIDEOS_DIR, engines(), args.frames))
+    with tempfile.TemporaryDirectory() as directory:
+        scenarios = default_scenarios(LANE_IDS, profile="rush_hour", duration_seconds=args.frames / 20.0)
+        generate_synthetic_videos(Path(directory), scenarios)
+        report("synthetic rush hour clips with ground truth", evaluate(Path(directory), engines(), args.frames))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from src.config import LANE_IDS, MODEL_PATH
+from src.detector import VehicleDetector
+
+from .common import load_ticks
+
+
+def expand_junctions(lane_frames: Dict[int, np.ndarray], junction_count: int) -> Dict[tuple, np.ndarray]:
+    return {
+        (junction_id, lane_id): frame
+        for junction_id in range(junction_count)
+        for lane_id, frame in lane_frames.items()
+    }
+
+
+def run_per_lane(detector: VehicleDetector, ticks: List[dict]) -> float:
+    started = time.perf_counter()
+    for frames in ticks:
+        for frame in frames.values():
+            detector.detect(frame)
+    return time.perf_counter() - started
+
+
+def run_batched(detector: VehicleDetector, ticks: List[dict]) -> float:
+    started = time.perf_counter()
+    for frames in ticks:
+        detector.detect_batch(frames)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare per-lane and batched YOLO inference throughput.")
+    parser.add_argument("--ticks", type=int, default=60, help="Junction ticks to replay per run.")
+    parser.add_argument("--junctions", type=int, default=1, help="Junctions sharing one batch.")
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed ticks before measuring.")
+    args = parser.parse_args()
+
+    detector = VehicleDetector(model_path=MODEL_PATH)
+    ticks = [expand_junctions(frames, args.junctions) for frames in load_ticks(args.ticks)]
+    frames_per_tick = len(ticks[0])
+
+    run_per_lane(detector, ticks[: args.warmup])
+    run_batched(detector, ticks[: args.warmup])
+
+    per_lane_seconds = run_per_lane(detector, ticks)
+    batched_seconds = run_batched(detector, ticks)
+
+    total_frames = frames_per_tick * len(ticks)
+    per_lane_fps = total_frames / per_lane_seconds
+    batched_fps = total_frames / batched_seconds
+
+    print(f"frames per tick : {frames_per_tick} ({args.junctions} junction(s) x {len(LANE_IDS)} lanes)")
+    print(f"per-lane loop   : {per_lane_fps:8.2f} frames/s  {len(ticks) / per_lane_seconds:6.2f} ticks/s")
+    print(f"batched         : {batched_fps:8.2f} frames/s  {len(ticks) / batched_seconds:6.2f} ticks/s")
+    print(f"speedup         : {batched_fps / per_lane_fps:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+import cv2
+import numpy as np
+
+from src.backends import BACKENDS
+from src.compositor import JunctionCompositor
+from src.config import FRAME_HEIGHT, FRAME_WIDTH, LANE_IDS, LANE_NAMES, MODEL_BACKEND, MODEL_PATH, VIDEOS_DIR
+from src.detector import VehicleDetector
+from src.lane_counter import LaneCounter
+from src.log_writer import TrafficLogWriter
+from src.scheduler import InferenceScheduler
+from src.signal_controller import AdaptiveSignalController
+from src.utils import (
+    build_junction_canvas,
+    generate_dummy_traffic_videos,
+    open_video_captures,
+    read_simulation_frames,
+    release_captures,
+)
+
+STAGES = ("read", "detect", "count", "control", "compose", "log")
+PERCENTILES = (50, 95, 99)
+
+
+def summarize(samples_ms: List[float]) -> Dict[str, float]:
+    values = np.asarray(samples_ms)
+    summary = {f"p{percentile}": float(np.percentile(values, percentile)) for percentile in PERCENTILES}
+    summary["mean"] = float(values.mean())
+    return summary
+
+
+def replay(args: argparse.Namespace, video_dir: Path, log_file: Path) -> dict:
+    video_paths = {lane_id: video_dir / f"lane{lane_id}.mp4" for lane_id in LANE_IDS}
+    captures = open_video_captures(video_paths)
+    source_fps = captures[LANE_IDS[0]].get(cv2.CAP_PROP_FPS) or 20.0
+    frame_size = (FRAME_WIDTH, FRAME_HEIGHT)
+
+    detector = VehicleDetector(model_path=MODEL_PATH, backend=args.backend)
+    inference = InferenceScheduler(detector, LANE_IDS) if args.motion_gating else detector
+    lane_counter = LaneCounter(lane_ids=LANE_IDS, smoothing_window=4)
+    controller = AdaptiveSignalController(lane_ids=LANE_IDS)
+    controller.bootstrap({lane_id: 0 for lane_id in LANE_IDS})
+    compositor = JunctionCompositor(LANE_IDS, LANE_NAMES, frame_size=frame_size)
+    log_writer = TrafficLogWriter(log_file, history_store=None)
+    log_writer.start()
+
+    # Video time drives the controller so runs are comparable regardless of machine speed.
+    delta_seconds = 1.0 / source_fps
+    start_time = datetime(2026, 1, 1)
+    stage_samples: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+    tick_samples: List[float] = []
+
+    try:
+        for tick in range(args.warmup + args.ticks):
+            record = tick >= args.warmup
+            marks = [time.perf_counter()]
+
+            frames = read_simulation_frames(captures, frame_size=frame_size)
+            marks.append(time.perf_counter())
+
+            lane_detections = inference.detect_batch(frames)
+            marks.append(time.perf_counter())
+
+            video_time = tick * delta_seconds
+            fresh_lanes = getattr(inference, "fresh_lanes", set(LANE_IDS))
+            for lane_id in LANE_IDS:
+                lane_counter.update_detections(
+                    lane_id, lane_detections[lane_id], timestamp=video_time, fresh=lane_id in fresh_lanes
+                )
+            lane_counts = lane_counter.get_counts()
+            marks.append(time.perf_counter())
+
+            controller.update_vehicle_counts(lane_counts)
+            controller.tick(delta_seconds)
+            signal_state = controller.get_state()
+            lane_counter.set_green_lane(signal_state["current_green_lane"])
+            marks.append(time.perf_counter())
+
+            annotated = {
+                lane_id: detector.draw_detections(frames[lane_id].copy(), lane_detections[lane_id])
+                for lane_id in LANE_IDS
+            }
+            if args.legacy_canvas:
+                cv2.cvtColor(build_junction_canvas(annotated, lane_counts, signal_state, LANE_NAMES), cv2.COLOR_BGR2RGB)
+            else:
+                compositor.compose(annotated, lane_counts, signal_state)
+            marks.append(time.perf_counter())
+
+            timestamp = (start_time + timedelta(seconds=video_time)).isoformat(timespec="seconds")
+            log_writer.write(timestamp=timestamp, lane_counts=lane_counts, signal_state=signal_state)
+            marks.append(time.perf_counter())
+
+            if record:
+                for stage, started, finished in zip(STAGES, marks, marks[1:]):
+                    stage_samples[stage].append((finished - started) * 1000.0)
+                tick_samples.append((marks[-1] - marks[0]) * 1000.0)
+    finally:
+        release_captures(captures)
+        log_writer.close()
+
+    total_seconds = sum(tick_samples) / 1000.0
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "settings": {
+            "ticks": args.ticks,
+            "warmup": args.warmup,
+            "lanes": len(LANE_IDS),
+            "backend": args.backend,
+            "motion_gating": args.motion_gating,
+            "legacy_canvas": args.legacy_canvas,
+            "source": "synthetic" if args.synthetic else "videos",
+        },
+        "environment": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__,
+            "opencv": cv2.__version__,
+        },
+        "ticks_per_second": len(tick_samples) / total_seconds,
+        "frames_per_second": len(tick_samples) * len(LANE_IDS) / total_seconds,
+        "tick_ms": summarize(tick_samples),
+        "stages_ms": {stage: summarize(samples) for stage, samples in stage_samples.items()},
+    }
+
+
+def print_report(result: dict) -> None:
+    print(
+        f"{result['ticks_per_second']:.2f} ticks/s, {result['frames_per_second']:.2f} frames/s "
+        f"over {result['settings']['ticks']} ticks ({result['settings']['backend']})"
+    )
+    print(f"{'stage':<10}" + "".join(f"{f'p{p} ms':>10}" for p in PERCENTILES) + f"{'mean ms':>10}")
+    rows = list(result["stages_ms"].items()) + [("tick", result["tick_ms"])]
+    for stage, summary in rows:
+        print(f"{stage:<10}" + "".join(f"{summary[f'p{p}']:>10.2f}" for p in PERCENTILES) + f"{summary['mean']:>10.2f}")
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> List[str]:
+    regressions = []
+    if result["frames_per_second"] < baseline["frames_per_second"] * (1 - tolerance):
+        regressions.append(
+            f"throughput {result['frames_per_second']:.2f} frames/s < baseline {baseline['frames_per_second']:.2f}"
+        )
+    for stage, summary in result["stages_ms"].items():
+        reference = baseline.get("stages_ms", {}).get(stage)
+        if reference is None:
+            continue
+        for key in ("p50", "p95"):
+            # Sub-0.05 ms stages are dominated by timer noise.
+            if summary[key] > max(reference[key] * (1 + tolerance), reference[key] + 0.05):
+                regressions.append(f"{stage} {key} {summary[key]:.2f} ms > baseline {reference[key]:.2f} ms")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay lane videos through the full pipeline as fast as possible.")
+    parser.add_argument("--ticks", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--backend", choices=BACKENDS, default=MODEL_BACKEND)
+    parser.add_argument("--motion-gating", action="store_true", help="Put the inference scheduler in front of YOLO.")
+    parser.add_argument("--legacy-canvas", action="store_true", help="Compose with build_junction_canvas + cvtColor.")
+    parser.add_argument("--synthetic", action="store_true", help="Replay freshly generated dummy videos.")
+    parser.add_argument("--output", type=Path, help="Write machine-readable results to this JSON file.")
+    parser.add_argument("--compare", type=Path, help="Baseline JSON; exit 1 on regression.")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative slowdown for --compare.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        scratch_dir = Path(scratch)
+        video_dir = VIDEOS_DIR
+        if args.synthetic:
+            video_dir = scratch_dir / "videos"
+            generate_dummy_traffic_videos(video_dir=video_dir, lane_ids=LANE_IDS)
+        result = replay(args, video_dir, scratch_dir / "replay_log.csv")
+
+    print_report(result)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(result, indent=2), encoding="utf-8")
+        print(f"results written to {args.output}")
+
+    if args.compare:
+        regressions = compare(result, json.loads(args.compare.read_text(encoding="utf-8")), args.tolerance)
+        if regressions:
+            print("REGRESSION:")
+            for regression in regressions:
+                print(f"  {regression}")
+            raise SystemExit(1)
+        print(f"no regression against {args.compare} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
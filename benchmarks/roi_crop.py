@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from src.config import LANE_IDS, LANE_ROIS, MODEL_PATH
+from src.detector import VehicleDetector
+from src.roi import RegionCropper
+
+from .common import load_ticks
+
+# Road area of the generated demo clips; used when LANE_ROIS is not configured.
+DEMO_ROAD_POLYGON = [(0.26, 0.0), (0.74, 0.0), (0.74, 1.0), (0.26, 1.0)]
+
+
+def time_ticks(detector: VehicleDetector, ticks: List[Dict[int, np.ndarray]], cropper: RegionCropper | None):
+    latencies = []
+    counts = []
+    for frames in ticks:
+        started = time.perf_counter()
+        if cropper:
+            detections = detector.detect_batch(
+                cropper.crop_frames(frames), image_size=cropper.inference_image_size(frames.keys())
+            )
+            detections = cropper.restore(detections)
+        else:
+            detections = detector.detect_batch(frames)
+        latencies.append((time.perf_counter() - started) * 1000.0)
+        counts.append(sum(len(lane_detections) for lane_detections in detections.values()))
+    return np.array(latencies), np.array(counts)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure inference latency with and without lane ROI crops.")
+    parser.add_argument("--ticks", type=int, default=60)
+    args = parser.parse_args()
+
+    polygons = LANE_ROIS or {lane_id: DEMO_ROAD_POLYGON for lane_id in LANE_IDS}
+    detector = VehicleDetector(model_path=MODEL_PATH)
+    cropper = RegionCropper(LANE_IDS, polygons)
+    ticks = load_ticks(args.ticks)
+
+    time_ticks(detector, ticks[:3], None)
+    time_ticks(detector, ticks[:3], cropper)
+    full_latency, full_counts = time_ticks(detector, ticks, None)
+    roi_latency, roi_counts = time_ticks(detector, ticks, cropper)
+
+    pixel_ratio = np.mean([roi.pixel_ratio for roi in cropper.rois.values()])
+    print(f"ROI pixels       : {pixel_ratio:.0%} of each lane frame, inference size {cropper.inference_image_size(LANE_IDS)}")
+    print(f"full frame       : {full_latency.mean():7.2f} ms/tick (p95 {np.percentile(full_latency, 95):.2f})  {full_counts.mean():.1f} vehicles/tick")
+    print(f"ROI crop         : {roi_latency.mean():7.2f} ms/tick (p95 {np.percentile(roi_latency, 95):.2f})  {roi_counts.mean():.1f} vehicles/tick")
+    print(f"latency reduction: {1 - roi_latency.mean() / full_latency.mean():7.1%}")
+
+
+if __name__ == "__main__":
+    main()
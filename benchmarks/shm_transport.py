@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import argparse
+import multiprocessing as mp
+import time
+from typing import Callable, Dict
+
+import cv2
+import numpy as np
+
+from src.capture import start_simulation_capture
+from src.config import FRAME_HEIGHT, FRAME_WIDTH, LANE_IDS, VIDEOS_DIR
+from src.shm_transport import start_shared_simulation_capture
+from src.utils import generate_dummy_traffic_videos, open_video_captures, read_lane_frame, read_simulation_frames, release_captures
+
+FRAME_SIZE = (FRAME_WIDTH, FRAME_HEIGHT)
+
+
+def _pickle_capture_main(frame_queue, video_path: str, lane_id: int, stop_event) -> None:
+    capture = cv2.VideoCapture(video_path)
+    while not stop_event.is_set():
+        frame_queue.put(read_lane_frame(capture, lane_id, FRAME_SIZE))
+    capture.release()
+
+
+class PickleQueueGroup:
+    # The naive alternative: one capture process per lane pickling every frame through a queue.
+    def __init__(self, video_paths) -> None:
+        context = mp.get_context("spawn")
+        self.stop_event = context.Event()
+        self.queues = {lane_id: context.Queue(maxsize=4) for lane_id in video_paths}
+        self.processes = [
+            context.Process(
+                target=_pickle_capture_main,
+                args=(self.queues[lane_id], str(path), lane_id, self.stop_event),
+                daemon=True,
+            )
+            for lane_id, path in video_paths.items()
+        ]
+        for process in self.processes:
+            process.start()
+
+    def read(self) -> Dict[int, np.ndarray]:
+        return {lane_id: frame_queue.get(timeout=10) for lane_id, frame_queue in self.queues.items()}
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        for frame_queue in self.queues.values():
+            while not frame_queue.empty():
+                frame_queue.get_nowait()
+        for process in self.processes:
+            process.join(timeout=2)
+            if process.is_alive():
+                process.terminate()
+
+
+def consume(frames: Dict[int, np.ndarray], work_ms: float) -> None:
+    # Stand-in for inference holding the GIL in the consuming process.
+    deadline = time.perf_counter() + work_ms / 1000.0
+    checksum = 0
+    for frame in frames.values():
+        checksum += int(frame[::64, ::64].sum())
+    while time.perf_counter() < deadline:
+        checksum += 1
+
+
+def measure(label: str, group, ticks: int, work_ms: float) -> None:
+    for _ in range(10):
+        consume(group.read(), 0.0)
+    started = time.perf_counter()
+    for _ in range(ticks):
+        consume(group.read(), work_ms)
+    elapsed = time.perf_counter() - started
+    group.stop()
+    print(f"{label:<26}{ticks / elapsed:>9.1f} ticks/s{elapsed * 1000.0 / ticks:>9.2f} ms/tick")
+
+
+def check_frames(video_paths, ticks: int) -> bool:
+    captures = open_video_captures(video_paths)
+    group = start_shared_simulation_capture(video_paths, frame_size=FRAME_SIZE)
+    try:
+        for _ in range(ticks):
+            expected = read_simulation_frames(captures, frame_size=FRAME_SIZE)
+            received = group.read()
+            if any(not np.array_equal(expected[lane_id], received[lane_id]) for lane_id in expected):
+                return False
+        return True
+    finally:
+        group.stop()
+        release_captures(captures)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare frame transports between capture and the pipeline.")
+    parser.add_argument("--ticks", type=int, default=300)
+    parser.add_argument("--work-ms", type=float, default=5.0, help="Simulated per-tick inference time in the consumer.")
+    args = parser.parse_args()
+
+    video_paths = {lane_id: VIDEOS_DIR / f"lane{lane_id}.mp4" for lane_id in LANE_IDS}
+    if not all(path.exists() for path in video_paths.values()):
+        generate_dummy_traffic_videos(video_dir=VIDEOS_DIR, lane_ids=LANE_IDS)
+
+    print(f"shared-memory frames identical to direct decode: {check_frames(video_paths, 50)}")
+    builders: Dict[str, Callable[[], object]] = {
+        "reader threads": lambda: start_simulation_capture(open_video_captures(video_paths), frame_size=FRAME_SIZE),
+        "processes + pickled queue": lambda: PickleQueueGroup(video_paths),
+        "processes + shared memory": lambda: start_shared_simulation_capture(video_paths, frame_size=FRAME_SIZE),
+    }
+    for label, build in builders.items():
+        measure(label, build(), args.ticks, args.work_ms)
+
+
+if __name__ == "__main__":
+    main()
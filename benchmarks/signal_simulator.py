@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src.config import LANE_IDS
+from src.signal_controller import load_signal_timing
+from src.signal_simulator import BatchSignalSimulator, poisson_arrival_traces, simulate_with_controller
+
+
+def check_equivalence(result, arrivals: np.ndarray, scenario_count: int, timing) -> list[str]:
+    mismatches = []
+    for scenario in range(scenario_count):
+        reference = simulate_with_controller(
+            arrivals[scenario], lane_ids=result.lane_ids, delta_seconds=result.delta_seconds, timing=timing
+        )
+        if not np.array_equal(reference["green_trace"], result.green_trace[scenario]):
+            tick = int(np.argmax(reference["green_trace"] != result.green_trace[scenario]))
+            mismatches.append(f"scenario {scenario}: green lane diverges at tick {tick}")
+        elif not np.array_equal(reference["countdown_trace"], result.countdown_trace[scenario]):
+            mismatches.append(f"scenario {scenario}: countdown diverges")
+        elif not np.array_equal(reference["final_queue"], result.final_queue[scenario]):
+            mismatches.append(f"scenario {scenario}: final queues differ")
+    return mismatches
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Vectorized signal policy simulator vs the scalar controller.")
+    parser.add_argument("--scenarios", type=int, default=2000)
+    parser.add_argument("--hours", type=float, default=1.0)
+    parser.add_argument("--rates", type=float, nargs="+", default=[0.08, 0.12, 0.05, 0.10], help="Vehicles/s per lane.")
+    parser.add_argument("--check", type=int, default=25, help="Scenarios replayed through AdaptiveSignalController.")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--timing", type=Path, help="Tuned timing JSON; defaults to the config.py values.")
+    args = parser.parse_args()
+
+    if len(args.rates) != len(LANE_IDS):
+        parser.error(f"--rates needs {len(LANE_IDS)} values")
+    timing = load_signal_timing(args.timing)
+    simulator = BatchSignalSimulator(lane_ids=LANE_IDS, timing=timing)
+    num_ticks = int(args.hours * 3600 / simulator.delta_seconds)
+    # Jitter each scenario's demand so the batch covers a spread of traffic levels.
+    generator = np.random.default_rng(args.seed)
+    rates = np.asarray(args.rates) * generator.uniform(0.5, 1.5, size=(args.scenarios, len(LANE_IDS)))
+    arrivals = poisson_arrival_traces(args.scenarios, num_ticks, rates, seed=args.seed)
+
+    started = time.perf_counter()
+    result = simulator.run(arrivals, record_trace=args.check > 0)
+    batch_seconds = time.perf_counter() - started
+
+    check_count = min(args.check, args.scenarios)
+    started = time.perf_counter()
+    mismatches = check_equivalence(result, arrivals, check_count, timing)
+    scalar_seconds = (time.perf_counter() - started) / max(check_count, 1)
+
+    simulated_hours = args.scenarios * num_ticks * simulator.delta_seconds / 3600
+    print(f"batch:  {args.scenarios} scenarios x {num_ticks} ticks in {batch_seconds:.2f}s ({simulated_hours / batch_seconds:,.0f} sim-hours/s)")
+    if check_count:
+        estimated = scalar_seconds * args.scenarios
+        print(f"scalar: {scalar_seconds * 1000:.1f} ms/scenario, ~{estimated:.1f}s for the batch ({estimated / batch_seconds:.1f}x slower)")
+    for key, value in result.summary().items():
+        print(f"  {key:<18}{value:,.3f}" if isinstance(value, float) else f"  {key:<18}{value}")
+
+    if mismatches:
+        print("MISMATCH against AdaptiveSignalController:")
+        for mismatch in mismatches[:10]:
+            print(f"  {mismatch}")
+        raise SystemExit(1)
+    if check_count:
+        print(f"identical to AdaptiveSignalController on {check_count} scenarios")
+
+
+if __name__ == "__main__":
+    main()
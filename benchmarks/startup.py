@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+STARTED = time.perf_counter()
+
+
+def measure_child(args: argparse.Namespace) -> dict:
+    # Runs in a fresh interpreter so imports are really cold; everything is relative to STARTED.
+    from src.engine import EngineConfig, TrafficEngine
+
+    imported = time.perf_counter() - STARTED
+    heavy_imports = sorted(name for name in ("torch", "ultralytics", "matplotlib", "pandas") if name in sys.modules)
+    if args.eager:
+        # The old startup path: block on the model before any frame is shown.
+        from src.config import MODEL_PATH
+        from src.model_registry import get_model
+
+        get_model(MODEL_PATH, args.backend)
+    config = EngineConfig(backend=args.backend, capture_transport=args.capture_transport, log_file=None, annotate=False)
+    engine = TrafficEngine(config)
+    offset = engine._created - STARTED
+    engine.start()
+    try:
+        snapshot = engine.wait_for_snapshot(timeout=args.timeout)
+        while snapshot is not None and not snapshot.model_ready and engine.error is None:
+            snapshot = engine.wait_for_snapshot(after_step=snapshot.step, timeout=args.timeout)
+    finally:
+        engine.stop()
+    if engine.error is not None:
+        raise SystemExit(f"Engine failed: {engine.error}")
+
+    timings = {"import": round(imported, 3)}
+    timings.update({event: round(offset + value, 3) for event, value in engine.startup_timings.items()})
+    return {"timings": timings, "heavy_imports": heavy_imports}
+
+
+def run_once(args: argparse.Namespace, eager: bool) -> dict:
+    command = [sys.executable, "-m", "benchmarks.startup", "--child", "--backend", args.backend]
+    command += ["--capture-transport", args.capture_transport, "--timeout", str(args.timeout)]
+    if eager:
+        command.append("--eager")
+    started = time.perf_counter()
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result["process_seconds"] = time.perf_counter() - started
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure time to first frame and first signal decision from a cold start.")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--backend", default="torch")
+    parser.add_argument("--capture-transport", choices=["auto", "shm", "thread"], default="auto")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--eager", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure_child(args)), flush=True)
+        return
+
+    events = ("import", "sources_open", "first_frame", "model_ready", "first_decision")
+    print(f"{'startup':<10}" + "".join(f"{event:>16}" for event in events) + f"{'process':>12}")
+    for label, eager in (("eager", True), ("lazy", False)):
+        results = [run_once(args, eager) for _ in range(args.runs)]
+        medians = [
+            np.median([result["timings"].get(event, np.nan) for result in results]) * 1000.0 for event in events
+        ]
+        process_ms = np.median([result["process_seconds"] for result in results]) * 1000.0
+        print(f"{label:<10}" + "".join(f"{value:>14.0f}ms" for value in medians) + f"{process_ms:>10.0f}ms")
+    print(f"heavy modules pulled in by importing src.engine: {results[0]['heavy_imports'] or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from src.config import FRAME_HEIGHT, FRAME_WIDTH, LANE_IDS, MODEL_BACKEND, MODEL_PATH, SYNTHETIC_PROFILES
+from src.detector import VehicleDetector
+from src.lane_counter import LaneCounter
+from src.synthetic import SyntheticFrameSource, SyntheticLaneRenderer, default_scenarios, generate_synthetic_videos
+from src.utils import open_video_captures, read_simulation_frames, release_captures
+
+FRAME_SIZE = (FRAME_WIDTH, FRAME_HEIGHT)
+
+
+def legacy_render(frame_count: int, vehicle_count: int = 30, speed: float = 3.8) -> None:
+    # The per-vehicle cv2.rectangle loop the old dummy-video generator used.
+    width, height = FRAME_SIZE
+    lane_x_positions = [int(width * 0.30), int(width * 0.47), int(width * 0.64)]
+    for frame_idx in range(frame_count):
+        frame = np.full((height, width, 3), (40, 40, 40), dtype=np.uint8)
+        for vehicle_idx in range(vehicle_count):
+            x = lane_x_positions[vehicle_idx % 3] + (vehicle_idx % 2) * 8 - 4
+            y = int(height - (frame_idx * speed + vehicle_idx * 48) % (height + 120))
+            if -60 <= y <= height + 20:
+                cv2.rectangle(frame, (x, y), (x + 34, y + 58), (120, 140, 160), -1)
+                cv2.rectangle(frame, (x, y), (x + 34, y + 58), (25, 25, 25), 2)
+
+
+def time_rendering(args: argparse.Namespace) -> None:
+    started = time.perf_counter()
+    legacy_render(args.frames)
+    legacy_seconds = time.perf_counter() - started
+
+    renderer = SyntheticLaneRenderer(default_scenarios([4], profile=args.profile, duration_seconds=args.frames / 20)[4])
+    started = time.perf_counter()
+    for start in range(0, args.frames, 64):
+        renderer.render(start, 64)
+    batched_seconds = time.perf_counter() - started
+    print(f"render  legacy loop {args.frames / legacy_seconds:>9.0f} frames/s")
+    print(f"render  batched     {args.frames / batched_seconds:>9.0f} frames/s ({legacy_seconds / batched_seconds:.1f}x)")
+
+
+def time_generation(args: argparse.Namespace) -> None:
+    scenarios = default_scenarios(LANE_IDS, profile=args.profile, duration_seconds=args.seconds)
+    for label, workers in (("serial", 1), ("parallel", 0)):
+        with tempfile.TemporaryDirectory() as directory:
+            started = time.perf_counter()
+            generate_synthetic_videos(Path(directory), scenarios, workers=workers)
+            print(f"videos  {label:<12}{time.perf_counter() - started:>8.2f}s for {len(scenarios)} x {args.seconds:.0f}s lanes")
+
+
+def time_sources(args: argparse.Namespace) -> None:
+    scenarios = default_scenarios(LANE_IDS, profile=args.profile, duration_seconds=args.seconds)
+    source = SyntheticFrameSource(scenarios)
+    started = time.perf_counter()
+    for _ in range(args.ticks):
+        source.read()
+    memory_seconds = time.perf_counter() - started
+
+    with tempfile.TemporaryDirectory() as directory:
+        generate_synthetic_videos(Path(directory), scenarios)
+        captures = open_video_captures({lane_id: Path(directory) / f"lane{lane_id}.mp4" for lane_id in LANE_IDS})
+        started = time.perf_counter()
+        for _ in range(args.ticks):
+            read_simulation_frames(captures, frame_size=FRAME_SIZE)
+        decode_seconds = time.perf_counter() - started
+        release_captures(captures)
+    print(f"source  in-memory   {args.ticks / memory_seconds:>9.0f} ticks/s")
+    print(f"source  mp4 decode  {args.ticks / decode_seconds:>9.0f} ticks/s")
+
+
+def measure_counting(args: argparse.Namespace) -> None:
+    scenarios = default_scenarios(LANE_IDS, profile=args.profile, duration_seconds=args.seconds)
+    source = SyntheticFrameSource(scenarios)
+    detector = VehicleDetector(model_path=MODEL_PATH, backend=args.backend).load()
+    lane_counter = LaneCounter(lane_ids=LANE_IDS, smoothing_window=4)
+    detector_errors, counter_errors = [], []
+    started = time.perf_counter()
+    for tick in range(args.ticks):
+        frames = source.read()
+        detections = detector.detect_batch(frames)
+        truth = {lane_id: len(boxes) for lane_id, boxes in source.ground_truth().items()}
+        for lane_id in LANE_IDS:
+            lane_counter.update_detections(lane_id, detections[lane_id], timestamp=tick / scenarios[lane_id].fps)
+        counts = lane_counter.get_counts()
+        for lane_id in LANE_IDS:
+            detector_errors.append(len(detections[lane_id]) - truth[lane_id])
+            counter_errors.append(counts[lane_id] - truth[lane_id])
+    elapsed = time.perf_counter() - started
+    detector_errors, counter_errors = np.asarray(detector_errors), np.asarray(counter_errors)
+    print(f"count   pipeline    {args.ticks / elapsed:>9.1f} ticks/s with detection")
+    print(f"count   detector    MAE {np.abs(detector_errors).mean():.2f}  bias {detector_errors.mean():+.2f} vehicles/lane")
+    print(f"count   lane count  MAE {np.abs(counter_errors).mean():.2f}  bias {counter_errors.mean():+.2f} vehicles/lane")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Synthetic scenario generation speed, source throughput and counting accuracy.")
+    parser.add_argument("--profile", choices=list(SYNTHETIC_PROFILES), default="rush_hour")
+    parser.add_argument("--frames", type=int, default=500, help="Frames rendered per renderer.")
+    parser.add_argument("--seconds", type=float, default=25.0, help="Scenario length per lane.")
+    parser.add_argument("--ticks", type=int, default=300)
+    parser.add_argument("--backend", default=MODEL_BACKEND)
+    parser.add_argument("--skip-detector", action="store_true", help="Only time generation and frame sources.")
+    args = parser.parse_args()
+
+    time_rendering(args)
+    time_generation(args)
+    time_sources(args)
+    if not args.skip_detector:
+        measure_counting(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import hashlib
+import shutil
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict
+
+from .config import INFERENCE_IMAGE_SIZE, MODEL_EXPORTS_DIR
+
+if TYPE_CHECKING:
+    from ultralytics import YOLO
+
+# backend name -> ultralytics export arguments
+EXPORT_BACKENDS: Dict[str, dict] = {
+    "onnx": {"format": "onnx", "dynamic": True},
+    "onnx-int8": {"format": "onnx", "dynamic": True},
+    "openvino": {"format": "openvino", "dynamic": True},
+    "openvino-int8": {"format": "openvino", "dynamic": True, "int8": True},
+}
+BACKENDS = ("torch", *EXPORT_BACKENDS)
+
+
+def file_hash(path: Path, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with Path(path).open("rb") as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def export_cache_dir(model_path: Path, image_size: tuple[int, int] = INFERENCE_IMAGE_SIZE) -> Path:
+    height, width = image_size
+    return MODEL_EXPORTS_DIR / f"{file_hash(model_path)}_{width}x{height}"
+
+
+def exported_artifact_path(
+    model_path: Path,
+    backend: str,
+    image_size: tuple[int, int] = INFERENCE_IMAGE_SIZE,
+) -> Path:
+    stem = Path(model_path).stem
+    suffix = "_int8" if backend.endswith("-int8") else ""
+    # Ultralytics picks the runtime from the artifact name, so keep its naming scheme.
+    if backend.startswith("openvino"):
+        name = f"{stem}{suffix}_openvino_model"
+    else:
+        name = f"{stem}{suffix}.onnx"
+    return export_cache_dir(model_path, image_size) / name
+
+
+def quantize_onnx(source: Path, destination: Path) -> None:
+    try:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+    except ImportError as error:
+        raise RuntimeError("The onnx-int8 backend requires the 'onnxruntime' package.") from error
+
+    quantize_dynamic(str(source), str(destination), weight_type=QuantType.QUInt8)
+
+
+def export_model(
+    torch_model: YOLO,
+    model_path: Path,
+    backend: str,
+    image_size: tuple[int, int] = INFERENCE_IMAGE_SIZE,
+) -> Path:
+    if backend not in EXPORT_BACKENDS:
+        raise ValueError(f"Unknown model backend '{backend}', expected one of {BACKENDS}.")
+
+    artifact = exported_artifact_path(model_path, backend, image_size)
+    if artifact.exists():
+        return artifact
+
+    artifact.parent.mkdir(parents=True, exist_ok=True)
+    if backend == "onnx-int8":
+        float_artifact = export_model(torch_model, model_path, "onnx", image_size)
+        quantize_onnx(float_artifact, artifact)
+        return artifact
+
+    exported = Path(torch_model.export(imgsz=list(image_size), **EXPORT_BACKENDS[backend]))
+    shutil.move(str(exported), str(artifact))
+    return artifact
+
+
+def load_exported_model(
+    torch_model: YOLO,
+    model_path: Path,
+    backend: str,
+    image_size: tuple[int, int] = INFERENCE_IMAGE_SIZE,
+) -> YOLO:
+    from ultralytics import YOLO
+
+    artifact = export_model(torch_model, model_path, backend, image_size)
+    return YOLO(str(artifact), task="detect")
+
+
+def load_cached_export(
+    model_path: Path,
+    backend: str,
+    image_size: tuple[int, int] = INFERENCE_IMAGE_SIZE,
+) -> YOLO | None:
+    # An export from an earlier start loads directly, without building the torch model first.
+    if backend not in EXPORT_BACKENDS or not Path(model_path).exists():
+        return None
+    artifact = exported_artifact_path(model_path, backend, image_size)
+    if not artifact.exists():
+        return None
+    from ultralytics import YOLO
+
+    return YOLO(str(artifact), task="detect")
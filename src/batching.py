@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Dict, Hashable, List, Mapping
+
+import numpy as np
+
+from .config import BATCH_MAX_FRAMES, BATCH_MAX_WAIT
+from .metrics import metrics
+
+
+class InferenceRequest:
+    __slots__ = ("junction_id", "frames", "options", "settings", "submitted", "done", "result", "error")
+
+    def __init__(self, junction_id: str, frames: Mapping[Hashable, np.ndarray], options: dict) -> None:
+        self.junction_id = junction_id
+        self.frames = dict(frames)
+        self.options = options
+        self.settings = tuple(sorted(options.items()))
+        self.submitted = time.perf_counter()
+        self.done = threading.Event()
+        self.result: Dict[Hashable, np.ndarray] | None = None
+        self.error: Exception | None = None
+
+
+class JunctionStats:
+    __slots__ = ("requests", "frames", "wait_seconds", "max_wait_seconds")
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.frames = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+
+class BatchingDetector(threading.Thread):
+    def __init__(
+        self,
+        detector,
+        max_batch_size: int = BATCH_MAX_FRAMES,
+        max_wait: float = BATCH_MAX_WAIT,
+    ) -> None:
+        super().__init__(name="batching-detector", daemon=True)
+        self.detector = detector
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+        self.batches = 0
+        self.batched_frames = 0
+        self._queues: Dict[str, deque[InferenceRequest]] = {}
+        self._stats: Dict[str, JunctionStats] = {}
+        self._order: List[str] = []
+        self._next_turn = 0
+        self._condition = threading.Condition()
+        self._stopped = False
+
+    def client(self, junction_id: str) -> "JunctionDetectorClient":
+        with self._condition:
+            if junction_id not in self._queues:
+                self._queues[junction_id] = deque()
+                self._stats[junction_id] = JunctionStats()
+                self._order.append(junction_id)
+        return JunctionDetectorClient(self, junction_id)
+
+    def release(self, junction_id: str) -> None:
+        with self._condition:
+            for request in self._queues.pop(junction_id, ()):
+                request.error = RuntimeError(f"Junction '{junction_id}' was released.")
+                request.done.set()
+            if junction_id in self._order:
+                self._order.remove(junction_id)
+            self._condition.notify_all()
+
+    def submit(self, junction_id: str, frames: Mapping[Hashable, np.ndarray], options: dict) -> Dict[Hashable, np.ndarray]:
+        if not frames:
+            return {}
+        request = InferenceRequest(junction_id, frames, options)
+        with self._condition:
+            if self._stopped:
+                raise RuntimeError("Batching detector is stopped.")
+            if junction_id not in self._queues:
+                raise RuntimeError(f"Junction '{junction_id}' has no detector client.")
+            self._queues[junction_id].append(request)
+            self._condition.notify_all()
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _pending_frames(self) -> int:
+        return sum(len(request.frames) for queue in self._queues.values() for request in queue)
+
+    def _ready(self) -> bool:
+        if self._stopped:
+            return True
+        oldest = min((queue[0].submitted for queue in self._queues.values() if queue), default=None)
+        if oldest is None:
+            return False
+        # Dispatch early once every junction is waiting; nobody else can join the batch.
+        if all(self._queues[junction_id] for junction_id in self._order):
+            return True
+        return self._pending_frames() >= self.max_batch_size or time.perf_counter() - oldest >= self.max_wait
+
+    def _next_deadline(self) -> float | None:
+        oldest = min((queue[0].submitted for queue in self._queues.values() if queue), default=None)
+        if oldest is None:
+            return None
+        return max(oldest + self.max_wait - time.perf_counter(), 0.0)
+
+    def _take_batch(self) -> List[InferenceRequest]:
+        # Round-robin from a rotating start so every junction gets a fair share of each batch;
+        # the oldest request decides which detector settings this batch runs with.
+        waiting = [queue[0] for queue in self._queues.values() if queue]
+        settings = min(waiting, key=lambda request: request.submitted).settings
+        turn_order = self._order[self._next_turn :] + self._order[: self._next_turn]
+        if self._order:
+            self._next_turn = (self._next_turn + 1) % len(self._order)
+
+        batch: List[InferenceRequest] = []
+        frame_count = 0
+        progressed = True
+        while progressed:
+            progressed = False
+            for junction_id in turn_order:
+                queue = self._queues[junction_id]
+                if not queue or queue[0].settings != settings:
+                    continue
+                size = len(queue[0].frames)
+                if batch and frame_count + size > self.max_batch_size:
+                    continue
+                batch.append(queue.popleft())
+                frame_count += size
+                progressed = True
+        return batch
+
+    def run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._ready():
+                    self._condition.wait(timeout=self._next_deadline())
+                if self._stopped:
+                    break
+                batch = self._take_batch()
+            self._dispatch(batch)
+
+        with self._condition:
+            for queue in self._queues.values():
+                while queue:
+                    request = queue.popleft()
+                    request.error = RuntimeError("Batching detector is stopped.")
+                    request.done.set()
+
+    def _dispatch(self, batch: List[InferenceRequest]) -> None:
+        frames = {
+            (request.junction_id, lane_id): frame for request in batch for lane_id, frame in request.frames.items()
+        }
+        dispatched = time.perf_counter()
+        try:
+            with metrics.span("batcher.predict"):
+                detections = self.detector.detect_batch(frames, **batch[0].options)
+        except Exception as error:
+            for request in batch:
+                request.error = error
+                request.done.set()
+            return
+
+        self.batches += 1
+        self.batched_frames += len(frames)
+        metrics.increment("batcher.batches")
+        metrics.increment("batcher.frames", len(frames))
+        for request in batch:
+            request.result = {lane_id: detections[(request.junction_id, lane_id)] for lane_id in request.frames}
+            waited = dispatched - request.submitted
+            metrics.observe("batcher.queue_wait", waited * 1000.0)
+            stats = self._stats.get(request.junction_id)
+            if stats is not None:
+                stats.requests += 1
+                stats.frames += len(request.frames)
+                stats.wait_seconds += waited
+                stats.max_wait_seconds = max(stats.max_wait_seconds, waited)
+            request.done.set()
+
+    def stop(self) -> None:
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout=5.0)
+
+    def stats(self) -> dict:
+        with self._condition:
+            junctions = {
+                junction_id: {
+                    "requests": stats.requests,
+                    "frames": stats.frames,
+                    "mean_wait_ms": round(stats.wait_seconds * 1000.0 / stats.requests, 2) if stats.requests else 0.0,
+                    "max_wait_ms": round(stats.max_wait_seconds * 1000.0, 2),
+                }
+                for junction_id, stats in self._stats.items()
+            }
+        return {
+            "batches": self.batches,
+            "mean_batch_frames": round(self.batched_frames / self.batches, 2) if self.batches else 0.0,
+            "junctions": junctions,
+        }
+
+
+class JunctionDetectorClient:
+    # Stands in for VehicleDetector inside one junction's engine; detection goes through the shared batcher.
+    def __init__(self, batcher: BatchingDetector, junction_id: str) -> None:
+        self.batcher = batcher
+        self.junction_id = junction_id
+
+    @property
+    def is_ready(self) -> bool:
+        return getattr(self.batcher.detector, "is_ready", True)
+
+    @property
+    def identity(self) -> str:
+        return getattr(self.batcher.detector, "identity", type(self.batcher.detector).__name__)
+
+    def start_loading(self) -> None:
+        if hasattr(self.batcher.detector, "start_loading"):
+            self.batcher.detector.start_loading()
+
+    def detect_batch(self, frames: Mapping[Hashable, np.ndarray], **options) -> Dict[Hashable, np.ndarray]:
+        return self.batcher.submit(self.junction_id, frames, options)
+
+    def detect(self, frame: np.ndarray, **options) -> np.ndarray:
+        return self.detect_batch({0: frame}, **options)[0]
+
+    def draw_detections(self, frame: np.ndarray, detections) -> np.ndarray:
+        return self.batcher.detector.draw_detections(frame, detections)
+
+    def close(self) -> None:
+        self.batcher.release(self.junction_id)
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List
+
+import cv2
+import numpy as np
+
+from .config import (
+    CAPTURE_BUFFER_SIZE,
+    CAPTURE_READ_TIMEOUT,
+    FRAME_HEIGHT,
+    FRAME_WIDTH,
+    SIMULATION_READ_MODE,
+    WEBCAM_READ_MODE,
+)
+from .metrics import metrics
+from .utils import read_lane_frame, skip_frames, split_webcam_into_lanes
+
+READ_MODES = ("latest", "next")
+
+
+class PlaybackPacer:
+    # Plays a file source at its native frame rate; when the wall clock runs ahead of playback,
+    # the frames that are already stale are skipped instead of decoded and queued.
+    def __init__(self, fps: float) -> None:
+        self.interval = 1.0 / fps if fps and fps > 0 else 1.0 / 20.0
+        self._started: float | None = None
+        self._position = 0
+
+    def frames_to_skip(self, stop_event) -> int:
+        now = time.perf_counter()
+        if self._started is None:
+            self._started = now
+            self._position = 1
+            return 0
+        due = int((now - self._started) / self.interval)
+        if due < self._position:
+            stop_event.wait(self._started + self._position * self.interval - now)
+            due = self._position
+        skipped = due - self._position
+        self._position = due + 1
+        return skipped
+
+
+@dataclass
+class CapturedFrame:
+    lane_frames: Dict[int, np.ndarray]
+    sequence: int
+    timestamp: float
+    position: int = -1
+
+
+def source_position(capture: cv2.VideoCapture) -> int:
+    # Index of the frame just decoded from a file source.
+    return int(capture.get(cv2.CAP_PROP_POS_FRAMES)) - 1
+
+
+class FrameRingBuffer:
+    def __init__(self, capacity: int = CAPTURE_BUFFER_SIZE, drop_oldest: bool = False) -> None:
+        self.capacity = max(1, capacity)
+        self.drop_oldest = drop_oldest
+        self._items: deque[CapturedFrame] = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+
+    def put(self, item: CapturedFrame) -> bool:
+        with self._condition:
+            while len(self._items) >= self.capacity and not self.drop_oldest and not self._closed:
+                self._condition.wait()
+            if self._closed:
+                return False
+            if len(self._items) >= self.capacity:
+                self._items.popleft()
+            self._items.append(item)
+            self._condition.notify_all()
+            return True
+
+    def get(self, mode: str, timeout: float | None = None) -> CapturedFrame | None:
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._items or self._closed, timeout=timeout):
+                return None
+            if not self._items:
+                return None
+            if mode == "latest":
+                item = self._items.pop()
+                self._items.clear()
+            else:
+                item = self._items.popleft()
+            self._condition.notify_all()
+            return item
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+class CaptureReader(threading.Thread):
+    def __init__(
+        self,
+        name: str,
+        capture: cv2.VideoCapture,
+        read_frames: Callable[[cv2.VideoCapture], Dict[int, np.ndarray]],
+        buffer_size: int = CAPTURE_BUFFER_SIZE,
+        drop_oldest: bool = False,
+        pacer: PlaybackPacer | None = None,
+        position_of: Callable[[cv2.VideoCapture], int] | None = None,
+    ) -> None:
+        super().__init__(name=name, daemon=True)
+        self.capture = capture
+        self.read_frames = read_frames
+        self.pacer = pacer
+        self.position_of = position_of
+        self.buffer = FrameRingBuffer(buffer_size, drop_oldest=drop_oldest)
+        self.error: Exception | None = None
+        self._stop_event = threading.Event()
+        self._last_item: CapturedFrame | None = None
+        self._sequence = 0
+
+    def run(self) -> None:
+        try:
+            while not self._stop_event.is_set():
+                if self.pacer is not None:
+                    skipped = self.pacer.frames_to_skip(self._stop_event)
+                    if skipped:
+                        skip_frames(self.capture, skipped)
+                        # Skipped frames still consume sequence numbers so readers can count them as dropped.
+                        self._sequence += skipped
+                with metrics.span("capture.decode"):
+                    lane_frames = self.read_frames(self.capture)
+                metrics.increment("capture.frames")
+                position = self.position_of(self.capture) if self.position_of is not None else -1
+                item = CapturedFrame(lane_frames, self._sequence, time.time(), position)
+                self._sequence += 1
+                if not self.buffer.put(item):
+                    break
+        except Exception as error:
+            self.error = error
+        finally:
+            self.buffer.close()
+
+    def read(self, mode: str, timeout: float | None = CAPTURE_READ_TIMEOUT) -> CapturedFrame:
+        item = self.buffer.get(mode, timeout=timeout)
+        if item is None:
+            if self.error is not None:
+                raise RuntimeError(f"{self.name} failed: {self.error}") from self.error
+            if self._last_item is None:
+                raise RuntimeError(f"{self.name} produced no frames within {timeout}s.")
+            # Nothing new decoded yet: repeat the previous frame instead of stalling the pipeline.
+            return self._last_item
+        self._last_item = item
+        return item
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.buffer.close()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout=2.0)
+        if self.capture is not None:
+            self.capture.release()
+
+
+class CaptureGroup:
+    def __init__(self, readers: Iterable[CaptureReader], read_mode: str) -> None:
+        if read_mode not in READ_MODES:
+            raise ValueError(f"Unknown read mode '{read_mode}', expected one of {READ_MODES}.")
+        self.readers: List[CaptureReader] = list(readers)
+        self.read_mode = read_mode
+        self.frame_timestamps: Dict[int, float] = {}
+        self.dropped_frames: Dict[int, int] = {}
+        self.frame_positions: Dict[int, int] = {}
+        self._last_sequences: Dict[str, int] = {}
+
+    def start(self) -> "CaptureGroup":
+        for reader in self.readers:
+            reader.start()
+        return self
+
+    def read(self, mode: str | None = None, timeout: float | None = CAPTURE_READ_TIMEOUT) -> Dict[int, np.ndarray]:
+        lane_frames: Dict[int, np.ndarray] = {}
+        for reader in self.readers:
+            item = reader.read(mode or self.read_mode, timeout=timeout)
+            # Gaps in the sequence are frames that were skipped, overwritten or never read.
+            previous = self._last_sequences.get(reader.name, item.sequence - 1)
+            dropped = max(item.sequence - previous - 1, 0)
+            self._last_sequences[reader.name] = max(previous, item.sequence)
+            for lane_id in item.lane_frames:
+                self.frame_timestamps[lane_id] = item.timestamp
+                if item.position >= 0:
+                    self.frame_positions[lane_id] = item.position
+                self.dropped_frames[lane_id] = self.dropped_frames.get(lane_id, 0) + dropped
+            if dropped:
+                metrics.increment("capture.dropped", dropped)
+            lane_frames.update(item.lane_frames)
+        return lane_frames
+
+    def stop(self) -> None:
+        for reader in self.readers:
+            reader.stop()
+
+
+def start_simulation_capture(
+    captures: Dict[int, cv2.VideoCapture],
+    frame_size: tuple[int, int] = (FRAME_WIDTH, FRAME_HEIGHT),
+    buffer_size: int = CAPTURE_BUFFER_SIZE,
+    read_mode: str = SIMULATION_READ_MODE,
+    realtime: bool = False,
+) -> CaptureGroup:
+    readers = []
+    for lane_id, capture in captures.items():
+        readers.append(
+            CaptureReader(
+                name=f"lane{lane_id}-reader",
+                capture=capture,
+                read_frames=lambda source, lane_id=lane_id: {
+                    lane_id: read_lane_frame(source, lane_id, frame_size)
+                },
+                buffer_size=buffer_size,
+                drop_oldest=realtime,
+                pacer=PlaybackPacer(capture.get(cv2.CAP_PROP_FPS)) if realtime else None,
+                position_of=source_position,
+            )
+        )
+    return CaptureGroup(readers, "latest" if realtime else read_mode).start()
+
+
+def start_webcam_capture(
+    capture: cv2.VideoCapture,
+    lane_ids: Iterable[int],
+    frame_size: tuple[int, int] = (FRAME_WIDTH, FRAME_HEIGHT),
+    buffer_size: int = CAPTURE_BUFFER_SIZE,
+    read_mode: str = WEBCAM_READ_MODE,
+    realtime: bool = False,
+) -> CaptureGroup:
+    lane_ids = list(lane_ids)
+    if realtime:
+        # Keep the driver from queueing frames of its own ahead of ours.
+        capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+    def read_webcam(source: cv2.VideoCapture) -> Dict[int, np.ndarray]:
+        success, frame = source.read()
+        if not success:
+            raise RuntimeError("Could not read frame from webcam.")
+        return split_webcam_into_lanes(frame, lane_ids=lane_ids, frame_size=frame_size)
+
+    # A live camera never waits for the consumer; stale frames are dropped instead.
+    reader = CaptureReader(
+        name="webcam-reader",
+        capture=capture,
+        read_frames=read_webcam,
+        buffer_size=buffer_size,
+        drop_oldest=True,
+    )
+    return CaptureGroup([reader], "latest" if realtime else read_mode).start()
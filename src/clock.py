@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import time
+from typing import Dict
+
+from .config import ENGINE_CLOCKS, SIMULATED_CLOCK_STEP
+
+
+class WallClock:
+    name = "wall"
+
+    def __init__(self) -> None:
+        self.now = time.time()
+
+    def reset(self, positions: Dict[int, int] | None = None) -> float:
+        self.now = time.time()
+        return self.now
+
+    def advance(self, positions: Dict[int, int], timestamps: Dict[int, float]) -> float:
+        self.now = time.time()
+        return self.now
+
+
+class VideoClock:
+    # Media time of the frames just read: frame index / fps, accumulated so it keeps running when a
+    # clip loops. Sources without frame indices (cameras) report their capture timestamps instead.
+    name = "video"
+
+    def __init__(self, frame_rates: Dict[int, float], origin: float | None = None) -> None:
+        self.frame_rates = {lane_id: fps if fps and fps > 0 else 20.0 for lane_id, fps in frame_rates.items()}
+        self.origin = time.time() if origin is None else origin
+        self.now = self.origin
+        self._positions: Dict[int, int] = {}
+        self._elapsed: Dict[int, float] = {lane_id: 0.0 for lane_id in self.frame_rates}
+
+    def reset(self, positions: Dict[int, int] | None = None) -> float:
+        # Frames shown while the model was loading are not part of the controlled timeline.
+        self._positions = dict(positions or {})
+        return self.now
+
+    def advance(self, positions: Dict[int, int], timestamps: Dict[int, float]) -> float:
+        if not positions:
+            self.now = max(max(timestamps.values(), default=self.now), self.now)
+            return self.now
+        for lane_id, position in positions.items():
+            previous = self._positions.get(lane_id, position)
+            # A smaller index means the clip wrapped around to its first frame.
+            frames = position - previous if position >= previous else position + 1
+            self._elapsed[lane_id] = self._elapsed.get(lane_id, 0.0) + frames / self.frame_rates.get(lane_id, 20.0)
+            self._positions[lane_id] = position
+        self.now = self.origin + max(self._elapsed.values())
+        return self.now
+
+
+class SimulatedClock:
+    name = "simulated"
+
+    def __init__(self, step: float = SIMULATED_CLOCK_STEP, origin: float | None = None) -> None:
+        if step <= 0:
+            raise ValueError("Simulated clock step must be positive.")
+        self.step = step
+        self.origin = time.time() if origin is None else origin
+        self.now = self.origin
+        self.ticks = 0
+
+    def reset(self, positions: Dict[int, int] | None = None) -> float:
+        return self.now
+
+    def advance(self, positions: Dict[int, int], timestamps: Dict[int, float]) -> float:
+        self.ticks += 1
+        self.now = self.origin + self.ticks * self.step
+        return self.now
+
+
+def create_clock(
+    kind: str,
+    frame_rates: Dict[int, float] | None = None,
+    step: float = SIMULATED_CLOCK_STEP,
+) -> WallClock | VideoClock | SimulatedClock:
+    if kind == "wall":
+        return WallClock()
+    if kind == "video":
+        return VideoClock(frame_rates or {})
+    if kind == "simulated":
+        return SimulatedClock(step)
+    raise ValueError(f"Unknown clock '{kind}', expected one of {ENGINE_CLOCKS}.")
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import math
+from typing import Dict, Iterable, Tuple
+
+import cv2
+import numpy as np
+
+from .config import FRAME_HEIGHT, FRAME_WIDTH
+
+HEADER_HEIGHT = 57
+HEADER_COLOR = (15, 25, 35)
+GREEN_BORDER = (70, 200, 70)
+RED_BORDER = (70, 70, 220)
+GREEN_TEXT = (60, 220, 60)
+RED_TEXT = (80, 80, 255)
+WHITE = (255, 255, 255)
+# cv2.rectangle with thickness 5 on the cell edge covers exactly this many pixels inward.
+BORDER_THICKNESS = 5
+BORDER_WIDTH = 4
+
+
+class JunctionCompositor:
+    def __init__(
+        self,
+        lane_ids: Iterable[int],
+        lane_names: Dict[int, str],
+        frame_size: tuple[int, int] = (FRAME_WIDTH, FRAME_HEIGHT),
+        columns: int | None = None,
+        rgb_output: bool = True,
+    ) -> None:
+        self.lane_ids = sorted(lane_ids)
+        self.frame_width, self.frame_height = frame_size
+        self.columns = columns or max(1, math.ceil(math.sqrt(len(self.lane_ids))))
+        self.rows = max(1, math.ceil(len(self.lane_ids) / self.columns))
+        self.rgb_output = rgb_output
+
+        self.canvas = np.zeros(
+            (self.rows * self.frame_height, self.columns * self.frame_width, 3), dtype=np.uint8
+        )
+        self._cells: Dict[int, np.ndarray] = {}
+        for index, lane_id in enumerate(self.lane_ids):
+            row, column = divmod(index, self.columns)
+            self._cells[lane_id] = self.canvas[
+                row * self.frame_height : (row + 1) * self.frame_height,
+                column * self.frame_width : (column + 1) * self.frame_width,
+            ]
+
+        self._lane_titles = {
+            lane_id: f"Lane {lane_id} ({lane_names.get(lane_id, lane_id)})" for lane_id in self.lane_ids
+        }
+        self._header = np.empty((min(HEADER_HEIGHT, self.canvas.shape[0]), self.canvas.shape[1], 3), dtype=np.uint8)
+        self._header_text: str | None = None
+        self.header_renders = 0
+
+        # Video is only copied inside the border band, so a border stays on the canvas until its colour changes.
+        self._inner = (
+            slice(BORDER_WIDTH, self.frame_height - BORDER_WIDTH),
+            slice(BORDER_WIDTH, self.frame_width - BORDER_WIDTH),
+        )
+        self._inner_cells = {lane_id: cell[self._inner] for lane_id, cell in self._cells.items()}
+        self._border_colors: Dict[int, Tuple[int, int, int] | None] = {lane_id: None for lane_id in self.lane_ids}
+        self.border_renders = 0
+        # Lane titles and RED labels never change, so each is rasterised once into a glyph patch that is
+        # stamped over the video instead of running putText per lane per frame.
+        self._title_stamps = {
+            lane_id: self._text_stamp(self._lane_titles[lane_id], (14, 30), 0.65, WHITE) for lane_id in self.lane_ids
+        }
+        self._red_stamps = {
+            lane_id: self._text_stamp("RED", (14, self.frame_height - 22), 0.85, RED_TEXT) for lane_id in self.lane_ids
+        }
+
+    def _color(self, bgr: Tuple[int, int, int]) -> Tuple[int, int, int]:
+        return bgr[::-1] if self.rgb_output else bgr
+
+    def _put_text(self, target: np.ndarray, text: str, origin: Tuple[int, int], scale: float, bgr) -> None:
+        cv2.putText(target, text, origin, cv2.FONT_HERSHEY_SIMPLEX, scale, self._color(bgr), 2, cv2.LINE_AA)
+
+    def _text_stamp(self, text: str, origin: Tuple[int, int], scale: float, bgr) -> tuple:
+        glyph = np.zeros((self.frame_height, self.frame_width), dtype=np.uint8)
+        cv2.putText(glyph, text, origin, cv2.FONT_HERSHEY_SIMPLEX, scale, 255, 2, cv2.LINE_AA)
+        x, y, width, height = cv2.boundingRect(glyph)
+        glyph = glyph[y : y + height, x : x + width]
+        region = (slice(y, y + height), slice(x, x + width))
+        if bgr == WHITE:
+            # White text: the per-pixel max of video and glyph keeps the anti-aliased edges.
+            return region, cv2.merge([glyph, glyph, glyph]), None
+        return region, np.full((height, width, 3), self._color(bgr), dtype=np.uint8), (glyph >= 128).astype(np.uint8)
+
+    def _stamp(self, cell: np.ndarray, stamp: tuple) -> None:
+        region, patch, mask = stamp
+        target = cell[region]
+        if mask is None:
+            cv2.max(target, patch, dst=target)
+        else:
+            cv2.copyTo(patch, mask, target)
+
+    def _render_border(self, lane_id: int, bgr: Tuple[int, int, int]) -> None:
+        if self._border_colors[lane_id] == bgr:
+            return
+        cv2.rectangle(
+            self._cells[lane_id],
+            (0, 0),
+            (self.frame_width - 1, self.frame_height - 1),
+            self._color(bgr),
+            BORDER_THICKNESS,
+        )
+        self._border_colors[lane_id] = bgr
+        self.border_renders += 1
+
+    def _render_header(self, text: str) -> None:
+        # The header sits on a solid band, so it is only rasterised again when its text changes.
+        if text == self._header_text:
+            return
+        self._header[:] = self._color(HEADER_COLOR)
+        self._put_text(self._header, text, (15, 36), 0.85, WHITE)
+        self._header_text = text
+        self.header_renders += 1
+
+    def compose(
+        self,
+        lane_frames: Dict[int, np.ndarray],
+        lane_counts: Dict[int, int],
+        signal_state: dict,
+    ) -> np.ndarray:
+        current_green_lane = signal_state["current_green_lane"]
+        waiting_times = signal_state["waiting_times"]
+        priority_scores = signal_state["priority_scores"]
+
+        for lane_id, cell in self._cells.items():
+            inner_cell = self._inner_cells[lane_id]
+            frame = lane_frames.get(lane_id)
+            if frame is None:
+                inner_cell.fill(0)
+            else:
+                if frame.shape[:2] != cell.shape[:2]:
+                    frame = cv2.resize(frame, (self.frame_width, self.frame_height))
+                # Write straight into the canvas view; RGB conversion happens during the copy.
+                if self.rgb_output:
+                    cv2.cvtColor(frame[self._inner], cv2.COLOR_BGR2RGB, dst=inner_cell)
+                else:
+                    np.copyto(inner_cell, frame[self._inner])
+
+            is_green = lane_id == current_green_lane
+            self._render_border(lane_id, GREEN_BORDER if is_green else RED_BORDER)
+            self._stamp(cell, self._title_stamps[lane_id])
+
+            # Values change from tick to tick and sit over live video, so they are drawn every frame.
+            self._put_text(cell, f"Count: {lane_counts[lane_id]}", (14, 54), 0.65, WHITE)
+            self._put_text(cell, f"Waiting: {waiting_times[lane_id]:.1f}s", (14, 78), 0.65, WHITE)
+            self._put_text(cell, f"Priority: {priority_scores[lane_id]:.2f}", (14, 102), 0.65, WHITE)
+
+            if is_green:
+                self._put_text(cell, f"GREEN: {signal_state['countdown']}s", (14, self.frame_height - 22), 0.85, GREEN_TEXT)
+            else:
+                self._stamp(cell, self._red_stamps[lane_id])
+
+        self._render_header(
+            f"Smart Traffic AI | Current Green Lane: {current_green_lane} | Countdown: {signal_state['countdown']}s"
+        )
+        np.copyto(self.canvas[: self._header.shape[0]], self._header)
+        return self.canvas
@@ -27,6 +27,130 @@ MIN_GREEN_TIME = 15
 MAX_GREEN_TIME = 60
 TOTAL_CYCLE_TIME = 120
 
+# Green time for a lane whose count falls at or below each threshold; the last value covers heavier traffic.
+DENSITY_THRESHOLDS = (10, 25, 50)
+DENSITY_GREEN_TIMES = (15, 25, 40, 60)
+# Written by src.timing_tuner and loaded by the engine when present; kept out of the source tree.
+SIGNAL_TIMING_FILE = LOGS_DIR / "tuning" / "signal_timing.json"
+
 FRAME_WIDTH = 640
 FRAME_HEIGHT = 360
 DISPLAY_FPS = 8
+
+CAPTURE_BUFFER_SIZE = 4
+CAPTURE_READ_TIMEOUT = 2.0
+SIMULATION_READ_MODE = "next"
+WEBCAM_READ_MODE = "latest"
+
+ENGINE_TARGET_FPS = 0.0
+LOG_INTERVAL_SECONDS = 1.0
+HISTORY_LENGTH = 500
+
+MODEL_BACKEND = "torch"
+MODEL_WARMUP_RUNS = 1
+
+MODEL_EXPORTS_DIR = MODELS_DIR / "exports"
+INFERENCE_IMAGE_SIZE = (384, 640)
+
+MOTION_GATING_ENABLED = True
+MOTION_THRESHOLD = 0.01
+INFERENCE_MIN_INTERVAL = 1
+INFERENCE_MAX_STALENESS = 8
+
+TRACKING_ENABLED = True
+TRACK_IOU_THRESHOLD = 0.30
+TRACK_MIN_HITS = 2
+TRACK_MAX_MISSES = 3
+TRACK_STATIONARY_SPEED = 8.0
+ARRIVAL_RATE_WINDOW = 30.0
+
+# Per-lane region of interest as (x, y) points normalised to the lane frame; lanes not listed use the full frame.
+LANE_ROIS = {}
+
+LOG_BATCH_SIZE = 20
+LOG_FLUSH_INTERVAL = 5.0
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_ROTATE_DAILY = True
+
+HISTORY_DIR = LOGS_DIR / "history"
+HISTORY_JUNCTION = "junction1"
+HISTORY_STORE_ENABLED = True
+
+METRICS_ENABLED = False
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 9108
+
+SIMULATION_TICK_SECONDS = 1.0
+SIMULATION_SATURATION_FLOW = 0.5
+
+TUNING_DIR = LOGS_DIR / "tuning"
+
+JUNCTIONS_FILE = BASE_DIR / "junctions.json"
+BATCH_MAX_FRAMES = 32
+BATCH_MAX_WAIT = 0.02
+# Capture processes per junction unless a junction sets its own; SHM_CAPTURE_PROCESSES each would
+# mean hundreds of processes on a busy server.
+JUNCTION_CAPTURE_PROCESSES = 1
+
+# "shm" decodes in capture processes that write into shared-memory rings, "thread" keeps decode
+# in-process, "mmap" replays pre-decoded simulation frames, "auto" picks "shm" on multi-core machines.
+CAPTURE_TRANSPORT = "auto"
+SHM_RING_SLOTS = 4
+SHM_CAPTURE_PROCESSES = 4
+
+# Real-time mode always processes the newest frame and shrinks the inference size while the
+# end-to-end latency (capture to signal decision) stays over budget.
+REALTIME_MODE = False
+REALTIME_LATENCY_BUDGET = 0.25
+REALTIME_SCALES = (1.0, 0.85, 0.7, 0.5)
+REALTIME_PATIENCE = 5
+
+# Synthetic scenarios: base arrival rate (vehicles/s) and speed (px/frame) per lane, scaled over the
+# clip by a profile of (fraction of duration, rate multiplier) breakpoints.
+SYNTHETIC_LANES = {
+    1: {"rate": 0.5, "speed": 2.3},
+    2: {"rate": 0.7, "speed": 2.8},
+    3: {"rate": 1.0, "speed": 3.2},
+    4: {"rate": 1.4, "speed": 3.8},
+}
+SYNTHETIC_PROFILES = {
+    "constant": ((0.0, 1.0), (1.0, 1.0)),
+    "rush_hour": ((0.0, 0.4), (0.35, 1.6), (0.65, 1.6), (1.0, 0.4)),
+    "pulse": ((0.0, 0.2), (0.2, 2.0), (0.3, 0.2), (0.7, 0.2), (0.8, 2.0), (1.0, 0.2)),
+}
+SYNTHETIC_PROFILE = "constant"
+SYNTHETIC_BATCH_FRAMES = 64
+
+# Detections for replayed file and synthetic frames are reused, keyed by source content, frame index
+# and detector settings; the disk tier keeps them across runs.
+DETECTION_CACHE_ENABLED = True
+DETECTION_CACHE_SIZE = 8192
+DETECTION_CACHE_DISK = False
+DETECTION_CACHE_DIR = BASE_DIR / "cache" / "detections"
+
+# Pre-decoded simulation frames (capture transport "mmap"): each clip is decoded once into a
+# memory-mapped uint8 array that every process and dashboard session reads from the page cache.
+FRAME_CACHE_DIR = BASE_DIR / "cache" / "frames"
+
+# Clock feeding the signal controller and lane counters: "wall" uses real time, "video" advances by
+# source frame index / fps, "simulated" by a fixed step per engine tick. Video and simulated time make
+# signal timelines reproducible and let recorded footage run faster than real time.
+ENGINE_CLOCK = "wall"
+ENGINE_CLOCKS = ("wall", "video", "simulated")
+SIMULATED_CLOCK_STEP = 0.05
+
+# Counting engine: "yolo" runs the detection model, "bgsub" uses MOG2 background subtraction with blob
+# analysis for boxes too old to run the model, "auto" runs the model and hands counting to background
+# subtraction while the model's per-frame latency stays over budget, probing it again periodically.
+DETECTOR_ENGINE = "yolo"
+DETECTOR_ENGINES = ("yolo", "bgsub", "auto")
+DETECTOR_LATENCY_BUDGET = 0.08
+DETECTOR_SWITCH_PATIENCE = 5
+DETECTOR_PROBE_INTERVAL = 50
+# Blob areas are in lane-frame pixels; merged blobs in a queue count as area / BGSUB_VEHICLE_AREA vehicles.
+BGSUB_SCALE = 0.5
+BGSUB_HISTORY = 200
+BGSUB_VAR_THRESHOLD = 32.0
+BGSUB_WARMUP_FRAMES = 10
+BGSUB_MIN_AREA = 200
+BGSUB_VEHICLE_AREA = 2000
@@ -0,0 +1,336 @@
+from __future__ import annotations
+
+import time
+from typing import Dict, Hashable, Mapping
+
+import cv2
+import numpy as np
+
+from .config import (
+    BGSUB_HISTORY,
+    BGSUB_MIN_AREA,
+    BGSUB_SCALE,
+    BGSUB_VAR_THRESHOLD,
+    BGSUB_VEHICLE_AREA,
+    BGSUB_WARMUP_FRAMES,
+    CONFIDENCE_THRESHOLD,
+    DETECTOR_ENGINES,
+    DETECTOR_LATENCY_BUDGET,
+    DETECTOR_PROBE_INTERVAL,
+    DETECTOR_SWITCH_PATIENCE,
+    IOU_THRESHOLD,
+)
+from .detector import DETECTION_DTYPE, LABEL_NAMES, VehicleDetector, empty_detections
+from .metrics import metrics
+from .realtime import LaneLatency
+
+CAR_LABEL = LABEL_NAMES.index("car")
+
+
+class LaneBackground:
+    __slots__ = ("subtractor", "frames", "road_pixels", "occupancy", "vehicles")
+
+    def __init__(self, history: int, var_threshold: float) -> None:
+        self.subtractor = cv2.createBackgroundSubtractorMOG2(
+            history=history, varThreshold=var_threshold, detectShadows=True
+        )
+        self.frames = 0
+        self.road_pixels = 0
+        self.occupancy = 0.0
+        self.vehicles = 0
+
+
+class BackgroundSubtractionDetector:
+    # Same interface as VehicleDetector, but stateful: each key (lane) keeps its own background model,
+    # so a key must always be fed frames from the same camera.
+    # Output depends on every frame seen before, so a replayed frame cannot reuse an earlier result.
+    cacheable = False
+    draw_detections = staticmethod(VehicleDetector.draw_detections)
+
+    def __init__(
+        self,
+        scale: float = BGSUB_SCALE,
+        history: int = BGSUB_HISTORY,
+        var_threshold: float = BGSUB_VAR_THRESHOLD,
+        min_area: float = BGSUB_MIN_AREA,
+        vehicle_area: float = BGSUB_VEHICLE_AREA,
+        warmup_frames: int = BGSUB_WARMUP_FRAMES,
+    ) -> None:
+        if not 0.0 < scale <= 1.0:
+            raise ValueError("Background subtraction scale must lie in (0, 1].")
+        self.confidence_threshold = CONFIDENCE_THRESHOLD
+        self.iou_threshold = IOU_THRESHOLD
+        self.scale = scale
+        self.history = history
+        self.var_threshold = var_threshold
+        self.min_area = min_area
+        self.vehicle_area = vehicle_area
+        self.warmup_frames = warmup_frames
+        self._lanes: Dict[Hashable, LaneBackground] = {}
+        self._open_kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+        self._close_kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (7, 7))
+
+    @property
+    def identity(self) -> str:
+        return (
+            f"bgsub-{self.scale}-{self.history}-{self.var_threshold}-{self.min_area}-{self.vehicle_area}"
+            f"-{self.warmup_frames}"
+        )
+
+    @property
+    def is_ready(self) -> bool:
+        return True
+
+    def load(self) -> "BackgroundSubtractionDetector":
+        return self
+
+    def start_loading(self) -> None:
+        pass
+
+    def detect(
+        self,
+        frame,
+        confidence_threshold: float | None = None,
+        iou_threshold: float | None = None,
+        image_size: tuple[int, int] | None = None,
+        key: Hashable = None,
+    ) -> np.ndarray:
+        return self._detect(key, frame)
+
+    def detect_batch(
+        self,
+        frames: Mapping[Hashable, object],
+        confidence_threshold: float | None = None,
+        iou_threshold: float | None = None,
+        image_size: tuple[int, int] | None = None,
+    ) -> Dict[Hashable, np.ndarray]:
+        # The model thresholds and input size have no meaning here; blobs are filtered by area instead.
+        metrics.increment("detector.frames", len(frames))
+        with metrics.span("detector.bgsub"):
+            return {key: self._detect(key, frame) for key, frame in frames.items()}
+
+    def learn_batch(self, frames: Mapping[Hashable, object]) -> None:
+        # Updates each lane's background model without the blob analysis, for when counts come from elsewhere.
+        with metrics.span("detector.bgsub_learn"):
+            for key, frame in frames.items():
+                self._learn(key, frame)
+
+    def _learn(self, key: Hashable, frame: np.ndarray) -> tuple[LaneBackground, np.ndarray]:
+        state = self._lanes.get(key)
+        if state is None:
+            state = self._lanes[key] = LaneBackground(self.history, self.var_threshold)
+
+        height, width = frame.shape[:2]
+        size = (max(1, round(width * self.scale)), max(1, round(height * self.scale)))
+        # Colour input: on grey levels alone MOG2 mistakes most vehicles for shadows.
+        small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        mask = state.subtractor.apply(small)
+        if state.frames == 0:
+            # Pixels masked out by a lane ROI are black in every frame and are not road.
+            state.road_pixels = cv2.countNonZero(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)) or mask.size
+        state.frames += 1
+        return state, mask
+
+    def _detect(self, key: Hashable, frame: np.ndarray) -> np.ndarray:
+        state, mask = self._learn(key, frame)
+        if state.frames <= self.warmup_frames:
+            return empty_detections()
+
+        # MOG2 marks shadows as 127; only confident foreground (255) survives.
+        _, mask = cv2.threshold(mask, 200, 255, cv2.THRESH_BINARY)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, self._open_kernel)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, self._close_kernel)
+        state.occupancy = cv2.countNonZero(mask) / state.road_pixels
+
+        _, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+        stats = stats[1:]
+        areas = stats[:, cv2.CC_STAT_AREA] / (self.scale * self.scale)
+        keep = areas >= self.min_area
+        stats, areas = stats[keep], areas[keep]
+        if not len(stats):
+            state.vehicles = 0
+            return empty_detections()
+
+        # A queue of touching vehicles merges into one blob; its area says how many it holds, and the
+        # blob is split into that many boxes along its long side.
+        vehicles = np.maximum(np.rint(areas / self.vehicle_area), 1).astype(np.intp)
+        total = int(vehicles.sum())
+        state.vehicles = total
+        blob = np.repeat(np.arange(len(stats)), vehicles)
+        part = np.arange(total) - np.repeat(np.cumsum(vehicles) - vehicles, vehicles)
+        pieces = vehicles[blob]
+        x = stats[blob, cv2.CC_STAT_LEFT] / self.scale
+        y = stats[blob, cv2.CC_STAT_TOP] / self.scale
+        w = stats[blob, cv2.CC_STAT_WIDTH] / self.scale
+        h = stats[blob, cv2.CC_STAT_HEIGHT] / self.scale
+        vertical = h >= w
+
+        detections = np.empty(total, dtype=DETECTION_DTYPE)
+        detections["x1"] = np.where(vertical, x, x + w * part / pieces)
+        detections["x2"] = np.where(vertical, x + w, x + w * (part + 1) / pieces)
+        detections["y1"] = np.where(vertical, y + h * part / pieces, y)
+        detections["y2"] = np.where(vertical, y + h * (part + 1) / pieces, y + h)
+        # How solidly the blob fills its box stands in for a confidence score.
+        detections["confidence"] = np.clip(areas[blob] / np.maximum(w * h, 1.0), 0.0, 1.0)
+        detections["label_id"] = CAR_LABEL
+        return detections
+
+    def stats(self) -> dict:
+        return {
+            "engine": "bgsub",
+            "occupancy": {key: round(state.occupancy, 4) for key, state in self._lanes.items()},
+            "vehicles": {key: state.vehicles for key, state in self._lanes.items()},
+        }
+
+    def reset(self) -> None:
+        self._lanes.clear()
+
+
+class AdaptiveDetector:
+    # Background subtraction sees every batch so its background stays current, and takes over the
+    # counting whenever the model is still loading or has been too slow for `patience` batches in a row.
+    cacheable = False
+    draw_detections = staticmethod(VehicleDetector.draw_detections)
+
+    def __init__(
+        self,
+        primary,
+        fallback: BackgroundSubtractionDetector | None = None,
+        budget: float = DETECTOR_LATENCY_BUDGET,
+        patience: int = DETECTOR_SWITCH_PATIENCE,
+        probe_interval: int = DETECTOR_PROBE_INTERVAL,
+    ) -> None:
+        self.primary = primary
+        self.fallback = fallback or BackgroundSubtractionDetector()
+        self.budget = budget
+        self.patience = max(1, patience)
+        self.probe_interval = max(1, probe_interval)
+        self.active = "yolo"
+        self.switches = 0
+        self.error: str | None = None
+        self.latencies = {"yolo": LaneLatency(), "bgsub": LaneLatency()}
+        self._over_budget = 0
+        self._since_probe = 0
+
+    @property
+    def confidence_threshold(self) -> float:
+        return self.primary.confidence_threshold
+
+    @confidence_threshold.setter
+    def confidence_threshold(self, value: float) -> None:
+        self.primary.confidence_threshold = value
+
+    @property
+    def iou_threshold(self) -> float:
+        return self.primary.iou_threshold
+
+    @iou_threshold.setter
+    def iou_threshold(self, value: float) -> None:
+        self.primary.iou_threshold = value
+
+    @property
+    def identity(self) -> str:
+        if self.active == "yolo" and self._primary_ready():
+            return getattr(self.primary, "identity", type(self.primary).__name__)
+        return self.fallback.identity
+
+    @property
+    def is_ready(self) -> bool:
+        return True
+
+    def load(self) -> "AdaptiveDetector":
+        if hasattr(self.primary, "load"):
+            self.primary.load()
+        return self
+
+    def start_loading(self) -> None:
+        if hasattr(self.primary, "start_loading"):
+            self.primary.start_loading()
+
+    def _primary_ready(self) -> bool:
+        if self.error is not None:
+            return False
+        try:
+            return getattr(self.primary, "is_ready", True)
+        except RuntimeError as error:
+            # The model failed to load; counting carries on with background subtraction alone.
+            self.error = str(error)
+            return False
+
+    def _switch(self, engine: str) -> None:
+        self.active = engine
+        self.switches += 1
+        self._over_budget = 0
+        self._since_probe = 0
+        # The average from before the switch says nothing about how the model copes from here on.
+        latency = self.latencies["yolo"]
+        latency.mean = latency.last
+        metrics.increment("detector.switches")
+
+    def _fallback_batch(self, frames: Mapping[Hashable, object], options: dict) -> Dict[Hashable, np.ndarray]:
+        started = time.perf_counter()
+        detections = self.fallback.detect_batch(frames, **options)
+        self.latencies["bgsub"].update((time.perf_counter() - started) / len(frames))
+        return detections
+
+    def detect(self, frame, **options) -> np.ndarray:
+        return self.detect_batch({None: frame}, **options)[None]
+
+    def detect_batch(self, frames: Mapping[Hashable, object], **options) -> Dict[Hashable, np.ndarray]:
+        if not frames:
+            return {}
+        if not self._primary_ready():
+            return self._fallback_batch(frames, options)
+        self._since_probe += 1
+        if self.active == "bgsub" and self._since_probe < self.probe_interval:
+            return self._fallback_batch(frames, options)
+        if self.active == "bgsub":
+            fallback_detections = self._fallback_batch(frames, options)
+        else:
+            # While the model counts, background subtraction only keeps learning, so a later switch
+            # finds a current background without paying for blob analysis on every batch.
+            self.fallback.learn_batch(frames)
+
+        started = time.perf_counter()
+        detections = self.primary.detect_batch(frames, **options)
+        latency = self.latencies["yolo"]
+        latency.update((time.perf_counter() - started) / len(frames))
+        metrics.observe("detector.model_frame_latency", latency.last * 1000.0)
+
+        # Results always come from the engine that was active when the batch started, which is the
+        # one the detection cache was keyed for.
+        if self.active == "yolo":
+            self._over_budget = self._over_budget + 1 if latency.mean > self.budget else 0
+            if self._over_budget >= self.patience:
+                self._switch("bgsub")
+            return detections
+        self._since_probe = 0
+        # Probes are probe_interval batches apart, so the latest one decides rather than a slow-moving average.
+        if latency.last < 0.8 * self.budget:
+            self._switch("yolo")
+        return fallback_detections
+
+    def stats(self) -> dict:
+        stats = self.fallback.stats()
+        stats.update(
+            {
+                "engine": self.active if self._primary_ready() else "bgsub",
+                "switches": self.switches,
+                "frame_latency_ms": {
+                    engine: round(latency.mean * 1000.0, 1) for engine, latency in self.latencies.items()
+                },
+            }
+        )
+        if self.error is not None:
+            stats["error"] = self.error
+        return stats
+
+
+def create_detector(engine: str, model_detector):
+    if engine == "yolo":
+        return model_detector
+    if engine == "bgsub":
+        return BackgroundSubtractionDetector()
+    if engine == "auto":
+        return AdaptiveDetector(model_detector)
+    raise ValueError(f"Unknown detector engine '{engine}', expected one of {DETECTOR_ENGINES}.")
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import hashlib
+import struct
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Tuple
+
+import numpy as np
+
+from .backends import file_hash
+from .config import DETECTION_CACHE_SIZE
+from .detector import DETECTION_DTYPE
+from .metrics import metrics
+
+_source_ids: Dict[Tuple[str, int, int], str] = {}
+# Disk records: frame index, payload length, then the zlib-compressed detection array.
+RECORD_HEADER = struct.Struct("<qI")
+
+
+def source_identity(path: Path) -> str:
+    # Content hash, memoised on size and mtime so re-opening the same clip does not re-read it.
+    path = Path(path)
+    stat = path.stat()
+    key = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+    if key not in _source_ids:
+        _source_ids[key] = file_hash(path)
+    return _source_ids[key]
+
+
+def settings_digest(*parts) -> str:
+    return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()[:16]
+
+
+class DetectionCache:
+    def __init__(self, capacity: int = DETECTION_CACHE_SIZE, disk_dir: Path | None = None) -> None:
+        self.capacity = max(1, capacity)
+        self.disk_dir = Path(disk_dir) if disk_dir is not None else None
+        self.settings: str | None = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries: OrderedDict[Tuple[str, int], np.ndarray] = OrderedDict()
+        self._logs: Dict[str, "DetectionLog"] = {}
+
+    def configure(self, settings: str) -> None:
+        # Detections depend on the model, thresholds, input size and crop. A new combination makes
+        # every in-memory entry stale; disk entries live under a directory per combination.
+        if settings == self.settings:
+            return
+        if self.settings is not None:
+            self.invalidations += 1
+            metrics.increment("detection_cache.invalidations")
+        self._entries.clear()
+        self._close_logs()
+        self.settings = settings
+
+    def _log(self, source_id: str) -> "DetectionLog":
+        log = self._logs.get(source_id)
+        if log is None:
+            log = self._logs[source_id] = DetectionLog(self.disk_dir / self.settings / f"{source_id}.detlog")
+        return log
+
+    def _remember(self, key: Tuple[str, int], detections: np.ndarray) -> None:
+        self._entries[key] = detections
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def get(self, source_id: str, frame_index: int) -> np.ndarray | None:
+        if self.settings is None:
+            raise RuntimeError("DetectionCache.configure() must be called before lookups.")
+        key = (source_id, frame_index)
+        detections = self._entries.get(key)
+        if detections is not None:
+            self._entries.move_to_end(key)
+            self.memory_hits += 1
+            metrics.increment("detection_cache.hits")
+            return detections.copy()
+
+        if self.disk_dir is not None:
+            detections = self._log(source_id).read(frame_index)
+            if detections is not None:
+                self._remember(key, detections)
+                self.disk_hits += 1
+                metrics.increment("detection_cache.hits")
+                return detections.copy()
+
+        self.misses += 1
+        metrics.increment("detection_cache.misses")
+        return None
+
+    def put(self, source_id: str, frame_index: int, detections: np.ndarray) -> None:
+        if self.settings is None:
+            raise RuntimeError("DetectionCache.configure() must be called before storing detections.")
+        detections = np.ascontiguousarray(detections, dtype=DETECTION_DTYPE)
+        self._remember((source_id, frame_index), detections.copy())
+        if self.disk_dir is not None:
+            self._log(source_id).append(frame_index, detections)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _close_logs(self) -> None:
+        for log in self._logs.values():
+            log.close()
+        self._logs.clear()
+
+    def close(self) -> None:
+        self._close_logs()
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "entries": len(self._entries),
+            "invalidations": self.invalidations,
+        }
+
+
+class DetectionLog:
+    # Append-only file of compressed per-frame detections for one source under one settings digest.
+    # Small entries would waste a filesystem block each as separate files.
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._index: Dict[int, Tuple[int, int]] = {}
+        self._handle = self.path.open("a+b")
+        self._scan()
+
+    def _scan(self) -> None:
+        size = self._handle.seek(0, 2)
+        self._handle.seek(0)
+        offset = 0
+        while True:
+            header = self._handle.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                break
+            frame_index, length = RECORD_HEADER.unpack(header)
+            payload_offset = offset + RECORD_HEADER.size
+            if payload_offset + length > size:
+                break
+            self._handle.seek(length, 1)
+            self._index[frame_index] = (payload_offset, length)
+            offset = payload_offset + length
+        # Drop a record cut short by an interrupted run so new records start on a boundary.
+        self._handle.truncate(offset)
+
+    def read(self, frame_index: int) -> np.ndarray | None:
+        location = self._index.get(frame_index)
+        if location is None:
+            return None
+        offset, length = location
+        self._handle.seek(offset)
+        return np.frombuffer(zlib.decompress(self._handle.read(length)), dtype=DETECTION_DTYPE).copy()
+
+    def append(self, frame_index: int, detections: np.ndarray) -> None:
+        if frame_index in self._index:
+            return
+        payload = zlib.compress(detections.tobytes(), 6)
+        offset = self._handle.seek(0, 2)
+        self._handle.write(RECORD_HEADER.pack(frame_index, len(payload)) + payload)
+        self._handle.flush()
+        self._index[frame_index] = (offset + RECORD_HEADER.size, len(payload))
+
+    def close(self) -> None:
+        self._handle.close()
@@ -1,14 +1,37 @@
 from __future__ import annotations
 
-import shutil
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, Hashable, List, Mapping, Sequence, Tuple, Union
 
 import cv2
-from ultralytics import YOLO
-
-from .config import CONFIDENCE_THRESHOLD, DETECTION_CLASSES, IOU_THRESHOLD, MODEL_PATH
+import numpy as np
+
+from .config import (
+    CONFIDENCE_THRESHOLD,
+    DETECTION_CLASSES,
+    INFERENCE_IMAGE_SIZE,
+    IOU_THRESHOLD,
+    MODEL_BACKEND,
+    MODEL_PATH,
+)
+from .backends import file_hash
+from .metrics import metrics
+from .model_registry import get_model, model_error, model_status, preload_model
+
+
+LABEL_NAMES: Tuple[str, ...] = ("car", "bike", "bus", "truck")
+
+DETECTION_DTYPE = np.dtype(
+    [
+        ("x1", np.int32),
+        ("y1", np.int32),
+        ("x2", np.int32),
+        ("y2", np.int32),
+        ("confidence", np.float32),
+        ("label_id", np.int8),
+    ]
+)
 
 
 @dataclass
@@ -18,39 +41,75 @@ class Detection:
     label: str
 
 
+Detections = Union[np.ndarray, Sequence[Detection]]
+
+
+def empty_detections() -> np.ndarray:
+    return np.empty(0, dtype=DETECTION_DTYPE)
+
+
+def as_detection_objects(detections: np.ndarray) -> List[Detection]:
+    return [
+        Detection(bbox=(x1, y1, x2, y2), confidence=confidence, label=LABEL_NAMES[label_id])
+        for x1, y1, x2, y2, confidence, label_id in detections.tolist()
+    ]
+
+
 class VehicleDetector:
+    cacheable = True
+
     def __init__(
         self,
         model_path: Path = MODEL_PATH,
         confidence_threshold: float = CONFIDENCE_THRESHOLD,
         iou_threshold: float = IOU_THRESHOLD,
+        backend: str = MODEL_BACKEND,
     ) -> None:
         self.confidence_threshold = confidence_threshold
         self.iou_threshold = iou_threshold
         self.target_classes = set(DETECTION_CLASSES)
-        self.model = self._load_model(model_path)
-
-    def _load_model(self, model_path: Path) -> YOLO:
-        model_path = Path(model_path)
-        should_use_local = model_path.exists() and model_path.stat().st_size > 1_000_000
-        model_source = str(model_path) if should_use_local else "yolov8n.pt"
-
-        try:
-            model = YOLO(model_source)
-        except Exception:
-            model = YOLO("yolov8n.pt")
-
-        # Keep a local copy in /models when possible for predictable project layout.
-        if not should_use_local:
-            try:
-                checkpoint_path = Path(model.ckpt_path)
-                model_path.parent.mkdir(parents=True, exist_ok=True)
-                if checkpoint_path.exists() and checkpoint_path != model_path:
-                    shutil.copy(checkpoint_path, model_path)
-            except Exception:
-                pass
-
-        return model
+        self.backend = backend
+        self.model_path = model_path
+        # The model loads on first use, or in the background after start_loading().
+        self._model = None
+        self._identity: str | None = None
+        self._label_lookup: np.ndarray | None = None
+        self._class_ids: List[int] = []
+
+    @property
+    def model(self):
+        if self._model is None:
+            self.load()
+        return self._model
+
+    def load(self) -> "VehicleDetector":
+        if self._model is None:
+            model = get_model(self.model_path, self.backend)
+            self._label_lookup, self._class_ids = self._build_label_lookup(model.names)
+            self._model = model
+        return self
+
+    @property
+    def identity(self) -> str:
+        # Changes whenever the weights or the runtime change, so cached detections can be told apart.
+        if self._identity is None:
+            model_path = Path(self.model_path)
+            weights = file_hash(model_path) if model_path.exists() else model_path.name
+            self._identity = f"{weights}-{self.backend}"
+        return self._identity
+
+    def start_loading(self) -> None:
+        if self._model is None:
+            preload_model(self.model_path, self.backend)
+
+    @property
+    def is_ready(self) -> bool:
+        if self._model is not None:
+            return True
+        status = model_status(self.model_path, self.backend)
+        if status == "failed":
+            raise RuntimeError(f"Model failed to load: {model_error(self.model_path, self.backend)}")
+        return status == "ready"
 
     @staticmethod
     def _normalize_label(label: str) -> str:
@@ -58,45 +117,103 @@ class VehicleDetector:
             return "bike"
         return label
 
-    def detect(self, frame) -> List[Detection]:
+    def _build_label_lookup(self, names: Mapping[int, str]) -> Tuple[np.ndarray, List[int]]:
+        # Maps model class id -> index into LABEL_NAMES, or -1 for classes we ignore.
+        lookup = np.full(max(names) + 1, -1, dtype=np.int8)
+        for class_id, class_name in names.items():
+            if class_name in self.target_classes:
+                lookup[class_id] = LABEL_NAMES.index(self._normalize_label(class_name))
+        return lookup, [int(class_id) for class_id in np.flatnonzero(lookup >= 0)]
+
+    def detect(
+        self,
+        frame,
+        confidence_threshold: float | None = None,
+        iou_threshold: float | None = None,
+        image_size: tuple[int, int] | None = None,
+    ) -> np.ndarray:
         results = self.model.predict(
             source=frame,
-            conf=self.confidence_threshold,
-            iou=self.iou_threshold,
+            conf=self.confidence_threshold if confidence_threshold is None else confidence_threshold,
+            iou=self.iou_threshold if iou_threshold is None else iou_threshold,
+            classes=self._class_ids,
+            imgsz=image_size or INFERENCE_IMAGE_SIZE,
             verbose=False,
         )
         if not results:
-            return []
-
-        result = results[0]
-        detections: List[Detection] = []
-
-        for box in result.boxes:
-            class_id = int(box.cls[0])
-            class_name = result.names[class_id]
-            if class_name not in self.target_classes:
-                continue
-
-            x1, y1, x2, y2 = map(int, box.xyxy[0].tolist())
-            confidence = float(box.conf[0])
-            detections.append(
-                Detection(
-                    bbox=(x1, y1, x2, y2),
-                    confidence=confidence,
-                    label=self._normalize_label(class_name),
-                )
+            return empty_detections()
+        return self._parse_result(results[0])
+
+    def detect_batch(
+        self,
+        frames: Mapping[Hashable, object],
+        confidence_threshold: float | None = None,
+        iou_threshold: float | None = None,
+        image_size: tuple[int, int] | None = None,
+    ) -> Dict[Hashable, np.ndarray]:
+        # One forward pass for every lane (or junction/lane pair) instead of one per frame.
+        keys = list(frames.keys())
+        if not keys:
+            return {}
+
+        metrics.increment("detector.frames", len(keys))
+        with metrics.span("detector.predict"):
+            results = self.model.predict(
+                source=[frames[key] for key in keys],
+                conf=self.confidence_threshold if confidence_threshold is None else confidence_threshold,
+                iou=self.iou_threshold if iou_threshold is None else iou_threshold,
+                classes=self._class_ids,
+                imgsz=image_size or INFERENCE_IMAGE_SIZE,
+                verbose=False,
             )
+        detections: Dict[Hashable, np.ndarray] = {key: empty_detections() for key in keys}
+        for key, result in zip(keys, results):
+            detections[key] = self._parse_result(result)
+        return detections
 
+    def detect_objects(self, frame, **thresholds) -> List[Detection]:
+        return as_detection_objects(self.detect(frame, **thresholds))
+
+    def _parse_result(self, result) -> np.ndarray:
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            return empty_detections()
+
+        # boxes.data is (N, 6): x1, y1, x2, y2, confidence, class id.
+        data = boxes.data
+        if hasattr(data, "cpu"):
+            data = data.cpu().numpy()
+        data = np.asarray(data)
+
+        label_ids = self._label_lookup[data[:, 5].astype(np.intp)]
+        keep = label_ids >= 0
+
+        detections = np.empty(int(keep.sum()), dtype=DETECTION_DTYPE)
+        kept = data[keep]
+        detections["x1"] = kept[:, 0]
+        detections["y1"] = kept[:, 1]
+        detections["x2"] = kept[:, 2]
+        detections["y2"] = kept[:, 3]
+        detections["confidence"] = kept[:, 4]
+        detections["label_id"] = label_ids[keep]
         return detections
 
     @staticmethod
-    def draw_detections(frame, detections: List[Detection]):
-        for detection in detections:
-            x1, y1, x2, y2 = detection.bbox
+    def draw_detections(frame, detections: Detections):
+        if isinstance(detections, np.ndarray):
+            boxes = detections.tolist()
+        else:
+            boxes = [
+                (*detection.bbox, detection.confidence, detection.label) for detection in detections
+            ]
+
+        for x1, y1, x2, y2, confidence, label in boxes:
+            if not isinstance(label, str):
+                label = LABEL_NAMES[label]
             cv2.rectangle(frame, (x1, y1), (x2, y2), (50, 205, 50), 2)
             cv2.putText(
                 frame,
-                f"{detection.label} {detection.confidence:.2f}",
+                f"{label} {confidence:.2f}",
                 (x1, max(y1 - 8, 12)),
                 cv2.FONT_HERSHEY_SIMPLEX,
                 0.5,
@@ -0,0 +1,711 @@
+from __future__ import annotations
+
+import argparse
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+import cv2
+import numpy as np
+
+from .capture import CaptureGroup, start_simulation_capture, start_webcam_capture
+from .config import (
+    CAPTURE_TRANSPORT,
+    CONFIDENCE_THRESHOLD,
+    DETECTION_CACHE_DIR,
+    DETECTION_CACHE_DISK,
+    DETECTION_CACHE_ENABLED,
+    DETECTION_CLASSES,
+    DETECTOR_ENGINE,
+    DETECTOR_ENGINES,
+    ENGINE_CLOCK,
+    ENGINE_CLOCKS,
+    ENGINE_TARGET_FPS,
+    FRAME_HEIGHT,
+    FRAME_WIDTH,
+    HISTORY_JUNCTION,
+    HISTORY_LENGTH,
+    HISTORY_STORE_ENABLED,
+    INFERENCE_IMAGE_SIZE,
+    IOU_THRESHOLD,
+    LANE_IDS,
+    LOG_FILE,
+    LOG_INTERVAL_SECONDS,
+    METRICS_ENABLED,
+    METRICS_PORT,
+    MODEL_BACKEND,
+    MODEL_PATH,
+    MOTION_GATING_ENABLED,
+    REALTIME_LATENCY_BUDGET,
+    REALTIME_MODE,
+    SHM_CAPTURE_PROCESSES,
+    SIGNAL_TIMING_FILE,
+    SIMULATED_CLOCK_STEP,
+    SYNTHETIC_PROFILE,
+    SYNTHETIC_PROFILES,
+    VIDEOS_DIR,
+)
+from .backends import BACKENDS
+from .clock import SimulatedClock, VideoClock, WallClock, create_clock
+from .detection_cache import DetectionCache, settings_digest, source_identity
+from .density import create_detector
+from .detector import VehicleDetector
+from .frame_cache import MemmapCaptureGroup, start_memmap_capture
+from .lane_counter import LaneCounter
+from .realtime import LatencyGovernor
+from .roi import RegionCropper
+from .scheduler import InferenceScheduler
+from .shm_transport import SharedMemoryCaptureGroup, start_shared_simulation_capture, start_shared_webcam_capture
+from .signal_controller import AdaptiveSignalController, load_signal_timing
+from .synthetic import SyntheticFrameSource, default_scenarios
+from .history_store import TrafficHistoryStore
+from .log_writer import TrafficLogWriter
+from .metrics import metrics, start_metrics_server
+from .utils import (
+    ensure_project_directories,
+    generate_dummy_traffic_videos,
+    open_video_captures,
+    release_captures,
+)
+
+
+def default_video_paths(lane_ids: List[int]) -> Dict[int, Path]:
+    return {lane_id: VIDEOS_DIR / f"lane{lane_id}.mp4" for lane_id in lane_ids}
+
+
+DEFAULT_VIDEO_PATHS = default_video_paths(LANE_IDS)
+
+
+@dataclass
+class EngineConfig:
+    junction_id: str = HISTORY_JUNCTION
+    mode: str = "Simulation"
+    lane_ids: List[int] = field(default_factory=lambda: list(LANE_IDS))
+    video_paths: Dict[int, Path] = field(default_factory=lambda: dict(DEFAULT_VIDEO_PATHS))
+    webcam_index: int = 0
+    synthetic_profile: str = SYNTHETIC_PROFILE
+    confidence_threshold: float = CONFIDENCE_THRESHOLD
+    iou_threshold: float = IOU_THRESHOLD
+    backend: str = MODEL_BACKEND
+    detector_engine: str = DETECTOR_ENGINE
+    motion_gating: bool = MOTION_GATING_ENABLED
+    detection_cache: bool = DETECTION_CACHE_ENABLED
+    detection_cache_disk: bool = DETECTION_CACHE_DISK
+    frame_size: tuple[int, int] = (FRAME_WIDTH, FRAME_HEIGHT)
+    capture_transport: str = CAPTURE_TRANSPORT
+    capture_processes: int = SHM_CAPTURE_PROCESSES
+    target_fps: float = ENGINE_TARGET_FPS
+    realtime: bool = REALTIME_MODE
+    latency_budget: float = REALTIME_LATENCY_BUDGET
+    clock: str = ENGINE_CLOCK
+    clock_step: float = SIMULATED_CLOCK_STEP
+    log_file: Path | None = LOG_FILE
+    log_interval: float = LOG_INTERVAL_SECONDS
+    timing_file: Path | None = SIGNAL_TIMING_FILE
+    # Without annotation snapshots carry no frames: capture frames may be views into a shared-memory
+    # ring that the capture process overwrites after the next read.
+    annotate: bool = True
+
+
+@dataclass
+class EngineSnapshot:
+    step: int
+    timestamp: str
+    lane_frames: Dict[int, np.ndarray]
+    lane_counts: Dict[int, int]
+    signal_state: dict
+    fps: float
+    skip_ratios: Dict[int, float] = field(default_factory=dict)
+    lane_stats: Dict[int, dict] = field(default_factory=dict)
+    realtime_stats: dict = field(default_factory=dict)
+    model_ready: bool = True
+    cache_stats: dict = field(default_factory=dict)
+    clock_time: float = 0.0
+    detector_stats: dict = field(default_factory=dict)
+
+
+def open_capture_group(
+    config: EngineConfig,
+) -> CaptureGroup | SharedMemoryCaptureGroup | MemmapCaptureGroup | SyntheticFrameSource:
+    if config.mode == "Synthetic":
+        # Rendered straight into memory: no encode, decode or capture threads.
+        scenarios = default_scenarios(config.lane_ids, profile=config.synthetic_profile, frame_size=config.frame_size)
+        return SyntheticFrameSource(scenarios).start()
+
+    transport = config.capture_transport
+    if transport == "auto":
+        # Capture processes only pay off when decode can run on another core.
+        transport = "shm" if (os.cpu_count() or 1) > 1 else "thread"
+    if transport not in ("mmap", "shm", "thread"):
+        raise ValueError(f"Unknown capture transport '{transport}', expected 'auto', 'mmap', 'shm' or 'thread'.")
+
+    if config.mode != "Simulation":
+        # A live camera cannot be pre-decoded.
+        transport = "thread" if transport == "mmap" else transport
+        if transport == "shm":
+            return start_shared_webcam_capture(
+                config.webcam_index, config.lane_ids, frame_size=config.frame_size, realtime=config.realtime
+            )
+        webcam_capture = cv2.VideoCapture(config.webcam_index)
+        if not webcam_capture.isOpened():
+            raise RuntimeError(f"Unable to open webcam index {config.webcam_index}.")
+        return start_webcam_capture(
+            webcam_capture, lane_ids=config.lane_ids, frame_size=config.frame_size, realtime=config.realtime
+        )
+
+    sources = {lane_id: config.video_paths[lane_id] for lane_id in config.lane_ids}
+    try:
+        captures = open_video_captures(sources)
+    except RuntimeError as error:
+        using_default_sources = all(
+            Path(sources[lane_id]) == VIDEOS_DIR / f"lane{lane_id}.mp4" for lane_id in config.lane_ids
+        )
+        if not using_default_sources:
+            raise RuntimeError(f"Could not read one or more uploaded lane videos: {error}") from error
+
+        generate_dummy_traffic_videos(video_dir=VIDEOS_DIR, lane_ids=config.lane_ids)
+        captures = open_video_captures(sources)
+    if transport == "mmap":
+        # Each clip is decoded once into a memory-mapped array; every later run only touches the page cache.
+        release_captures(captures)
+        return start_memmap_capture(sources, frame_size=config.frame_size, realtime=config.realtime)
+    if transport == "shm":
+        # The sources are readable; decoding moves to capture processes that open their own handles.
+        release_captures(captures)
+        return start_shared_simulation_capture(
+            sources, frame_size=config.frame_size, processes=config.capture_processes, realtime=config.realtime
+        )
+    return start_simulation_capture(captures, frame_size=config.frame_size, realtime=config.realtime)
+
+
+class TrafficEngine:
+    def __init__(self, config: EngineConfig, detector: VehicleDetector | None = None) -> None:
+        self._created = time.perf_counter()
+        self.startup_timings: Dict[str, float] = {}
+        self.config = config
+        self.lane_ids = list(config.lane_ids)
+        self.detector = create_detector(
+            config.detector_engine, detector or VehicleDetector(model_path=MODEL_PATH, backend=config.backend)
+        )
+        self.scheduler = (
+            InferenceScheduler(self.detector, lane_ids=self.lane_ids) if config.motion_gating else None
+        )
+        self.cropper = RegionCropper(self.lane_ids, frame_size=config.frame_size)
+        self.lane_counter = LaneCounter(lane_ids=self.lane_ids, smoothing_window=4)
+        self.controller = AdaptiveSignalController(
+            lane_ids=self.lane_ids, timing=load_signal_timing(config.timing_file)
+        )
+        self.controller.bootstrap({lane_id: 0 for lane_id in self.lane_ids})
+        self.governor = (
+            LatencyGovernor(self.lane_ids, budget=config.latency_budget) if config.realtime else None
+        )
+        # Stateful counting engines (background subtraction) must see every frame, so they skip the cache.
+        self.detection_cache = (
+            DetectionCache(disk_dir=DETECTION_CACHE_DIR if config.detection_cache_disk else None)
+            if config.detection_cache and getattr(self.detector, "cacheable", True)
+            else None
+        )
+        self._source_ids: Dict[int, str] = {}
+        self._cache_options: tuple | None = None
+        self.clock: WallClock | VideoClock | SimulatedClock | None = None
+
+        self.capture_group: CaptureGroup | SharedMemoryCaptureGroup | SyntheticFrameSource | None = None
+        self.log_writer: TrafficLogWriter | None = None
+        self.error: Exception | None = None
+
+        self._history: deque[dict] = deque(maxlen=HISTORY_LENGTH)
+        self._snapshot: EngineSnapshot | None = None
+        self._condition = threading.Condition()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._step = 0
+        self._preview_frames = 0
+        self._last_tick = time.time()
+        self._clock_origin = self._last_tick
+        self._last_step_time = time.perf_counter()
+        self._last_log_time = 0.0
+        self._fps = 0.0
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def model_ready(self) -> bool:
+        return getattr(self.detector, "is_ready", True)
+
+    def _mark_startup(self, event: str) -> None:
+        if event not in self.startup_timings:
+            self.startup_timings[event] = round(time.perf_counter() - self._created, 3)
+
+    def open(self) -> "TrafficEngine":
+        ensure_project_directories()
+        if self.capture_group is None:
+            self.capture_group = open_capture_group(self.config)
+            self._mark_startup("sources_open")
+            if self.detection_cache is not None:
+                self._source_ids = self._source_identities()
+        if self.clock is None:
+            self.clock = create_clock(self.config.clock, self._source_frame_rates(), step=self.config.clock_step)
+            self._clock_origin = self.clock.now
+        if self.log_writer is None and self.config.log_file is not None:
+            self.log_writer = TrafficLogWriter(
+                self.config.log_file,
+                history_store=TrafficHistoryStore() if HISTORY_STORE_ENABLED else None,
+                junction=self.config.junction_id,
+            )
+            self.log_writer.start()
+        self._restart_clock()
+        return self
+
+    def start(self) -> "TrafficEngine":
+        self.open()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="traffic-engine", daemon=True)
+        self._thread.start()
+        return self
+
+    def request_stop(self) -> None:
+        self._stop_event.set()
+
+    def stop(self) -> None:
+        self.request_stop()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5.0)
+        if self.capture_group is not None:
+            self.capture_group.stop()
+            self.capture_group = None
+        if self.log_writer is not None:
+            self.log_writer.close()
+            self.log_writer = None
+        if self.detection_cache is not None:
+            self.detection_cache.close()
+        with self._condition:
+            self._condition.notify_all()
+
+    def _run(self) -> None:
+        frame_interval = 1.0 / self.config.target_fps if self.config.target_fps > 0 else 0.0
+        try:
+            # Load the model in the background and show raw frames until it is ready.
+            if hasattr(self.detector, "start_loading"):
+                self.detector.start_loading()
+            while not self._stop_event.is_set() and not self.model_ready:
+                self.preview_step()
+                self._stop_event.wait(max(frame_interval, 0.05))
+            self._mark_startup("model_ready")
+            self._start_control()
+            while not self._stop_event.is_set():
+                started = time.perf_counter()
+                self.step()
+                remaining = frame_interval - (time.perf_counter() - started)
+                if remaining > 0:
+                    self._stop_event.wait(remaining)
+        except Exception as error:
+            # Sources and shared detectors are torn down under a stopping engine; that is not a failure.
+            if not self._stop_event.is_set():
+                self.error = error
+        finally:
+            with self._condition:
+                self._condition.notify_all()
+
+    def step(self) -> EngineSnapshot:
+        with metrics.span("engine.step"):
+            snapshot = self._step_pipeline()
+        self._mark_startup("first_decision")
+        return snapshot
+
+    def preview_step(self) -> EngineSnapshot:
+        if self.capture_group is None:
+            raise RuntimeError("Engine sources are not open.")
+        frames = self.capture_group.read()
+        self._preview_frames += 1
+        self._mark_startup("first_frame")
+        lane_frames = {}
+        if self.config.annotate:
+            lane_frames = {lane_id: self.cropper.draw(lane_id, frames[lane_id].copy()) for lane_id in self.lane_ids}
+        snapshot = EngineSnapshot(
+            step=self._step,
+            timestamp=datetime.now().isoformat(timespec="seconds"),
+            lane_frames=lane_frames,
+            lane_counts=self.lane_counter.get_counts(),
+            signal_state=self.controller.get_state(),
+            fps=self._fps,
+            model_ready=False,
+        )
+        self._step += 1
+        with self._condition:
+            self._snapshot = snapshot
+            self._condition.notify_all()
+        return snapshot
+
+    def _start_control(self) -> None:
+        # Preview frames read while the model loaded would shift a video or simulated timeline by however
+        # long the load took, so replayable sources restart from their first frame.
+        if self._preview_frames and self.config.clock != "wall" and self.config.mode in ("Simulation", "Synthetic"):
+            self.capture_group.stop()
+            self.capture_group = open_capture_group(self.config)
+            self._preview_frames = 0
+        # The controller should not count the load time as waiting time.
+        self._restart_clock()
+
+    def _restart_clock(self) -> None:
+        self._last_tick = self.clock.reset(self.capture_group.frame_positions)
+        self._last_step_time = time.perf_counter()
+
+    def _source_frame_rates(self) -> Dict[int, float]:
+        if isinstance(self.capture_group, SyntheticFrameSource):
+            return {lane_id: renderer.scenario.fps for lane_id, renderer in self.capture_group.renderers.items()}
+        if isinstance(self.capture_group, MemmapCaptureGroup):
+            return {lane_id: cache.fps for lane_id, cache in self.capture_group.caches.items()}
+        if self.config.mode == "Simulation":
+            frame_rates = {}
+            for lane_id in self.lane_ids:
+                capture = cv2.VideoCapture(str(self.config.video_paths[lane_id]))
+                frame_rates[lane_id] = capture.get(cv2.CAP_PROP_FPS)
+                capture.release()
+            return frame_rates
+        return {}
+
+    def _source_identities(self) -> Dict[int, str]:
+        # Live sources never repeat a frame, so only replayable ones get cache keys.
+        if isinstance(self.capture_group, SyntheticFrameSource):
+            return {
+                lane_id: settings_digest(renderer.scenario) for lane_id, renderer in self.capture_group.renderers.items()
+            }
+        if self.config.mode == "Simulation":
+            return {lane_id: source_identity(self.config.video_paths[lane_id]) for lane_id in self.lane_ids}
+        return {}
+
+    def _cached_detections(self, options: dict) -> Dict[int, np.ndarray]:
+        if self.detection_cache is None or not self._source_ids:
+            return {}
+        settings = tuple(sorted(options.items()))
+        if settings != self._cache_options:
+            self._cache_options = settings
+            self.detection_cache.configure(
+                settings_digest(
+                    getattr(self.detector, "identity", type(self.detector).__name__),
+                    settings,
+                    self.config.frame_size,
+                    sorted(DETECTION_CLASSES),
+                    sorted((lane_id, roi.points.tolist()) for lane_id, roi in self.cropper.rois.items()),
+                )
+            )
+        positions = self.capture_group.frame_positions
+        cached = {}
+        for lane_id in self.lane_ids:
+            if lane_id in self._source_ids and lane_id in positions:
+                detections = self.detection_cache.get(self._source_ids[lane_id], positions[lane_id])
+                if detections is not None:
+                    cached[lane_id] = detections
+        return cached
+
+    def _store_detections(self, lane_detections: Dict[int, np.ndarray], lane_ids) -> None:
+        if self.detection_cache is None or self.detection_cache.settings is None:
+            return
+        positions = self.capture_group.frame_positions
+        for lane_id in lane_ids:
+            if lane_id in self._source_ids and lane_id in positions:
+                self.detection_cache.put(self._source_ids[lane_id], positions[lane_id], lane_detections[lane_id])
+
+    def _step_pipeline(self) -> EngineSnapshot:
+        if self.capture_group is None:
+            raise RuntimeError("Engine sources are not open.")
+
+        with metrics.span("engine.capture_read"):
+            frames = self.capture_group.read()
+        self._mark_startup("first_frame")
+
+        with metrics.span("engine.inference"):
+            inference = self.scheduler or self.detector
+            options = {
+                "confidence_threshold": self.config.confidence_threshold,
+                "iou_threshold": self.config.iou_threshold,
+            }
+            image_size = INFERENCE_IMAGE_SIZE
+            if self.cropper:
+                image_size = self.cropper.inference_image_size(self.lane_ids)
+                options["image_size"] = image_size
+            if self.governor is not None:
+                image_size = self.governor.image_size(image_size)
+                options["image_size"] = image_size
+
+            # Replayed frames the model has already seen come from the cache; only the rest are detected.
+            lane_detections = self._cached_detections(options)
+            fresh_lanes = set(lane_detections)
+            pending = [lane_id for lane_id in self.lane_ids if lane_id not in lane_detections]
+            if pending:
+                inference_frames = {lane_id: frames[lane_id] for lane_id in pending}
+                if self.cropper:
+                    inference_frames = self.cropper.crop_frames(inference_frames)
+                detected = inference.detect_batch(inference_frames, **options)
+                if self.cropper:
+                    detected = self.cropper.restore(detected)
+                detected_lanes = self.scheduler.fresh_lanes if self.scheduler is not None else set(pending)
+                self._store_detections(detected, detected_lanes)
+                lane_detections.update(detected)
+                fresh_lanes |= detected_lanes
+
+        # Counting, control and logging run on the engine clock, which need not be the wall clock.
+        now = self.clock.advance(self.capture_group.frame_positions, self.capture_group.frame_timestamps)
+
+        lane_frames = {}
+        with metrics.span("engine.count"):
+            for lane_id in self.lane_ids:
+                self.lane_counter.update_detections(
+                    lane_id, lane_detections[lane_id], timestamp=now, fresh=lane_id in fresh_lanes
+                )
+            lane_counts = self.lane_counter.get_counts()
+
+        if self.config.annotate:
+            with metrics.span("engine.annotate"):
+                for lane_id in self.lane_ids:
+                    detections = lane_detections[lane_id]
+                    if self.lane_counter.tracking:
+                        detections = self.lane_counter.tracked_detections(lane_id)
+                    annotated = self.cropper.draw(lane_id, frames[lane_id].copy())
+                    lane_frames[lane_id] = self.detector.draw_detections(annotated, detections)
+
+        delta_seconds = max(now - self._last_tick, 1e-3)
+        self._last_tick = now
+        step_time = time.perf_counter()
+        step_seconds = max(step_time - self._last_step_time, 1e-3)
+        self._last_step_time = step_time
+        self._fps = 0.8 * self._fps + 0.2 / step_seconds if self._fps else 1.0 / step_seconds
+
+        with metrics.span("engine.control"):
+            self.controller.update_vehicle_counts(lane_counts)
+            self.controller.tick(delta_seconds)
+            signal_state = self.controller.get_state()
+            self.lane_counter.set_green_lane(signal_state["current_green_lane"])
+
+        realtime_stats = {}
+        if self.governor is not None:
+            # End-to-end latency runs from frame capture to the signal decision that used it.
+            decided = time.time()
+            latencies = {
+                lane_id: max(decided - self.capture_group.frame_timestamps.get(lane_id, decided), 0.0)
+                for lane_id in self.lane_ids
+            }
+            worst = self.governor.update(latencies)
+            metrics.observe("engine.e2e_latency", worst * 1000.0)
+            realtime_stats = {
+                "image_size": image_size,
+                "scale": self.governor.scale,
+                "lanes": self.governor.stats(),
+                "dropped_frames": dict(self.capture_group.dropped_frames),
+            }
+
+        timestamp = datetime.fromtimestamp(now).isoformat(timespec="seconds")
+        history_entry = {"step": self._step, "timestamp": timestamp}
+        for lane_id in self.lane_ids:
+            history_entry[f"lane_{lane_id}"] = lane_counts[lane_id]
+        self._history.append(history_entry)
+
+        if self.log_writer is not None:
+            # A dead writer would otherwise go unnoticed until the unwritten rows were missed.
+            self.log_writer.check()
+        if self.log_writer is not None and now - self._last_log_time >= self.config.log_interval:
+            with metrics.span("engine.log"):
+                self.log_writer.write(timestamp=timestamp, lane_counts=lane_counts, signal_state=signal_state)
+            self._last_log_time = now
+
+        snapshot = EngineSnapshot(
+            step=self._step,
+            timestamp=timestamp,
+            lane_frames=lane_frames,
+            lane_counts=lane_counts,
+            signal_state=signal_state,
+            fps=self._fps,
+            skip_ratios=self.scheduler.skip_ratios() if self.scheduler is not None else {},
+            lane_stats=self.lane_counter.get_all_stats(),
+            realtime_stats=realtime_stats,
+            cache_stats=self.detection_cache.stats() if self.detection_cache is not None else {},
+            clock_time=now - self._clock_origin,
+            detector_stats=self.detector.stats() if hasattr(self.detector, "stats") else {},
+        )
+        self._step += 1
+        metrics.increment("engine.steps")
+        metrics.set_gauge("engine.fps", round(self._fps, 2))
+        with self._condition:
+            self._snapshot = snapshot
+            self._condition.notify_all()
+        return snapshot
+
+    def set_detection_thresholds(self, confidence_threshold: float, iou_threshold: float) -> None:
+        # Thresholds are read per detect call, so no model reload is needed.
+        self.config.confidence_threshold = confidence_threshold
+        self.config.iou_threshold = iou_threshold
+
+    def latest(self) -> EngineSnapshot | None:
+        with self._condition:
+            return self._snapshot
+
+    def wait_for_snapshot(self, after_step: int = -1, timeout: float | None = None) -> EngineSnapshot | None:
+        with self._condition:
+            self._condition.wait_for(
+                lambda: (self._snapshot is not None and self._snapshot.step > after_step)
+                or self.error is not None
+                or not self.is_running,
+                timeout=timeout,
+            )
+            return self._snapshot
+
+    def history(self) -> List[dict]:
+        with self._condition:
+            return list(self._history)
+
+
+def parse_video_arguments(values: List[str]) -> Dict[int, Path]:
+    video_paths = dict(DEFAULT_VIDEO_PATHS)
+    for value in values:
+        lane_text, _, path_text = value.partition("=")
+        if not path_text:
+            raise argparse.ArgumentTypeError(f"Expected LANE=PATH, got '{value}'.")
+        video_paths[int(lane_text)] = Path(path_text)
+    return video_paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the Smart Traffic AI pipeline without the dashboard.")
+    parser.add_argument("--mode", choices=["Simulation", "Webcam", "Synthetic"], default="Simulation")
+    parser.add_argument("--profile", choices=list(SYNTHETIC_PROFILES), default=SYNTHETIC_PROFILE, help="Synthetic arrivals.")
+    parser.add_argument("--video", action="append", default=[], metavar="LANE=PATH", help="Override a lane video.")
+    parser.add_argument("--webcam-index", type=int, default=0)
+    parser.add_argument("--confidence", type=float, default=CONFIDENCE_THRESHOLD)
+    parser.add_argument("--iou", type=float, default=IOU_THRESHOLD)
+    parser.add_argument("--backend", choices=BACKENDS, default=MODEL_BACKEND)
+    parser.add_argument(
+        "--detector-engine",
+        choices=DETECTOR_ENGINES,
+        default=DETECTOR_ENGINE,
+        help="Count with the detection model, background subtraction, or switch between them on latency.",
+    )
+    parser.add_argument("--fps", type=float, default=ENGINE_TARGET_FPS, help="Pipeline rate cap, 0 for unthrottled.")
+    parser.add_argument("--duration", type=float, default=0.0, help="Seconds to run, 0 to run until interrupted.")
+    parser.add_argument("--log-file", type=Path, default=LOG_FILE)
+    parser.add_argument("--no-log", action="store_true")
+    parser.add_argument("--no-motion-gating", action="store_true", help="Run the detector on every frame.")
+    parser.add_argument("--no-detection-cache", action="store_true", help="Detect replayed frames again.")
+    parser.add_argument(
+        "--detection-cache-disk",
+        action="store_true",
+        default=DETECTION_CACHE_DISK,
+        help="Keep cached detections on disk across runs.",
+    )
+    parser.add_argument(
+        "--capture-transport",
+        choices=["auto", "mmap", "shm", "thread"],
+        default=CAPTURE_TRANSPORT,
+        help="Replay pre-decoded frames, decode in capture processes over shared memory, or in reader threads.",
+    )
+    parser.add_argument("--realtime", action="store_true", help="Always process the newest frame, dropping stale ones.")
+    parser.add_argument(
+        "--latency-budget-ms",
+        type=float,
+        default=REALTIME_LATENCY_BUDGET * 1000.0,
+        help="Real-time end-to-end latency budget before the inference size is lowered.",
+    )
+    parser.add_argument(
+        "--clock",
+        choices=ENGINE_CLOCKS,
+        default=ENGINE_CLOCK,
+        help="Time base for counting and signal control: real time, source frame time, or a fixed step per tick.",
+    )
+    parser.add_argument(
+        "--clock-step", type=float, default=SIMULATED_CLOCK_STEP, help="Seconds per tick for the simulated clock."
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=METRICS_PORT if METRICS_ENABLED else 0,
+        help="Serve /metrics and /metrics.json on this port, 0 to disable.",
+    )
+    args = parser.parse_args()
+
+    config = EngineConfig(
+        mode=args.mode,
+        video_paths=parse_video_arguments(args.video),
+        webcam_index=args.webcam_index,
+        synthetic_profile=args.profile,
+        confidence_threshold=args.confidence,
+        iou_threshold=args.iou,
+        backend=args.backend,
+        detector_engine=args.detector_engine,
+        motion_gating=not args.no_motion_gating,
+        detection_cache=DETECTION_CACHE_ENABLED and not args.no_detection_cache,
+        detection_cache_disk=args.detection_cache_disk,
+        capture_transport=args.capture_transport,
+        target_fps=args.fps,
+        realtime=args.realtime or REALTIME_MODE,
+        latency_budget=args.latency_budget_ms / 1000.0,
+        clock=args.clock,
+        clock_step=args.clock_step,
+        log_file=None if args.no_log else args.log_file,
+        annotate=False,
+    )
+    if args.metrics_port:
+        start_metrics_server(port=args.metrics_port)
+    if config.timing_file is not None and config.timing_file.exists():
+        print(f"signal timing: tuned values from {config.timing_file}", flush=True)
+    engine = TrafficEngine(config).start()
+    started = time.time()
+    last_step = -1
+    history_reported = False
+    try:
+        while engine.is_running:
+            if args.duration and time.time() - started >= args.duration:
+                break
+            time.sleep(1.0)
+            snapshot = engine.latest()
+            if snapshot is None or snapshot.step == last_step:
+                continue
+            last_step = snapshot.step
+            if not snapshot.model_ready:
+                print(f"[{snapshot.timestamp}] step={snapshot.step} loading model...", flush=True)
+                continue
+            state = snapshot.signal_state
+            print(
+                f"[{snapshot.timestamp}] step={snapshot.step} fps={snapshot.fps:5.1f} clock={snapshot.clock_time:.1f}s "
+                f"green=lane{state['current_green_lane']} countdown={state['countdown']}s "
+                f"counts={snapshot.lane_counts} skip={snapshot.skip_ratios}",
+                flush=True,
+            )
+            if snapshot.cache_stats:
+                print(f"  detection cache: {snapshot.cache_stats}", flush=True)
+            if snapshot.detector_stats:
+                detector_stats = snapshot.detector_stats
+                print(
+                    f"  engine={detector_stats['engine']} occupancy={detector_stats['occupancy']} "
+                    f"latency_ms={detector_stats.get('frame_latency_ms', {})}",
+                    flush=True,
+                )
+            log_writer = engine.log_writer
+            if log_writer is not None and log_writer.history_error is not None and not history_reported:
+                print(f"  history store failed, CSV logging continues: {log_writer.history_error}", flush=True)
+                history_reported = True
+            if snapshot.realtime_stats:
+                realtime_stats = snapshot.realtime_stats
+                latency = {lane_id: stats["mean_latency_ms"] for lane_id, stats in realtime_stats["lanes"].items()}
+                print(
+                    f"  latency_ms={latency} dropped={realtime_stats['dropped_frames']} "
+                    f"image_size={realtime_stats['image_size']}",
+                    flush=True,
+                )
+    except KeyboardInterrupt:
+        pass
+    finally:
+        engine.stop()
+
+    print(f"startup: {engine.startup_timings}", flush=True)
+    if engine.error is not None:
+        raise SystemExit(f"Engine stopped with error: {engine.error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict
+
+import cv2
+import numpy as np
+
+from .config import FRAME_CACHE_DIR, FRAME_HEIGHT, FRAME_WIDTH, LANE_IDS, VIDEOS_DIR
+from .detection_cache import source_identity
+from .metrics import metrics
+
+
+@dataclass
+class FrameCache:
+    path: Path
+    frames: np.ndarray
+    fps: float
+    source: str
+
+    @property
+    def frame_count(self) -> int:
+        return len(self.frames)
+
+
+def frame_cache_path(video_path: Path, frame_size: tuple[int, int], cache_dir: Path = FRAME_CACHE_DIR) -> Path:
+    width, height = frame_size
+    return Path(cache_dir) / f"{source_identity(video_path)}_{width}x{height}.npy"
+
+
+def _count_frames(video_path: Path) -> int:
+    # CAP_PROP_FRAME_COUNT is only an estimate for some containers; grab() walks without converting.
+    capture = cv2.VideoCapture(str(video_path))
+    count = 0
+    while capture.grab():
+        count += 1
+    capture.release()
+    return count
+
+
+def build_frame_cache(
+    video_path: Path,
+    frame_size: tuple[int, int] = (FRAME_WIDTH, FRAME_HEIGHT),
+    cache_dir: Path = FRAME_CACHE_DIR,
+) -> Path:
+    path = frame_cache_path(video_path, frame_size, cache_dir)
+    if path.exists() and path.with_suffix(".json").exists():
+        return path
+
+    frame_count = _count_frames(video_path)
+    if frame_count == 0:
+        raise RuntimeError(f"Unable to decode any frames from {video_path}.")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    width, height = frame_size
+    # Built under a private name and renamed, so sessions building the same clip never see a partial array.
+    temporary = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npy")
+    frames = np.lib.format.open_memmap(temporary, mode="w+", dtype=np.uint8, shape=(frame_count, height, width, 3))
+    capture = cv2.VideoCapture(str(video_path))
+    fps = capture.get(cv2.CAP_PROP_FPS) or 20.0
+    try:
+        for index in range(frame_count):
+            success, frame = capture.read()
+            if not success:
+                raise RuntimeError(f"{video_path} ended after {index} of {frame_count} frames.")
+            cv2.resize(frame, frame_size, dst=frames[index])
+        frames.flush()
+    finally:
+        capture.release()
+        del frames
+
+    os.replace(temporary, path)
+    metadata = {
+        "source": str(video_path),
+        "source_hash": source_identity(video_path),
+        "frame_count": frame_count,
+        "frame_size": [width, height],
+        "fps": fps,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    path.with_suffix(".json").write_text(json.dumps(metadata, indent=2), encoding="utf-8")
+    return path
+
+
+def open_frame_cache(
+    video_path: Path,
+    frame_size: tuple[int, int] = (FRAME_WIDTH, FRAME_HEIGHT),
+    cache_dir: Path = FRAME_CACHE_DIR,
+) -> FrameCache:
+    path = build_frame_cache(video_path, frame_size, cache_dir)
+    metadata = json.loads(path.with_suffix(".json").read_text(encoding="utf-8"))
+    # Read-only mapping: frames are views of the page cache, shared by every process that opens the file.
+    frames = np.load(path, mmap_mode="r")
+    return FrameCache(path=path, frames=frames, fps=float(metadata["fps"]), source=metadata["source"])
+
+
+class MemmapCaptureGroup:
+    def __init__(self, caches: Dict[int, FrameCache], realtime: bool = False) -> None:
+        self.caches = caches
+        self.realtime = realtime
+        self.frame_timestamps: Dict[int, float] = {}
+        self.dropped_frames: Dict[int, int] = {lane_id: 0 for lane_id in caches}
+        self.frame_positions: Dict[int, int] = {}
+        self._ticks = 0
+        self._last_ticks: Dict[int, int] = {}
+        self._started = time.perf_counter()
+        self._started_wall = time.time()
+
+    def start(self) -> "MemmapCaptureGroup":
+        self._started = time.perf_counter()
+        self._started_wall = time.time()
+        return self
+
+    def _due_ticks(self) -> Dict[int, int]:
+        # Like a live source, a frame only exists once its presentation time has passed; a read that
+        # comes early waits for the next one instead of handing back the same frame again.
+        while True:
+            elapsed = time.perf_counter() - self._started
+            ticks = {lane_id: int(elapsed * cache.fps) for lane_id, cache in self.caches.items()}
+            if not self._last_ticks or any(ticks[lane_id] > self._last_ticks[lane_id] for lane_id in ticks):
+                return ticks
+            next_due = min((self._last_ticks[lane_id] + 1) / cache.fps for lane_id, cache in self.caches.items())
+            time.sleep(max(next_due - elapsed, 0.0))
+
+    def read(self, mode: str | None = None, timeout: float | None = None) -> Dict[int, np.ndarray]:
+        ticks = self._due_ticks() if self.realtime else {}
+        now = time.time()
+        lane_frames: Dict[int, np.ndarray] = {}
+        for lane_id, cache in self.caches.items():
+            if self.realtime:
+                # Jump straight to the frame that is due; the ones in between are never touched at all.
+                tick = ticks[lane_id]
+                previous = self._last_ticks.get(lane_id)
+                if previous is not None and tick - previous > 1:
+                    self.dropped_frames[lane_id] += tick - previous - 1
+                    metrics.increment("capture.dropped", tick - previous - 1)
+                self._last_ticks[lane_id] = tick
+                position = tick % cache.frame_count
+                self.frame_timestamps[lane_id] = self._started_wall + tick / cache.fps
+            else:
+                position = self._ticks % cache.frame_count
+                self.frame_timestamps[lane_id] = now
+            self.frame_positions[lane_id] = position
+            lane_frames[lane_id] = cache.frames[position]
+        self._ticks += 1
+        metrics.increment("capture.frames", len(lane_frames))
+        return lane_frames
+
+    def stop(self) -> None:
+        self.caches = {}
+
+
+def start_memmap_capture(
+    video_paths: Dict[int, Path],
+    frame_size: tuple[int, int] = (FRAME_WIDTH, FRAME_HEIGHT),
+    cache_dir: Path = FRAME_CACHE_DIR,
+    realtime: bool = False,
+) -> MemmapCaptureGroup:
+    caches = {lane_id: open_frame_cache(path, frame_size, cache_dir) for lane_id, path in video_paths.items()}
+    return MemmapCaptureGroup(caches, realtime=realtime).start()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pre-decode lane videos into memory-mapped frame caches.")
+    parser.add_argument("videos", nargs="*", type=Path, help="Videos to decode; defaults to the bundled lane clips.")
+    parser.add_argument("--cache-dir", type=Path, default=FRAME_CACHE_DIR)
+    args = parser.parse_args()
+
+    videos = args.videos or [VIDEOS_DIR / f"lane{lane_id}.mp4" for lane_id in LANE_IDS]
+    for video in videos:
+        started = time.perf_counter()
+        path = build_frame_cache(video, cache_dir=args.cache_dir)
+        size_mb = path.stat().st_size / (1024 * 1024)
+        print(f"{video} -> {path} ({size_mb:.0f} MB, {time.perf_counter() - started:.1f}s)", flush=True)
+
+
+if __name__ == "__main__":
+    main()
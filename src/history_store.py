@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import sys
+import threading
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+
+from .config import HISTORY_DIR, HISTORY_JUNCTION
+
+META_FILE = "columns.json"
+LANE_FIELDS = ("count", "waiting", "priority")
+COLUMN_DTYPES = {
+    "timestamp": "int64",
+    "current_green_lane": "int16",
+    "countdown": "int32",
+    "cycle_elapsed": "int32",
+    "count": "int32",
+    "waiting": "float32",
+    "priority": "float32",
+}
+
+
+def column_dtype(column: str) -> np.dtype:
+    if column in COLUMN_DTYPES:
+        return np.dtype(COLUMN_DTYPES[column])
+    return np.dtype(COLUMN_DTYPES.get(column.rsplit("_", 1)[-1], "float32"))
+
+
+def to_epoch_seconds(value: str | datetime) -> int:
+    # Log timestamps are naive local times; store them as-is so queries use the same wall clock.
+    return int(np.datetime64(value, "s").astype(np.int64))
+
+
+def lane_columns(lanes: Iterable[int] | None, fields: Iterable[str] | None, available: Iterable[str]) -> List[str]:
+    fields = list(fields or LANE_FIELDS)
+    lane_ids = None if lanes is None else {int(lane_id) for lane_id in lanes}
+    selected = []
+    for column in available:
+        if not column.startswith("lane") or "_" not in column:
+            continue
+        lane_text, field = column[4:].split("_", 1)
+        if field in fields and (lane_ids is None or int(lane_text) in lane_ids):
+            selected.append(column)
+    return selected
+
+
+class TrafficHistoryStore:
+    def __init__(self, root: Path = HISTORY_DIR) -> None:
+        self.root = Path(root)
+        self._lock = threading.Lock()
+
+    def _partition_dir(self, junction: str, day: str) -> Path:
+        return self.root / junction / day
+
+    @staticmethod
+    def _read_meta(partition: Path) -> dict:
+        meta_path = partition / META_FILE
+        if not meta_path.exists():
+            return {"rows": 0, "columns": {}}
+        return json.loads(meta_path.read_text(encoding="utf-8"))
+
+    @staticmethod
+    def _write_meta(partition: Path, meta: dict) -> None:
+        temporary = partition / f"{META_FILE}.tmp"
+        temporary.write_text(json.dumps(meta, indent=2), encoding="utf-8")
+        temporary.replace(partition / META_FILE)
+
+    def junctions(self) -> List[str]:
+        if not self.root.exists():
+            return []
+        return sorted(path.name for path in self.root.iterdir() if path.is_dir())
+
+    def partitions(self, junction: str = HISTORY_JUNCTION) -> List[str]:
+        junction_dir = self.root / junction
+        if not junction_dir.exists():
+            return []
+        return sorted(path.name for path in junction_dir.iterdir() if (path / META_FILE).exists())
+
+    def append(self, rows: Sequence[dict], junction: str = HISTORY_JUNCTION, skip_existing: bool = False) -> int:
+        by_day: Dict[str, List[dict]] = {}
+        for row in rows:
+            by_day.setdefault(str(row["timestamp"])[:10], []).append(row)
+
+        appended = 0
+        with self._lock:
+            for day, day_rows in by_day.items():
+                appended += self._append_partition(self._partition_dir(junction, day), day_rows, skip_existing)
+        return appended
+
+    @staticmethod
+    def _truncate_columns(partition: Path, meta: dict, columns: Iterable[str]) -> None:
+        # A crash between the column writes and the meta update leaves columns longer than meta["rows"];
+        # cut them back so the next append stays aligned.
+        for column in columns:
+            path = partition / f"{column}.bin"
+            if not path.exists():
+                continue
+            expected = meta["rows"] * np.dtype(meta["columns"][column]).itemsize if column in meta["columns"] else 0
+            if path.stat().st_size > expected:
+                with path.open("r+b") as handle:
+                    handle.truncate(expected)
+
+    def _append_partition(self, partition: Path, rows: List[dict], skip_existing: bool = False) -> int:
+        partition.mkdir(parents=True, exist_ok=True)
+        meta = self._read_meta(partition)
+        existing_rows = meta["rows"]
+
+        columns = list(meta["columns"])
+        for row in rows:
+            columns.extend(column for column in row if column not in meta["columns"] and column not in columns)
+        self._truncate_columns(partition, meta, columns)
+
+        timestamps = np.array([to_epoch_seconds(row["timestamp"]) for row in rows], dtype=np.int64)
+        order = np.argsort(timestamps, kind="stable")
+        stored = self._open_column(partition, meta, "timestamp") if existing_rows else np.empty(0, dtype=np.int64)
+        if skip_existing:
+            # Keeps the first row per timestamp and drops timestamps the partition already holds.
+            _, first = np.unique(timestamps, return_index=True)
+            order = first[~np.isin(timestamps[first], stored)]
+        if not len(order):
+            return 0
+        rows = [rows[index] for index in order]
+        timestamps = timestamps[order]
+
+        batch: Dict[str, np.ndarray] = {}
+        for column in columns:
+            dtype = np.dtype(meta["columns"].get(column, column_dtype(column).str))
+            fill = np.nan if dtype.kind == "f" else 0
+            if column == "timestamp":
+                batch[column] = timestamps.astype(dtype)
+            else:
+                batch[column] = np.asarray([fill if row.get(column) is None else row[column] for row in rows], dtype=dtype)
+            if column not in meta["columns"] and existing_rows:
+                # Columns first seen in this batch are backfilled so every column keeps the same length.
+                batch[column] = np.concatenate([np.full(existing_rows, fill, dtype=dtype), batch[column]])
+
+        if existing_rows and timestamps[0] < stored[-1]:
+            # Queries binary-search the timestamp column, so late rows are merged in rather than appended.
+            self._merge_partition(partition, meta, batch)
+        else:
+            for column, values in batch.items():
+                with (partition / f"{column}.bin").open("ab") as handle:
+                    values.tofile(handle)
+        for column, values in batch.items():
+            meta["columns"][column] = values.dtype.str
+
+        meta["rows"] = existing_rows + len(rows)
+        self._write_meta(partition, meta)
+        return len(rows)
+
+    def _merge_partition(self, partition: Path, meta: dict, batch: Dict[str, np.ndarray]) -> None:
+        merged = {}
+        for column, values in batch.items():
+            if column in meta["columns"]:
+                values = np.concatenate([np.array(self._open_column(partition, meta, column)), values])
+            merged[column] = values
+        order = np.argsort(merged["timestamp"], kind="stable")
+        for column, values in merged.items():
+            temporary = partition / f"{column}.bin.tmp"
+            values[order].tofile(temporary)
+            temporary.replace(partition / f"{column}.bin")
+
+    def _open_column(self, partition: Path, meta: dict, column: str) -> np.ndarray:
+        dtype = np.dtype(meta["columns"][column])
+        if meta["rows"] == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(partition / f"{column}.bin", dtype=dtype, mode="r", shape=(meta["rows"],))
+
+    def query(
+        self,
+        start: str | datetime,
+        end: str | datetime,
+        junction: str = HISTORY_JUNCTION,
+        lanes: Iterable[int] | None = None,
+        fields: Iterable[str] | None = None,
+        include_signal: bool = False,
+    ) -> Dict[str, np.ndarray]:
+        start_seconds, end_seconds = to_epoch_seconds(start), to_epoch_seconds(end)
+        first_day = np.datetime64(start_seconds, "s").astype("datetime64[D]").astype(date)
+        last_day = np.datetime64(end_seconds, "s").astype("datetime64[D]").astype(date)
+
+        chunks: Dict[str, List[np.ndarray]] = {}
+        day = first_day
+        while day <= last_day:
+            partition = self._partition_dir(junction, day.isoformat())
+            day += timedelta(days=1)
+            meta = self._read_meta(partition)
+            if not meta["rows"]:
+                continue
+
+            timestamps = self._open_column(partition, meta, "timestamp")
+            lower, upper = np.searchsorted(timestamps, [start_seconds, end_seconds], side="left")
+            if upper <= lower:
+                continue
+
+            selected = ["timestamp"] + lane_columns(lanes, fields, meta["columns"])
+            if include_signal:
+                selected += [column for column in ("current_green_lane", "countdown", "cycle_elapsed") if column in meta["columns"]]
+            for column in selected:
+                chunks.setdefault(column, []).append(np.array(self._open_column(partition, meta, column)[lower:upper]))
+
+        result = {column: np.concatenate(parts) for column, parts in chunks.items()}
+        if "timestamp" in result:
+            result["timestamp"] = result["timestamp"].astype("datetime64[s]")
+        return result
+
+
+def import_csv(
+    csv_path: Path,
+    store: TrafficHistoryStore | None = None,
+    junction: str = HISTORY_JUNCTION,
+    batch_size: int = 50_000,
+) -> int:
+    store = store or TrafficHistoryStore()
+    imported = 0
+    batch: List[dict] = []
+    with Path(csv_path).open("r", newline="", encoding="utf-8") as csv_file:
+        for row in csv.DictReader(csv_file):
+            if not row.get("timestamp"):
+                continue
+            batch.append({key: value for key, value in row.items() if value not in (None, "")})
+            if len(batch) >= batch_size:
+                imported += store.append(batch, junction, skip_existing=True)
+                batch = []
+    if batch:
+        # Re-importing a file, or overlapping ones, only adds timestamps the store does not hold yet.
+        imported += store.append(batch, junction, skip_existing=True)
+    return imported
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import and query the columnar traffic history store.")
+    parser.add_argument("--root", type=Path, default=HISTORY_DIR)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser("import", help="Import traffic_log CSV files.")
+    import_parser.add_argument("csv_files", nargs="+", type=Path)
+    import_parser.add_argument("--junction", default=HISTORY_JUNCTION)
+
+    query_parser = subparsers.add_parser("query", help="Print rows for a time range.")
+    query_parser.add_argument("--start", required=True, help="ISO timestamp, e.g. 2026-02-17T08:00")
+    query_parser.add_argument("--end", required=True)
+    query_parser.add_argument("--junction", default=HISTORY_JUNCTION)
+    query_parser.add_argument("--lanes", type=int, nargs="*")
+    query_parser.add_argument("--fields", nargs="*", choices=LANE_FIELDS)
+    args = parser.parse_args()
+
+    store = TrafficHistoryStore(args.root)
+    if args.command == "import":
+        for csv_file in args.csv_files:
+            print(f"{csv_file}: imported {import_csv(csv_file, store, args.junction)} rows")
+        return
+
+    result = store.query(args.start, args.end, junction=args.junction, lanes=args.lanes, fields=args.fields)
+    if not result:
+        print("No rows in range.")
+        return
+    columns = list(result)
+    writer = csv.writer(sys.stdout)
+    writer.writerow(columns)
+    writer.writerows(zip(*(result[column].tolist() for column in columns)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from dataclasses import fields
+from pathlib import Path
+from typing import Dict, List
+
+from .backends import BACKENDS
+from .batching import BatchingDetector, JunctionDetectorClient
+from .config import (
+    BASE_DIR,
+    BATCH_MAX_FRAMES,
+    BATCH_MAX_WAIT,
+    HISTORY_JUNCTION,
+    JUNCTION_CAPTURE_PROCESSES,
+    JUNCTIONS_FILE,
+    LOGS_DIR,
+    METRICS_ENABLED,
+    METRICS_PORT,
+    MODEL_BACKEND,
+    MODEL_PATH,
+)
+from .detector import VehicleDetector
+from .engine import EngineConfig, EngineSnapshot, TrafficEngine, default_video_paths
+from .metrics import start_metrics_server
+
+
+def engine_config_from_dict(values: dict) -> EngineConfig:
+    known = {field.name for field in fields(EngineConfig)}
+    unknown = set(values) - known
+    if unknown:
+        raise ValueError(f"Unknown junction settings: {', '.join(sorted(unknown))}.")
+    config = dict(values)
+    if "lane_ids" in config:
+        config["lane_ids"] = [int(lane_id) for lane_id in config["lane_ids"]]
+    lane_ids = config.get("lane_ids") or EngineConfig().lane_ids
+    video_paths = default_video_paths(lane_ids)
+    video_paths.update(
+        {
+            int(lane_id): (Path(path) if Path(path).is_absolute() else BASE_DIR / path)
+            for lane_id, path in config.get("video_paths", {}).items()
+        }
+    )
+    config["video_paths"] = video_paths
+    for key in ("log_file", "timing_file"):
+        if config.get(key):
+            config[key] = Path(config[key]) if Path(config[key]).is_absolute() else BASE_DIR / config[key]
+    config.setdefault("log_file", LOGS_DIR / f"traffic_log_{config.get('junction_id', HISTORY_JUNCTION)}.csv")
+    config.setdefault("capture_processes", JUNCTION_CAPTURE_PROCESSES)
+    return EngineConfig(**config)
+
+
+def load_junction_configs(path: Path = JUNCTIONS_FILE) -> List[EngineConfig]:
+    payload = json.loads(Path(path).read_text(encoding="utf-8"))
+    junctions = payload.get("junctions", []) if isinstance(payload, dict) else payload
+    configs = [engine_config_from_dict(values) for values in junctions]
+    junction_ids = [config.junction_id for config in configs]
+    if len(set(junction_ids)) != len(junction_ids):
+        raise ValueError("Junction ids must be unique.")
+    return configs
+
+
+def demo_junction_configs(count: int) -> List[EngineConfig]:
+    return [engine_config_from_dict({"junction_id": f"junction{index + 1}"}) for index in range(count)]
+
+
+class JunctionServer:
+    def __init__(
+        self,
+        configs: List[EngineConfig],
+        backend: str = MODEL_BACKEND,
+        max_batch_size: int = BATCH_MAX_FRAMES,
+        max_wait: float = BATCH_MAX_WAIT,
+    ) -> None:
+        # One model for every junction; each engine keeps its own counters, controller and log.
+        self.detector = VehicleDetector(model_path=MODEL_PATH, backend=backend)
+        self.batcher = BatchingDetector(self.detector, max_batch_size=max_batch_size, max_wait=max_wait)
+        self.engines: Dict[str, TrafficEngine] = {}
+        self._clients: Dict[str, JunctionDetectorClient] = {}
+        for config in configs:
+            config.annotate = False
+            client = self.batcher.client(config.junction_id)
+            self._clients[config.junction_id] = client
+            self.engines[config.junction_id] = TrafficEngine(config, detector=client)
+
+    def start(self) -> "JunctionServer":
+        self.batcher.start()
+        for engine in self.engines.values():
+            engine.start()
+        return self
+
+    def stop(self) -> None:
+        for junction_id, engine in self.engines.items():
+            engine.request_stop()
+            # Releasing unblocks an engine that is still waiting on the batcher.
+            self._clients[junction_id].close()
+        for engine in self.engines.values():
+            engine.stop()
+        self.batcher.stop()
+
+    @property
+    def is_running(self) -> bool:
+        return any(engine.is_running for engine in self.engines.values())
+
+    def snapshots(self) -> Dict[str, EngineSnapshot | None]:
+        return {junction_id: engine.latest() for junction_id, engine in self.engines.items()}
+
+    def errors(self) -> Dict[str, Exception]:
+        return {junction_id: engine.error for junction_id, engine in self.engines.items() if engine.error is not None}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve many junctions from one shared, batched detector.")
+    parser.add_argument("--config", type=Path, default=JUNCTIONS_FILE, help="JSON list of junction engine settings.")
+    parser.add_argument("--demo", type=int, default=0, help="Run N copies of the default simulation junction instead.")
+    parser.add_argument("--backend", choices=BACKENDS, default=MODEL_BACKEND)
+    parser.add_argument("--max-batch", type=int, default=BATCH_MAX_FRAMES, help="Frames per detector call.")
+    parser.add_argument("--max-wait-ms", type=float, default=BATCH_MAX_WAIT * 1000.0, help="Batching deadline.")
+    parser.add_argument("--duration", type=float, default=0.0, help="Seconds to run, 0 to run until interrupted.")
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=METRICS_PORT if METRICS_ENABLED else 0,
+        help="Serve /metrics and /metrics.json on this port, 0 to disable.",
+    )
+    args = parser.parse_args()
+
+    configs = demo_junction_configs(args.demo) if args.demo else load_junction_configs(args.config)
+    if args.metrics_port:
+        start_metrics_server(port=args.metrics_port)
+    server = JunctionServer(
+        configs, backend=args.backend, max_batch_size=args.max_batch, max_wait=args.max_wait_ms / 1000.0
+    ).start()
+    started = time.time()
+    try:
+        while server.is_running:
+            if args.duration and time.time() - started >= args.duration:
+                break
+            time.sleep(1.0)
+            stats = server.batcher.stats()
+            print(f"batches={stats['batches']} mean_batch={stats['mean_batch_frames']} frames", flush=True)
+            for junction_id, snapshot in server.snapshots().items():
+                if snapshot is None:
+                    continue
+                junction_stats = stats["junctions"].get(junction_id, {})
+                print(
+                    f"  {junction_id:<14} step={snapshot.step:<6} fps={snapshot.fps:5.1f} "
+                    f"green=lane{snapshot.signal_state['current_green_lane']} counts={snapshot.lane_counts} "
+                    f"wait={junction_stats.get('mean_wait_ms', 0.0)}ms",
+                    flush=True,
+                )
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+    errors = server.errors()
+    if errors:
+        raise SystemExit("; ".join(f"{junction_id}: {error}" for junction_id, error in errors.items()))
+
+
+if __name__ == "__main__":
+    main()
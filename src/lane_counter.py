@@ -1,20 +1,82 @@
 from __future__ import annotations
 
 from collections import deque
-from typing import Dict, Iterable
+from typing import Dict, Iterable, Sized
+
+import numpy as np
+
+from .config import ARRIVAL_RATE_WINDOW, TRACKING_ENABLED
+from .tracker import VehicleTracker
 
 
 class LaneCounter:
-    def __init__(self, lane_ids: Iterable[int], smoothing_window: int = 4) -> None:
+    def __init__(
+        self,
+        lane_ids: Iterable[int],
+        smoothing_window: int = 4,
+        tracking: bool = TRACKING_ENABLED,
+    ) -> None:
         self.lane_ids = list(lane_ids)
         self.smoothing_window = max(1, smoothing_window)
+        self.tracking = tracking
         self._history = {
             lane_id: deque(maxlen=self.smoothing_window) for lane_id in self.lane_ids
         }
+        self._trackers = {lane_id: VehicleTracker() for lane_id in self.lane_ids} if tracking else {}
+        self._arrival_times = {lane_id: deque() for lane_id in self.lane_ids}
+        self._last_timestamp: Dict[int, float] = {}
+        self._first_timestamp: Dict[int, float] = {}
+        self._green_lane: int | None = None
+        self._green_departures = {lane_id: 0 for lane_id in self.lane_ids}
 
     def update(self, lane_id: int, detected_count: int) -> None:
         self._history[lane_id].append(int(detected_count))
 
+    def update_detections(
+        self,
+        lane_id: int,
+        detections: Sized,
+        timestamp: float | None = None,
+        fresh: bool = True,
+    ) -> None:
+        if not self.tracking:
+            self.update(lane_id, len(detections))
+            return
+
+        tracker = self._trackers[lane_id]
+        previous = self._last_timestamp.get(lane_id)
+        delta_seconds = 1e-3
+        if timestamp is not None:
+            if previous is not None:
+                delta_seconds = max(timestamp - previous, 1e-3)
+            self._last_timestamp[lane_id] = timestamp
+
+        arrivals, departures = tracker.arrivals, tracker.departures
+        # Skipped detector frames only advance the motion model; tracks keep their IDs.
+        if fresh:
+            tracker.update(detections, delta_seconds)
+        else:
+            tracker.predict(delta_seconds)
+
+        if timestamp is not None:
+            self._first_timestamp.setdefault(lane_id, timestamp)
+            arrival_times = self._arrival_times[lane_id]
+            arrival_times.extend([timestamp] * (tracker.arrivals - arrivals))
+            while arrival_times and timestamp - arrival_times[0] > ARRIVAL_RATE_WINDOW:
+                arrival_times.popleft()
+        if lane_id == self._green_lane:
+            self._green_departures[lane_id] += tracker.departures - departures
+
+        self.update(lane_id, len(tracker))
+
+    def set_green_lane(self, lane_id: int | None) -> None:
+        if lane_id != self._green_lane and lane_id in self._green_departures:
+            self._green_departures[lane_id] = 0
+        self._green_lane = lane_id
+
+    def tracked_detections(self, lane_id: int) -> np.ndarray:
+        return self._trackers[lane_id].detections()
+
     def get_count(self, lane_id: int) -> int:
         history = self._history[lane_id]
         if not history:
@@ -24,6 +86,25 @@ class LaneCounter:
     def get_counts(self) -> Dict[int, int]:
         return {lane_id: self.get_count(lane_id) for lane_id in self.lane_ids}
 
+    def get_lane_stats(self, lane_id: int) -> dict:
+        stats = {"vehicle_count": self.get_count(lane_id)}
+        if self.tracking:
+            tracker = self._trackers[lane_id]
+            observed = self._last_timestamp.get(lane_id, 0.0) - self._first_timestamp.get(lane_id, 0.0)
+            rate_window = max(min(ARRIVAL_RATE_WINDOW, observed), 1.0)
+            stats.update(
+                {
+                    "queue_length": tracker.stationary_count(),
+                    "arrivals_per_second": round(len(self._arrival_times[lane_id]) / rate_window, 3),
+                    "departures_during_green": self._green_departures[lane_id],
+                    "total_departures": tracker.departures,
+                }
+            )
+        return stats
+
+    def get_all_stats(self) -> Dict[int, dict]:
+        return {lane_id: self.get_lane_stats(lane_id) for lane_id in self.lane_ids}
+
     @staticmethod
     def density_band(vehicle_count: int) -> str:
         if vehicle_count <= 10:
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import csv
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, TextIO
+
+from .config import (
+    HISTORY_JUNCTION,
+    LOG_BATCH_SIZE,
+    LOG_FILE,
+    LOG_FLUSH_INTERVAL,
+    LOG_MAX_BYTES,
+    LOG_ROTATE_DAILY,
+)
+from .history_store import TrafficHistoryStore
+from .metrics import metrics
+
+_STOP = object()
+
+
+def log_fieldnames(lane_ids: Iterable[int]) -> List[str]:
+    lane_ids = sorted(lane_ids)
+    fieldnames = ["timestamp", "current_green_lane", "countdown", "cycle_elapsed"]
+    for column in ("count", "waiting", "priority"):
+        fieldnames.extend(f"lane{lane_id}_{column}" for lane_id in lane_ids)
+    return fieldnames
+
+
+def build_log_row(timestamp: str, lane_counts: Dict[int, int], signal_state: dict) -> dict:
+    row = {
+        "timestamp": timestamp,
+        "current_green_lane": signal_state["current_green_lane"],
+        "countdown": signal_state["countdown"],
+        "cycle_elapsed": signal_state["cycle_elapsed"],
+    }
+    lane_ids = sorted(lane_counts)
+    row.update({f"lane{lane_id}_count": lane_counts[lane_id] for lane_id in lane_ids})
+    row.update({f"lane{lane_id}_waiting": signal_state["waiting_times"][lane_id] for lane_id in lane_ids})
+    row.update({f"lane{lane_id}_priority": signal_state["priority_scores"][lane_id] for lane_id in lane_ids})
+    return row
+
+
+class TrafficLogWriter(threading.Thread):
+    def __init__(
+        self,
+        log_file: Path = LOG_FILE,
+        batch_size: int = LOG_BATCH_SIZE,
+        flush_interval: float = LOG_FLUSH_INTERVAL,
+        max_bytes: int = LOG_MAX_BYTES,
+        rotate_daily: bool = LOG_ROTATE_DAILY,
+        history_store: TrafficHistoryStore | None = None,
+        junction: str = HISTORY_JUNCTION,
+    ) -> None:
+        super().__init__(name="traffic-log-writer", daemon=True)
+        self.log_file = Path(log_file)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.rotate_daily = rotate_daily
+        self.history_store = history_store
+        self.junction = junction
+        self.rows_written = 0
+        self.error: Exception | None = None
+        self.history_error: Exception | None = None
+
+        self._queue: queue.Queue = queue.Queue()
+        self._handle: TextIO | None = None
+        self._writer: csv.DictWriter | None = None
+        self._fieldnames: List[str] | None = None
+        self._file_day: str | None = None
+        self._closing = False
+
+    def check(self) -> None:
+        # Rows queued after the writer thread has died would only pile up in memory and never reach disk.
+        if self.error is not None:
+            raise RuntimeError(f"{self.name} failed: {self.error}") from self.error
+        if not self._closing and not self.is_alive():
+            raise RuntimeError(f"{self.name} is not running.")
+
+    def write(self, timestamp: str, lane_counts: Dict[int, int], signal_state: dict) -> None:
+        self.check()
+        self._queue.put(build_log_row(timestamp, lane_counts, signal_state))
+
+    def close(self, timeout: float | None = 10.0) -> None:
+        self._closing = True
+        self._queue.put(_STOP)
+        if self.is_alive():
+            self.join(timeout=timeout)
+
+    def run(self) -> None:
+        batch: List[dict] = []
+        deadline = time.monotonic() + self.flush_interval
+        stopping = False
+        try:
+            while not stopping:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0.0))
+                except queue.Empty:
+                    item = None
+
+                if item is _STOP:
+                    stopping = True
+                elif item is not None:
+                    batch.append(item)
+
+                if batch and (stopping or len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                    with metrics.span("log.flush"):
+                        self._write_rows(batch)
+                    metrics.increment("log.rows", len(batch))
+                    batch = []
+                if time.monotonic() >= deadline:
+                    deadline = time.monotonic() + self.flush_interval
+        except Exception as error:
+            self.error = error
+        finally:
+            self._close_file()
+
+    def _write_rows(self, rows: List[dict]) -> None:
+        for row in rows:
+            fieldnames = list(row.keys())
+            day = str(row["timestamp"])[:10]
+            if self._handle is None:
+                self._open_file(fieldnames)
+            if fieldnames != self._fieldnames or self._needs_rotation(day):
+                self._rotate(fieldnames)
+            if self._file_day is None:
+                self._file_day = day
+            self._writer.writerow(row)
+            self.rows_written += 1
+        self._handle.flush()
+        if self.history_store is not None:
+            # The CSV is the record of truth; a failing history store must not stop it being written.
+            try:
+                self.history_store.append(rows, self.junction)
+            except Exception as error:
+                self.history_error = error
+                metrics.increment("log.history_errors")
+
+    def _open_file(self, fieldnames: List[str]) -> None:
+        self.log_file.parent.mkdir(parents=True, exist_ok=True)
+        existing_header: List[str] | None = None
+        first_row: List[str] | None = None
+        if self.log_file.exists() and self.log_file.stat().st_size > 0:
+            with self.log_file.open("r", newline="", encoding="utf-8") as csv_file:
+                reader = csv.reader(csv_file)
+                existing_header = next(reader, None)
+                first_row = next(reader, None)
+
+        # Only append to a file whose columns match; otherwise start a fresh one. Daily rotation only
+        # counts days this writer has logged, so rows left by an earlier run never trigger it on their own.
+        if existing_header is not None and existing_header != fieldnames:
+            self._archive_current_file(first_row[0][:10] if first_row else None)
+            existing_header = None
+
+        self._handle = self.log_file.open("a", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._handle, fieldnames=fieldnames)
+        self._fieldnames = fieldnames
+        if existing_header is None:
+            self._writer.writeheader()
+
+    def _needs_rotation(self, day: str) -> bool:
+        if self.rotate_daily and self._file_day is not None and day != self._file_day:
+            return True
+        return self.max_bytes > 0 and self._handle.tell() >= self.max_bytes
+
+    def _rotate(self, fieldnames: List[str]) -> None:
+        self._close_file()
+        self._archive_current_file()
+        self._open_file(fieldnames)
+
+    def _archive_current_file(self, day: str | None = None) -> None:
+        if not self.log_file.exists():
+            return
+        tag = day or self._file_day or time.strftime("%Y-%m-%d")
+        index = 0
+        while True:
+            suffix = f".{tag}" if index == 0 else f".{tag}.{index}"
+            target = self.log_file.with_name(f"{self.log_file.stem}{suffix}{self.log_file.suffix}")
+            if not target.exists():
+                break
+            index += 1
+        self.log_file.rename(target)
+        self._file_day = None
+
+    def _close_file(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+        self._handle = None
+        self._writer = None
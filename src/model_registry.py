@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Tuple
+
+import numpy as np
+
+from .backends import BACKENDS, load_cached_export, load_exported_model
+from .config import (
+    FRAME_HEIGHT,
+    FRAME_WIDTH,
+    INFERENCE_IMAGE_SIZE,
+    MODEL_BACKEND,
+    MODEL_PATH,
+    MODEL_WARMUP_RUNS,
+)
+
+if TYPE_CHECKING:
+    from ultralytics import YOLO
+
+_models: Dict[Tuple[str, str], YOLO] = {}
+_load_times: Dict[Tuple[str, str], float] = {}
+_preloads: Dict[Tuple[str, str], threading.Thread] = {}
+_load_errors: Dict[Tuple[str, str], Exception] = {}
+_lock = threading.Lock()
+
+
+def _model_key(model_path: Path, backend: str) -> Tuple[str, str]:
+    return str(Path(model_path).resolve()), backend
+
+
+def load_torch_model(model_path: Path) -> YOLO:
+    # Importing ultralytics pulls in torch, which dominates cold start; only pay for it when a model loads.
+    from ultralytics import YOLO
+
+    model_path = Path(model_path)
+    should_use_local = model_path.exists() and model_path.stat().st_size > 1_000_000
+    model_source = str(model_path) if should_use_local else "yolov8n.pt"
+
+    try:
+        model = YOLO(model_source)
+    except Exception:
+        model = YOLO("yolov8n.pt")
+
+    # Keep a local copy in /models when possible for predictable project layout.
+    if not should_use_local:
+        try:
+            checkpoint_path = Path(model.ckpt_path)
+            model_path.parent.mkdir(parents=True, exist_ok=True)
+            if checkpoint_path.exists() and checkpoint_path != model_path:
+                shutil.copy(checkpoint_path, model_path)
+        except Exception:
+            pass
+
+    return model
+
+
+def warmup_model(
+    model: YOLO,
+    runs: int = MODEL_WARMUP_RUNS,
+    frame_size: tuple[int, int] = (FRAME_WIDTH, FRAME_HEIGHT),
+) -> None:
+    # The first predict call builds the predictor and fuses layers; pay that at load time.
+    blank_frame = np.zeros((frame_size[1], frame_size[0], 3), dtype=np.uint8)
+    for _ in range(max(0, runs)):
+        model.predict(source=blank_frame, imgsz=INFERENCE_IMAGE_SIZE, verbose=False)
+
+
+def get_model(
+    model_path: Path = MODEL_PATH,
+    backend: str = MODEL_BACKEND,
+    warmup_runs: int = MODEL_WARMUP_RUNS,
+) -> YOLO:
+    key = _model_key(model_path, backend)
+    with _lock:
+        model = _models.get(key)
+        if model is not None:
+            return model
+
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown model backend '{backend}', expected one of {BACKENDS}.")
+
+        started = time.perf_counter()
+        model = load_cached_export(Path(model_path), backend)
+        if model is None:
+            model = load_torch_model(Path(model_path))
+            if backend != "torch":
+                checkpoint_path = Path(model_path)
+                if not checkpoint_path.exists():
+                    checkpoint_path = Path(model.ckpt_path)
+                model = load_exported_model(model, checkpoint_path, backend)
+        warmup_model(model, runs=warmup_runs)
+        _models[key] = model
+        _load_times[key] = time.perf_counter() - started
+        return model
+
+
+def preload_model(
+    model_path: Path = MODEL_PATH,
+    backend: str = MODEL_BACKEND,
+    warmup_runs: int = MODEL_WARMUP_RUNS,
+) -> None:
+    key = _model_key(model_path, backend)
+    with _lock:
+        if key in _models or (key in _preloads and _preloads[key].is_alive()):
+            return
+        _load_errors.pop(key, None)
+
+        def load() -> None:
+            try:
+                get_model(model_path, backend, warmup_runs)
+            except Exception as error:
+                _load_errors[key] = error
+
+        thread = threading.Thread(target=load, name=f"model-preload-{backend}", daemon=True)
+        _preloads[key] = thread
+        thread.start()
+
+
+def model_status(model_path: Path = MODEL_PATH, backend: str = MODEL_BACKEND) -> str:
+    # Lock-free on purpose: get_model holds the lock for the whole load.
+    key = _model_key(model_path, backend)
+    if key in _models:
+        return "ready"
+    if key in _load_errors:
+        return "failed"
+    thread = _preloads.get(key)
+    return "loading" if thread is not None and thread.is_alive() else "idle"
+
+
+def model_error(model_path: Path = MODEL_PATH, backend: str = MODEL_BACKEND) -> Exception | None:
+    return _load_errors.get(_model_key(model_path, backend))
+
+
+def loaded_models() -> Dict[Tuple[str, str], float]:
+    with _lock:
+        return dict(_load_times)
+
+
+def clear_models() -> None:
+    with _lock:
+        _models.clear()
+        _load_times.clear()
+        _load_errors.clear()
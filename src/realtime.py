@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import math
+from typing import Dict, Iterable
+
+from .config import REALTIME_LATENCY_BUDGET, REALTIME_PATIENCE, REALTIME_SCALES
+from .roi import MODEL_STRIDE
+
+
+class LaneLatency:
+    __slots__ = ("last", "mean", "max", "samples")
+
+    def __init__(self) -> None:
+        self.last = 0.0
+        self.mean = 0.0
+        self.max = 0.0
+        self.samples = 0
+
+    def update(self, latency: float) -> None:
+        self.last = latency
+        self.mean = 0.8 * self.mean + 0.2 * latency if self.samples else latency
+        self.max = max(self.max, latency)
+        self.samples += 1
+
+
+class LatencyGovernor:
+    def __init__(
+        self,
+        lane_ids: Iterable[int],
+        budget: float = REALTIME_LATENCY_BUDGET,
+        scales: Iterable[float] = REALTIME_SCALES,
+        patience: int = REALTIME_PATIENCE,
+    ) -> None:
+        self.budget = budget
+        self.scales = tuple(sorted(scales, reverse=True))
+        if not self.scales or self.scales[0] > 1.0 or self.scales[-1] <= 0.0:
+            raise ValueError("Real-time scales must lie in (0, 1].")
+        self.patience = max(1, patience)
+        self.level = 0
+        self.lanes: Dict[int, LaneLatency] = {lane_id: LaneLatency() for lane_id in lane_ids}
+        self._over_budget = 0
+        self._under_budget = 0
+
+    @property
+    def scale(self) -> float:
+        return self.scales[self.level]
+
+    def update(self, latencies: Dict[int, float]) -> float:
+        for lane_id, latency in latencies.items():
+            self.lanes.setdefault(lane_id, LaneLatency()).update(latency)
+        worst = max((self.lanes[lane_id].mean for lane_id in latencies), default=0.0)
+
+        # Step down quickly when over budget, but only step back up after a longer stretch well under it,
+        # so the resolution does not oscillate around the budget.
+        if worst > self.budget:
+            self._over_budget += 1
+            self._under_budget = 0
+            if self._over_budget >= self.patience and self.level < len(self.scales) - 1:
+                self.level += 1
+                self._over_budget = 0
+        elif worst < 0.5 * self.budget:
+            self._under_budget += 1
+            self._over_budget = 0
+            if self._under_budget >= 4 * self.patience and self.level > 0:
+                self.level -= 1
+                self._under_budget = 0
+        else:
+            self._over_budget = 0
+            self._under_budget = 0
+        return worst
+
+    def image_size(self, base: tuple[int, int]) -> tuple[int, int]:
+        height, width = base
+        return (
+            max(MODEL_STRIDE, math.ceil(height * self.scale / MODEL_STRIDE) * MODEL_STRIDE),
+            max(MODEL_STRIDE, math.ceil(width * self.scale / MODEL_STRIDE) * MODEL_STRIDE),
+        )
+
+    def stats(self) -> Dict[int, dict]:
+        return {
+            lane_id: {
+                "latency_ms": round(lane.last * 1000.0, 1),
+                "mean_latency_ms": round(lane.mean * 1000.0, 1),
+                "max_latency_ms": round(lane.max * 1000.0, 1),
+            }
+            for lane_id, lane in self.lanes.items()
+        }
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import math
+from typing import Dict, Iterable, Mapping, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from .config import FRAME_HEIGHT, FRAME_WIDTH, INFERENCE_IMAGE_SIZE, LANE_ROIS
+
+MODEL_STRIDE = 32
+
+
+class LaneROI:
+    def __init__(
+        self,
+        polygon: Sequence[Tuple[float, float]],
+        frame_size: tuple[int, int] = (FRAME_WIDTH, FRAME_HEIGHT),
+    ) -> None:
+        width, height = frame_size
+        points = np.array(polygon, dtype=np.float64) * (width, height)
+        self.points = np.round(points).astype(np.int32)
+        self.x, self.y, self.width, self.height = cv2.boundingRect(self.points)
+        self.x, self.y = max(self.x, 0), max(self.y, 0)
+        self.width = min(self.width, width - self.x)
+        self.height = min(self.height, height - self.y)
+
+        self.mask = np.zeros((self.height, self.width), dtype=np.uint8)
+        cv2.fillPoly(self.mask, [self.points - (self.x, self.y)], 255)
+        self.pixel_ratio = float(self.width * self.height) / (width * height)
+
+    def crop(self, frame: np.ndarray) -> np.ndarray:
+        region = frame[self.y : self.y + self.height, self.x : self.x + self.width]
+        return cv2.bitwise_and(region, region, mask=self.mask)
+
+    def to_frame(self, detections: np.ndarray) -> np.ndarray:
+        if not len(detections):
+            return detections
+        # Keep only boxes whose centre falls inside the polygon, then shift to frame coordinates.
+        centre_x = (detections["x1"] + detections["x2"]) // 2
+        centre_y = (detections["y1"] + detections["y2"]) // 2
+        in_crop = (centre_x >= 0) & (centre_x < self.width) & (centre_y >= 0) & (centre_y < self.height)
+        in_polygon = np.zeros(len(detections), dtype=bool)
+        in_polygon[in_crop] = self.mask[centre_y[in_crop], centre_x[in_crop]] > 0
+        inside = detections[in_polygon]
+        inside["x1"] += self.x
+        inside["x2"] += self.x
+        inside["y1"] += self.y
+        inside["y2"] += self.y
+        return inside
+
+    def draw(self, frame: np.ndarray) -> np.ndarray:
+        cv2.polylines(frame, [self.points], True, (0, 215, 255), 2, cv2.LINE_AA)
+        return frame
+
+
+class RegionCropper:
+    def __init__(
+        self,
+        lane_ids: Iterable[int],
+        polygons: Mapping[int, Sequence[Tuple[float, float]]] = LANE_ROIS,
+        frame_size: tuple[int, int] = (FRAME_WIDTH, FRAME_HEIGHT),
+    ) -> None:
+        self.rois: Dict[int, LaneROI] = {
+            lane_id: LaneROI(polygons[lane_id], frame_size) for lane_id in lane_ids if polygons.get(lane_id)
+        }
+        self.frame_size = frame_size
+
+    def __bool__(self) -> bool:
+        return bool(self.rois)
+
+    def crop_frames(self, frames: Mapping[int, np.ndarray]) -> Dict[int, np.ndarray]:
+        return {
+            lane_id: self.rois[lane_id].crop(frame) if lane_id in self.rois else frame
+            for lane_id, frame in frames.items()
+        }
+
+    def restore(self, detections: Mapping[int, np.ndarray]) -> Dict[int, np.ndarray]:
+        return {
+            lane_id: self.rois[lane_id].to_frame(lane_detections) if lane_id in self.rois else lane_detections
+            for lane_id, lane_detections in detections.items()
+        }
+
+    def inference_image_size(self, lane_ids: Iterable[int]) -> tuple[int, int]:
+        # Smallest stride-aligned size that holds every crop at native scale, so crops are never upscaled.
+        height, width = 0, 0
+        for lane_id in lane_ids:
+            roi = self.rois.get(lane_id)
+            crop_width, crop_height = (roi.width, roi.height) if roi else self.frame_size
+            height, width = max(height, crop_height), max(width, crop_width)
+        height = min(INFERENCE_IMAGE_SIZE[0], math.ceil(height / MODEL_STRIDE) * MODEL_STRIDE)
+        width = min(INFERENCE_IMAGE_SIZE[1], math.ceil(width / MODEL_STRIDE) * MODEL_STRIDE)
+        return height, width
+
+    def draw(self, lane_id: int, frame: np.ndarray) -> np.ndarray:
+        roi = self.rois.get(lane_id)
+        return roi.draw(frame) if roi else frame
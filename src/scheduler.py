@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from typing import Dict, Hashable, Iterable, Mapping
+
+import cv2
+import numpy as np
+
+from .config import INFERENCE_MAX_STALENESS, INFERENCE_MIN_INTERVAL, MOTION_THRESHOLD
+
+
+class LaneScheduleState:
+    __slots__ = ("reference", "detections", "frames_since_inference", "ticks", "skipped", "motion_score")
+
+    def __init__(self) -> None:
+        self.reference: np.ndarray | None = None
+        self.detections: np.ndarray | None = None
+        self.frames_since_inference = 0
+        self.ticks = 0
+        self.skipped = 0
+        self.motion_score = 0.0
+
+
+class InferenceScheduler:
+    def __init__(
+        self,
+        detector,
+        lane_ids: Iterable[Hashable],
+        motion_threshold: float = MOTION_THRESHOLD,
+        min_interval: int = INFERENCE_MIN_INTERVAL,
+        max_staleness: int = INFERENCE_MAX_STALENESS,
+        thumbnail_size: tuple[int, int] = (80, 45),
+        pixel_delta: int = 20,
+    ) -> None:
+        self.detector = detector
+        self.motion_threshold = motion_threshold
+        self.min_interval = max(1, min_interval)
+        self.max_staleness = max(1, max_staleness)
+        self.thumbnail_size = thumbnail_size
+        self.pixel_delta = pixel_delta
+        self._lanes: Dict[Hashable, LaneScheduleState] = {lane_id: LaneScheduleState() for lane_id in lane_ids}
+        self._settings: tuple | None = None
+        self.fresh_lanes: set = set()
+
+    def _thumbnail(self, frame: np.ndarray) -> np.ndarray:
+        small = cv2.resize(frame, self.thumbnail_size, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+    def _should_infer(self, state: LaneScheduleState, thumbnail: np.ndarray) -> bool:
+        if state.detections is None or state.reference is None:
+            return True
+        # Compare against the frame last sent to the detector so slow changes still accumulate.
+        changed = cv2.absdiff(thumbnail, state.reference) > self.pixel_delta
+        state.motion_score = float(np.count_nonzero(changed)) / changed.size
+        if state.frames_since_inference >= self.max_staleness:
+            return True
+        return state.frames_since_inference >= self.min_interval and state.motion_score >= self.motion_threshold
+
+    def detect_batch(
+        self,
+        frames: Mapping[Hashable, np.ndarray],
+        **options,
+    ) -> Dict[Hashable, np.ndarray]:
+        settings = tuple(sorted(options.items()))
+        if settings != self._settings:
+            self.reset()
+            self._settings = settings
+
+        thumbnails = {}
+        pending = {}
+        for lane_id, frame in frames.items():
+            state = self._lanes.setdefault(lane_id, LaneScheduleState())
+            state.ticks += 1
+            # Counts the current frame, so min_interval=1 allows inference on the very next frame.
+            state.frames_since_inference += 1
+            thumbnails[lane_id] = self._thumbnail(frame)
+            if self._should_infer(state, thumbnails[lane_id]):
+                pending[lane_id] = frame
+            else:
+                state.skipped += 1
+
+        self.fresh_lanes = set(pending)
+        if pending:
+            fresh = self.detector.detect_batch(pending, **options)
+            for lane_id, detections in fresh.items():
+                state = self._lanes[lane_id]
+                state.detections = detections
+                state.reference = thumbnails[lane_id]
+                state.frames_since_inference = 0
+
+        return {lane_id: self._lanes[lane_id].detections for lane_id in frames}
+
+    def skip_ratios(self) -> Dict[Hashable, float]:
+        return {
+            lane_id: (state.skipped / state.ticks if state.ticks else 0.0)
+            for lane_id, state in self._lanes.items()
+        }
+
+    def motion_scores(self) -> Dict[Hashable, float]:
+        return {lane_id: round(state.motion_score, 4) for lane_id, state in self._lanes.items()}
+
+    def reset(self) -> None:
+        for state in self._lanes.values():
+            state.reference = None
+            state.detections = None
+            state.frames_since_inference = 0
@@ -0,0 +1,387 @@
+from __future__ import annotations
+
+import multiprocessing as mp
+import time
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+import cv2
+import numpy as np
+
+from .config import (
+    CAPTURE_READ_TIMEOUT,
+    FRAME_HEIGHT,
+    FRAME_WIDTH,
+    SHM_CAPTURE_PROCESSES,
+    SHM_RING_SLOTS,
+    SIMULATION_READ_MODE,
+    WEBCAM_READ_MODE,
+)
+from .capture import PlaybackPacer, source_position
+from .metrics import metrics
+from .utils import read_lane_frame, skip_frames, split_webcam_into_lanes
+
+READ_MODES = ("latest", "next")
+SLOT_DTYPE = np.dtype(
+    [("lane_id", np.int32), ("sequence", np.int64), ("timestamp", np.float64), ("position", np.int64)]
+)
+# control: [head slot, head sequence, slot held by the reader, closed flag]
+HEAD_SLOT, HEAD_SEQUENCE, HELD_SLOT, CLOSED = range(4)
+_ALIGNMENT = 64
+
+
+def _aligned(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+@dataclass
+class SharedFrame:
+    lane_id: int
+    sequence: int
+    timestamp: float
+    frame: np.ndarray
+    position: int = -1
+
+
+class SharedFrameRing:
+    def __init__(
+        self,
+        lane_id: int,
+        slots: int = SHM_RING_SLOTS,
+        frame_size: tuple[int, int] = (FRAME_WIDTH, FRAME_HEIGHT),
+        drop_oldest: bool = False,
+        name: str | None = None,
+        condition=None,
+        context=None,
+    ) -> None:
+        # One ring per lane: a control block, per-slot metadata and the frame slots, all in one
+        # shared-memory segment. Only metadata changes under the lock; pixels never do.
+        self.lane_id = lane_id
+        self.slots = max(3, slots)
+        self.frame_size = frame_size
+        self.drop_oldest = drop_oldest
+        width, height = frame_size
+        self._meta_offset = _aligned(4 * np.dtype(np.int64).itemsize)
+        self._frames_offset = _aligned(self._meta_offset + self.slots * SLOT_DTYPE.itemsize)
+        size = self._frames_offset + self.slots * height * width * 3
+
+        self.owner = name is None
+        if self.owner:
+            self._block = shared_memory.SharedMemory(create=True, size=size)
+            self.condition = (context or mp.get_context()).Condition()
+        else:
+            # Capture processes inherit the parent's resource tracker, so attaching registers nothing new
+            # and only the owner unlinks.
+            self._block = shared_memory.SharedMemory(name=name)
+            self.condition = condition
+        self.name = self._block.name
+
+        buffer = self._block.buf
+        self.control = np.ndarray((4,), dtype=np.int64, buffer=buffer)
+        self.meta = np.ndarray((self.slots,), dtype=SLOT_DTYPE, buffer=buffer, offset=self._meta_offset)
+        self.frames = np.ndarray(
+            (self.slots, height, width, 3), dtype=np.uint8, buffer=buffer, offset=self._frames_offset
+        )
+        if self.owner:
+            self.control[:] = (-1, -1, -1, 0)
+            self.meta["lane_id"] = lane_id
+            self.meta["sequence"] = -1
+        self._last_sequence = -1
+        self._write_sequence = 0
+
+    def __reduce__(self):
+        return (
+            SharedFrameRing,
+            (self.lane_id, self.slots, self.frame_size, self.drop_oldest, self.name, self.condition),
+        )
+
+    @property
+    def closed(self) -> bool:
+        return bool(self.control[CLOSED])
+
+    def acquire_slot(self, timeout: float | None = None) -> tuple[int, np.ndarray] | None:
+        with self.condition:
+            while True:
+                if self.control[CLOSED]:
+                    return None
+                slot = self._free_slot()
+                if slot is not None:
+                    # Mark the slot as being written so a reader can never pick it up half-filled.
+                    self.meta["sequence"][slot] = -1
+                    return slot, self.frames[slot]
+                if not self.condition.wait(timeout):
+                    return None
+
+    def _free_slot(self) -> int | None:
+        held = self.control[HELD_SLOT]
+        sequences = self.meta["sequence"]
+        candidates = [slot for slot in range(self.slots) if slot != held and slot != self.control[HEAD_SLOT]]
+        unread = [slot for slot in candidates if sequences[slot] > self._reader_position()]
+        free = [slot for slot in candidates if slot not in unread]
+        if free:
+            return min(free, key=lambda slot: sequences[slot])
+        if self.drop_oldest and unread:
+            # A live source overwrites its oldest unread frame instead of waiting for the reader.
+            return min(unread, key=lambda slot: sequences[slot])
+        return None
+
+    def _reader_position(self) -> int:
+        held = self.control[HELD_SLOT]
+        return int(self.meta["sequence"][held]) if held >= 0 else -1
+
+    def commit(self, slot: int, timestamp: float | None = None, skipped: int = 0, position: int = -1) -> int:
+        with self.condition:
+            # Frames the source skipped still consume sequence numbers so readers can count them.
+            self._write_sequence += skipped
+            sequence = self._write_sequence
+            self._write_sequence += 1
+            self.meta["timestamp"][slot] = time.time() if timestamp is None else timestamp
+            self.meta["position"][slot] = position
+            self.meta["sequence"][slot] = sequence
+            self.control[HEAD_SLOT] = slot
+            self.control[HEAD_SEQUENCE] = sequence
+            self.condition.notify_all()
+            return sequence
+
+    def write(self, frame: np.ndarray, timestamp: float | None = None, timeout: float | None = None) -> int | None:
+        acquired = self.acquire_slot(timeout)
+        if acquired is None:
+            return None
+        slot, view = acquired
+        if frame.shape == view.shape:
+            np.copyto(view, frame)
+        else:
+            cv2.resize(frame, self.frame_size, dst=view)
+        return self.commit(slot, timestamp)
+
+    def read(self, mode: str = "next", timeout: float | None = CAPTURE_READ_TIMEOUT) -> SharedFrame | None:
+        # The returned frame is a view into shared memory; it stays valid until the next read.
+        with self.condition:
+            if not self.condition.wait_for(
+                lambda: self.control[HEAD_SEQUENCE] > self._last_sequence or self.control[CLOSED], timeout=timeout
+            ):
+                return None
+            if self.control[HEAD_SEQUENCE] <= self._last_sequence:
+                return None
+            sequences = self.meta["sequence"]
+            if mode == "latest":
+                slot = int(self.control[HEAD_SLOT])
+            else:
+                newer = [slot for slot in range(self.slots) if sequences[slot] > self._last_sequence]
+                slot = min(newer, key=lambda slot: sequences[slot])
+            self.control[HELD_SLOT] = slot
+            self._last_sequence = int(sequences[slot])
+            self.condition.notify_all()
+            return SharedFrame(
+                lane_id=self.lane_id,
+                sequence=self._last_sequence,
+                timestamp=float(self.meta["timestamp"][slot]),
+                frame=self.frames[slot],
+                position=int(self.meta["position"][slot]),
+            )
+
+    def close(self) -> None:
+        with self.condition:
+            self.control[CLOSED] = 1
+            self.condition.notify_all()
+
+    def release(self) -> None:
+        self.control = self.meta = self.frames = None
+        try:
+            self._block.close()
+        except BufferError:
+            # A caller still holds a frame view; the mapping goes away with the last view.
+            pass
+        if self.owner:
+            self._block.unlink()
+
+
+def _fill_simulation_slot(
+    ring: SharedFrameRing, capture: cv2.VideoCapture, pacer: PlaybackPacer | None, stop_event
+) -> None:
+    # The slot comes first: frames the pacer skips must reach commit() to be counted as dropped, and a
+    # timed-out acquire then leaves the pacer and the capture position untouched.
+    acquired = ring.acquire_slot(timeout=0.5)
+    if acquired is None:
+        return
+    skipped = pacer.frames_to_skip(stop_event) if pacer is not None else 0
+    if skipped:
+        skip_frames(capture, skipped)
+    slot, view = acquired
+    read_lane_frame(capture, ring.lane_id, ring.frame_size, out=view)
+    ring.commit(slot, skipped=skipped, position=source_position(capture))
+
+
+def _simulation_capture_main(
+    rings: List[SharedFrameRing], video_paths: List[str], stop_event, realtime: bool = False
+) -> None:
+    captures = [cv2.VideoCapture(video_path) for video_path in video_paths]
+    pacers = [PlaybackPacer(capture.get(cv2.CAP_PROP_FPS)) if realtime else None for capture in captures]
+    try:
+        while not stop_event.is_set() and not any(ring.closed for ring in rings):
+            for ring, capture, pacer in zip(rings, captures, pacers):
+                _fill_simulation_slot(ring, capture, pacer, stop_event)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for capture in captures:
+            capture.release()
+        for ring in rings:
+            ring.release()
+
+
+def _fill_webcam_slots(rings: List[SharedFrameRing], frame: np.ndarray) -> None:
+    acquired = [ring.acquire_slot(timeout=0.5) for ring in rings]
+    if any(item is None for item in acquired):
+        return
+    split_webcam_into_lanes(
+        frame,
+        lane_ids=[ring.lane_id for ring in rings],
+        frame_size=rings[0].frame_size,
+        out={ring.lane_id: view for ring, (_, view) in zip(rings, acquired)},
+    )
+    timestamp = time.time()
+    for ring, (slot, _) in zip(rings, acquired):
+        ring.commit(slot, timestamp)
+
+
+def _webcam_capture_main(rings: List[SharedFrameRing], webcam_index: int, stop_event, realtime: bool = False) -> None:
+    capture = cv2.VideoCapture(webcam_index)
+    if realtime:
+        capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    try:
+        while not stop_event.is_set() and not any(ring.closed for ring in rings):
+            success, frame = capture.read()
+            if not success:
+                raise RuntimeError("Could not read frame from webcam.")
+            _fill_webcam_slots(rings, frame)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        capture.release()
+        for ring in rings:
+            ring.release()
+
+
+class SharedMemoryCaptureGroup:
+    # Drop-in for CaptureGroup: decode and resize run in child processes that write straight into
+    # shared-memory rings, and read() hands back views of those rings instead of pickled copies.
+    def __init__(self, rings: Iterable[SharedFrameRing], processes: Iterable, stop_event, read_mode: str) -> None:
+        if read_mode not in READ_MODES:
+            raise ValueError(f"Unknown read mode '{read_mode}', expected one of {READ_MODES}.")
+        self.rings: Dict[int, SharedFrameRing] = {ring.lane_id: ring for ring in rings}
+        self.processes = list(processes)
+        self.read_mode = read_mode
+        self.frame_timestamps: Dict[int, float] = {}
+        self.dropped_frames: Dict[int, int] = {lane_id: 0 for lane_id in self.rings}
+        self.frame_positions: Dict[int, int] = {}
+        self._stop_event = stop_event
+        self._last: Dict[int, SharedFrame] = {}
+
+    def start(self) -> "SharedMemoryCaptureGroup":
+        for process in self.processes:
+            process.start()
+        return self
+
+    def read(self, mode: str | None = None, timeout: float | None = CAPTURE_READ_TIMEOUT) -> Dict[int, np.ndarray]:
+        lane_frames: Dict[int, np.ndarray] = {}
+        for lane_id, ring in self.rings.items():
+            with metrics.span("capture.shm_read"):
+                item = ring.read(mode or self.read_mode, timeout=timeout)
+            if item is None:
+                dead = [process.name for process in self.processes if not process.is_alive()]
+                if dead:
+                    raise RuntimeError(f"Capture process {', '.join(dead)} exited.")
+                if lane_id not in self._last:
+                    raise RuntimeError(f"Lane {lane_id} produced no frames within {timeout}s.")
+                # Nothing new decoded yet: repeat the previous frame instead of stalling the pipeline.
+                item = self._last[lane_id]
+            previous = self._last.get(lane_id)
+            if previous is not None and item.sequence > previous.sequence + 1:
+                dropped = item.sequence - previous.sequence - 1
+                self.dropped_frames[lane_id] += dropped
+                metrics.increment("capture.dropped", dropped)
+            self.frame_timestamps[lane_id] = item.timestamp
+            if item.position >= 0:
+                self.frame_positions[lane_id] = item.position
+            self._last[lane_id] = item
+            lane_frames[lane_id] = item.frame
+        return lane_frames
+
+    def frame_info(self) -> Dict[int, SharedFrame]:
+        return dict(self._last)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        for ring in self.rings.values():
+            ring.close()
+        for process in self.processes:
+            process.join(timeout=2.0)
+            if process.is_alive():
+                process.terminate()
+                process.join(timeout=1.0)
+        self._last.clear()
+        for ring in self.rings.values():
+            ring.release()
+        self.rings.clear()
+
+
+def start_shared_simulation_capture(
+    video_paths: Dict[int, Path],
+    frame_size: tuple[int, int] = (FRAME_WIDTH, FRAME_HEIGHT),
+    slots: int = SHM_RING_SLOTS,
+    read_mode: str = SIMULATION_READ_MODE,
+    processes: int = SHM_CAPTURE_PROCESSES,
+    realtime: bool = False,
+) -> SharedMemoryCaptureGroup:
+    # Spawned rather than forked: the parent may already run model, capture and dashboard threads.
+    context = mp.get_context("spawn")
+    stop_event = context.Event()
+    lane_ids = list(video_paths)
+    rings = {
+        lane_id: SharedFrameRing(lane_id, slots=slots, frame_size=frame_size, drop_oldest=realtime, context=context)
+        for lane_id in lane_ids
+    }
+    workers = []
+    process_count = max(1, min(processes, len(lane_ids)))
+    for index in range(process_count):
+        assigned = lane_ids[index::process_count]
+        workers.append(
+            context.Process(
+                target=_simulation_capture_main,
+                args=(
+                    [rings[lane_id] for lane_id in assigned],
+                    [str(video_paths[lane_id]) for lane_id in assigned],
+                    stop_event,
+                    realtime,
+                ),
+                name="capture-" + "-".join(f"lane{lane_id}" for lane_id in assigned),
+                daemon=True,
+            )
+        )
+    return SharedMemoryCaptureGroup(rings.values(), workers, stop_event, "latest" if realtime else read_mode).start()
+
+
+def start_shared_webcam_capture(
+    webcam_index: int,
+    lane_ids: Iterable[int],
+    frame_size: tuple[int, int] = (FRAME_WIDTH, FRAME_HEIGHT),
+    slots: int = SHM_RING_SLOTS,
+    read_mode: str = WEBCAM_READ_MODE,
+    realtime: bool = False,
+) -> SharedMemoryCaptureGroup:
+    context = mp.get_context("spawn")
+    stop_event = context.Event()
+    rings = [
+        SharedFrameRing(lane_id, slots=slots, frame_size=frame_size, drop_oldest=True, context=context)
+        for lane_id in lane_ids
+    ]
+    process = context.Process(
+        target=_webcam_capture_main,
+        args=(rings, webcam_index, stop_event, realtime),
+        name="webcam-capture",
+        daemon=True,
+    )
+    return SharedMemoryCaptureGroup(rings, [process], stop_event, "latest" if realtime else read_mode).start()
@@ -1,18 +1,64 @@
 from __future__ import annotations
 
+import bisect
+import json
 import math
-from dataclasses import dataclass
-from typing import Dict, Iterable, List
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
 
 from .config import (
+    DENSITY_GREEN_TIMES,
+    DENSITY_THRESHOLDS,
     MAX_GREEN_TIME,
     MIN_GREEN_TIME,
+    SIGNAL_TIMING_FILE,
     TOTAL_CYCLE_TIME,
     VEHICLE_WEIGHT,
     WAITING_WEIGHT,
 )
 
 
+@dataclass(frozen=True)
+class SignalTiming:
+    vehicle_weight: float = VEHICLE_WEIGHT
+    waiting_weight: float = WAITING_WEIGHT
+    min_green_time: int = MIN_GREEN_TIME
+    max_green_time: int = MAX_GREEN_TIME
+    total_cycle_time: int = TOTAL_CYCLE_TIME
+    density_thresholds: Tuple[int, ...] = DENSITY_THRESHOLDS
+    density_green_times: Tuple[int, ...] = DENSITY_GREEN_TIMES
+
+    def __post_init__(self) -> None:
+        if len(self.density_green_times) != len(self.density_thresholds) + 1:
+            raise ValueError("density_green_times needs one more entry than density_thresholds.")
+        if self.min_green_time > self.max_green_time:
+            raise ValueError("min_green_time cannot exceed max_green_time.")
+
+    def to_dict(self) -> dict:
+        values = asdict(self)
+        values["density_thresholds"] = list(self.density_thresholds)
+        values["density_green_times"] = list(self.density_green_times)
+        return values
+
+    @classmethod
+    def from_dict(cls, values: dict) -> "SignalTiming":
+        known = {field.name for field in fields(cls)}
+        overrides = {key: value for key, value in values.items() if key in known}
+        for key in ("density_thresholds", "density_green_times"):
+            if key in overrides:
+                overrides[key] = tuple(int(value) for value in overrides[key])
+        return cls(**overrides)
+
+
+def load_signal_timing(path: Path | None = SIGNAL_TIMING_FILE) -> SignalTiming:
+    # A tuned timing file overrides the config.py defaults; a missing file means defaults.
+    if path is None or not Path(path).exists():
+        return SignalTiming()
+    values = json.loads(Path(path).read_text(encoding="utf-8"))
+    return SignalTiming.from_dict(values.get("timing", values))
+
+
 @dataclass
 class LaneState:
     lane_id: int
@@ -22,14 +68,15 @@ class LaneState:
 
 
 class AdaptiveSignalController:
-    def __init__(self, lane_ids: Iterable[int]) -> None:
+    def __init__(self, lane_ids: Iterable[int], timing: SignalTiming | None = None) -> None:
         self.lane_ids: List[int] = list(lane_ids)
         self.lanes: Dict[int, LaneState] = {lane_id: LaneState(lane_id) for lane_id in self.lane_ids}
+        self.timing = timing or SignalTiming()
 
         self.pending_cycle_lanes = set(self.lane_ids)
         self.current_green_lane: int | None = None
-        self.current_green_time: int = MIN_GREEN_TIME
-        self.current_countdown: float = float(MIN_GREEN_TIME)
+        self.current_green_time: int = self.timing.min_green_time
+        self.current_countdown: float = float(self.timing.min_green_time)
         self.cycle_elapsed: int = 0
 
     def bootstrap(self, lane_counts: Dict[int, int]) -> None:
@@ -59,30 +106,32 @@ class AdaptiveSignalController:
     def _recompute_priorities(self) -> None:
         for lane_state in self.lanes.values():
             lane_state.priority_score = (
-                lane_state.vehicle_count * VEHICLE_WEIGHT
-                + lane_state.waiting_time * WAITING_WEIGHT
+                lane_state.vehicle_count * self.timing.vehicle_weight
+                + lane_state.waiting_time * self.timing.waiting_weight
             )
 
     @staticmethod
-    def density_based_green_time(vehicle_count: int) -> int:
-        if vehicle_count <= 10:
-            return 15
-        if vehicle_count <= 25:
-            return 25
-        if vehicle_count <= 50:
-            return 40
-        return 60
+    def density_based_green_time(
+        vehicle_count: int,
+        thresholds: Tuple[int, ...] = DENSITY_THRESHOLDS,
+        green_times: Tuple[int, ...] = DENSITY_GREEN_TIMES,
+    ) -> int:
+        # Band i covers counts up to and including thresholds[i]; the last band is open-ended.
+        return green_times[bisect.bisect_left(thresholds, vehicle_count)]
 
     def _allocate_green_time(self, lane_id: int) -> int:
-        desired_time = self.density_based_green_time(self.lanes[lane_id].vehicle_count)
-        desired_time = max(MIN_GREEN_TIME, min(MAX_GREEN_TIME, desired_time))
+        timing = self.timing
+        desired_time = self.density_based_green_time(
+            self.lanes[lane_id].vehicle_count, timing.density_thresholds, timing.density_green_times
+        )
+        desired_time = max(timing.min_green_time, min(timing.max_green_time, desired_time))
 
         remaining_lanes_after_this = len(self.pending_cycle_lanes) - 1
-        reserve_for_remaining_lanes = remaining_lanes_after_this * MIN_GREEN_TIME
-        available_budget = TOTAL_CYCLE_TIME - self.cycle_elapsed - reserve_for_remaining_lanes
+        reserve_for_remaining_lanes = remaining_lanes_after_this * timing.min_green_time
+        available_budget = timing.total_cycle_time - self.cycle_elapsed - reserve_for_remaining_lanes
 
-        bounded_time = min(desired_time, max(MIN_GREEN_TIME, available_budget), MAX_GREEN_TIME)
-        return int(max(MIN_GREEN_TIME, bounded_time))
+        bounded_time = min(desired_time, max(timing.min_green_time, available_budget), timing.max_green_time)
+        return int(max(timing.min_green_time, bounded_time))
 
     def _select_next_lane(self) -> int:
         if not self.pending_cycle_lanes:
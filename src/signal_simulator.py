@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+
+from .config import LANE_IDS, SIMULATION_SATURATION_FLOW, SIMULATION_TICK_SECONDS
+from .signal_controller import AdaptiveSignalController, SignalTiming
+
+
+@dataclass
+class SimulationResult:
+    lane_ids: List[int]
+    delta_seconds: float
+    arrivals: np.ndarray
+    departures: np.ndarray
+    queue_seconds: np.ndarray
+    mean_queue: np.ndarray
+    max_queue: np.ndarray
+    green_seconds: np.ndarray
+    max_waiting: np.ndarray
+    switches: np.ndarray
+    final_queue: np.ndarray
+    green_trace: np.ndarray | None = None
+    countdown_trace: np.ndarray | None = None
+
+    @property
+    def mean_delay(self) -> np.ndarray:
+        # Little's law: vehicle-seconds spent queued divided by the vehicles that arrived.
+        return self.queue_seconds.sum(axis=1) / np.maximum(self.arrivals.sum(axis=1), 1)
+
+    def summary(self) -> dict:
+        return {
+            "scenarios": int(self.arrivals.shape[0]),
+            "mean_delay_s": float(self.mean_delay.mean()),
+            "p95_delay_s": float(np.percentile(self.mean_delay, 95)),
+            "mean_queue": float(self.mean_queue.mean()),
+            "max_queue": int(self.max_queue.max()),
+            "max_wait_s": float(self.max_waiting.max()),
+            "throughput": float(self.departures.sum() / max(self.arrivals.sum(), 1)),
+            "switches_per_hour": float(
+                self.switches.mean() * 3600.0 / max(self.green_seconds.sum(axis=1).mean(), 1e-9)
+            ),
+        }
+
+
+def density_based_green_time(vehicle_counts: np.ndarray, timing: SignalTiming) -> np.ndarray:
+    green_times = np.asarray(timing.density_green_times, dtype=np.int64)
+    return green_times[np.searchsorted(timing.density_thresholds, vehicle_counts, side="left")]
+
+
+def poisson_arrival_traces(
+    num_scenarios: int,
+    num_ticks: int,
+    lane_rates: Sequence[float] | np.ndarray,
+    delta_seconds: float = SIMULATION_TICK_SECONDS,
+    seed: int | None = None,
+) -> np.ndarray:
+    # lane_rates is vehicles/second, either one value per lane or one row per scenario.
+    rates = np.asarray(lane_rates, dtype=np.float64)
+    if rates.ndim == 1:
+        rates = np.broadcast_to(rates, (num_scenarios, rates.size))
+    generator = np.random.default_rng(seed)
+    expected = rates[:, None, :] * delta_seconds
+    return generator.poisson(expected, size=(num_scenarios, num_ticks, rates.shape[1])).astype(np.int32)
+
+
+class BatchSignalSimulator:
+    def __init__(
+        self,
+        lane_ids: Iterable[int] = LANE_IDS,
+        delta_seconds: float = SIMULATION_TICK_SECONDS,
+        saturation_flow: float = SIMULATION_SATURATION_FLOW,
+        timing: SignalTiming | None = None,
+    ) -> None:
+        # Lanes are kept in ascending order so index order matches the controller's -lane_id tie-break.
+        self.lane_ids = sorted(lane_ids)
+        self.delta_seconds = float(delta_seconds)
+        self.saturation_flow = float(saturation_flow)
+        self.timing = timing or SignalTiming()
+
+    def run(
+        self,
+        arrivals: np.ndarray,
+        initial_queue: np.ndarray | None = None,
+        record_trace: bool = False,
+    ) -> SimulationResult:
+        arrivals = np.asarray(arrivals)
+        if arrivals.ndim == 2:
+            arrivals = arrivals[None]
+        num_scenarios, num_ticks, num_lanes = arrivals.shape
+        if num_lanes != len(self.lane_ids):
+            raise ValueError(f"Arrival traces have {num_lanes} lanes, expected {len(self.lane_ids)}.")
+
+        rows = np.arange(num_scenarios)
+        queue = np.zeros((num_scenarios, num_lanes), dtype=np.int64)
+        if initial_queue is not None:
+            queue += np.asarray(initial_queue, dtype=np.int64)
+        waiting = np.zeros((num_scenarios, num_lanes), dtype=np.float64)
+        pending = np.ones((num_scenarios, num_lanes), dtype=bool)
+        green = np.zeros(num_scenarios, dtype=np.int64)
+        countdown = np.zeros(num_scenarios, dtype=np.float64)
+        cycle_elapsed = np.zeros(num_scenarios, dtype=np.int64)
+        credit = np.zeros(num_scenarios, dtype=np.float64)
+
+        departures = np.zeros((num_scenarios, num_lanes), dtype=np.int64)
+        queue_seconds = np.zeros((num_scenarios, num_lanes), dtype=np.float64)
+        max_queue = queue.copy()
+        green_seconds = np.zeros((num_scenarios, num_lanes), dtype=np.float64)
+        max_waiting = np.zeros((num_scenarios, num_lanes), dtype=np.float64)
+        switches = np.zeros(num_scenarios, dtype=np.int64)
+        green_trace = np.empty((num_scenarios, num_ticks), dtype=np.int64) if record_trace else None
+        countdown_trace = np.empty((num_scenarios, num_ticks), dtype=np.float64) if record_trace else None
+
+        timing = self.timing
+
+        def switch(mask: np.ndarray) -> None:
+            if not mask.any():
+                return
+            # Start a new cycle wherever every lane has already had its green.
+            exhausted = mask & ~pending.any(axis=1)
+            pending[exhausted] = True
+            cycle_elapsed[exhausted] = 0
+
+            priority = queue * timing.vehicle_weight + waiting * timing.waiting_weight
+            candidates = pending & mask[:, None]
+            # Lexicographic max over (priority, waiting, count); argmax then prefers the lowest lane id.
+            for key in (priority, waiting, queue):
+                masked = np.where(candidates, key, -np.inf)
+                candidates &= masked == masked.max(axis=1, keepdims=True)
+            selected = rows[mask]
+            next_lane = candidates[selected].argmax(axis=1)
+
+            desired = density_based_green_time(queue[selected, next_lane], timing)
+            desired = np.clip(desired, timing.min_green_time, timing.max_green_time)
+            remaining_lanes = pending[selected].sum(axis=1) - 1
+            available = timing.total_cycle_time - cycle_elapsed[selected] - remaining_lanes * timing.min_green_time
+            bounded = np.minimum(
+                np.minimum(desired, np.maximum(timing.min_green_time, available)), timing.max_green_time
+            )
+            allocated = np.maximum(timing.min_green_time, bounded)
+
+            green[selected] = next_lane
+            countdown[selected] = allocated.astype(np.float64)
+            cycle_elapsed[selected] += allocated
+            pending[selected, next_lane] = False
+            waiting[selected, next_lane] = 0.0
+            credit[selected] = 0.0
+            switches[selected] += 1
+
+        switch(np.ones(num_scenarios, dtype=bool))
+        lane_index = np.arange(num_lanes)
+        for tick in range(num_ticks):
+            queue += arrivals[:, tick]
+
+            # The green approach discharges at the saturation flow; unused capacity is not banked.
+            credit += self.saturation_flow * self.delta_seconds
+            capacity = np.floor(credit).astype(np.int64)
+            served = np.minimum(queue[rows, green], capacity)
+            queue[rows, green] -= served
+            departures[rows, green] += served
+            credit -= capacity
+
+            is_green = lane_index[None, :] == green[:, None]
+            waiting += np.where(is_green, 0.0, self.delta_seconds)
+            green_seconds[rows, green] += self.delta_seconds
+            countdown -= self.delta_seconds
+            # Waits are sampled before the switch resets the new green lane's clock.
+            np.maximum(max_waiting, waiting, out=max_waiting)
+            switch(countdown <= 0)
+
+            queue_seconds += queue * self.delta_seconds
+            np.maximum(max_queue, queue, out=max_queue)
+            if record_trace:
+                green_trace[:, tick] = green
+                countdown_trace[:, tick] = countdown
+
+        return SimulationResult(
+            lane_ids=list(self.lane_ids),
+            delta_seconds=self.delta_seconds,
+            arrivals=arrivals.sum(axis=1),
+            departures=departures,
+            queue_seconds=queue_seconds,
+            mean_queue=queue_seconds / max(num_ticks * self.delta_seconds, 1e-9),
+            max_queue=max_queue,
+            green_seconds=green_seconds,
+            max_waiting=max_waiting,
+            switches=switches,
+            final_queue=queue,
+            green_trace=green_trace,
+            countdown_trace=countdown_trace,
+        )
+
+
+def simulate_with_controller(
+    arrivals: np.ndarray,
+    lane_ids: Iterable[int] = LANE_IDS,
+    delta_seconds: float = SIMULATION_TICK_SECONDS,
+    saturation_flow: float = SIMULATION_SATURATION_FLOW,
+    timing: SignalTiming | None = None,
+) -> Dict[str, np.ndarray]:
+    # Scalar reference: the same queue model driving the real AdaptiveSignalController, one scenario.
+    lane_ids = sorted(lane_ids)
+    controller = AdaptiveSignalController(lane_ids=lane_ids, timing=timing)
+    queue = {lane_id: 0 for lane_id in lane_ids}
+    controller.bootstrap(queue)
+    credit = 0.0
+    green_lane = controller.current_green_lane
+    green_trace: List[int] = []
+    countdown_trace: List[float] = []
+    queue_trace: List[List[int]] = []
+
+    for tick_arrivals in np.asarray(arrivals):
+        for lane_id, count in zip(lane_ids, tick_arrivals):
+            queue[lane_id] += int(count)
+        credit += saturation_flow * delta_seconds
+        capacity = int(np.floor(credit))
+        served = min(queue[green_lane], capacity)
+        queue[green_lane] -= served
+        credit -= capacity
+
+        previous_countdown = controller.current_countdown
+        controller.update_vehicle_counts(queue)
+        controller.tick(delta_seconds)
+        if controller.current_countdown > previous_countdown:
+            credit = 0.0
+        green_lane = controller.current_green_lane
+        green_trace.append(lane_ids.index(green_lane))
+        countdown_trace.append(controller.current_countdown)
+        queue_trace.append([queue[lane_id] for lane_id in lane_ids])
+
+    return {
+        "green_trace": np.asarray(green_trace),
+        "countdown_trace": np.asarray(countdown_trace),
+        "final_queue": np.asarray(queue_trace[-1]) if queue_trace else np.zeros(len(lane_ids), dtype=np.int64),
+    }
@@ -0,0 +1,323 @@
+from __future__ import annotations
+
+import math
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+import cv2
+import numpy as np
+
+from .config import (
+    FRAME_HEIGHT,
+    FRAME_WIDTH,
+    SYNTHETIC_BATCH_FRAMES,
+    SYNTHETIC_LANES,
+    SYNTHETIC_PROFILE,
+    SYNTHETIC_PROFILES,
+)
+from .detector import DETECTION_DTYPE, LABEL_NAMES
+
+VEHICLE_WIDTH = 34
+VEHICLE_HEIGHT = 58
+VEHICLE_GAP = 12
+OUTLINE_WIDTH = 2
+ROAD_COLOR = (40, 40, 40)
+OUTLINE_COLOR = (25, 25, 25)
+
+
+@dataclass(frozen=True)
+class SyntheticScenario:
+    lane_id: int
+    rate: float
+    speed: float
+    profile: Tuple[Tuple[float, float], ...] = SYNTHETIC_PROFILES[SYNTHETIC_PROFILE]
+    duration_seconds: float = 25.0
+    fps: int = 20
+    frame_size: tuple[int, int] = (FRAME_WIDTH, FRAME_HEIGHT)
+    seed: int = 0
+
+    @property
+    def total_frames(self) -> int:
+        return int(round(self.duration_seconds * self.fps))
+
+
+@dataclass
+class VehiclePlan:
+    spawn_frame: np.ndarray
+    x: np.ndarray
+    colors: np.ndarray
+    life_frames: int
+
+
+def default_scenarios(
+    lane_ids: Iterable[int],
+    profile: str = SYNTHETIC_PROFILE,
+    duration_seconds: float = 25.0,
+    fps: int = 20,
+    frame_size: tuple[int, int] = (FRAME_WIDTH, FRAME_HEIGHT),
+    rate_scale: float = 1.0,
+    seed: int = 0,
+) -> Dict[int, SyntheticScenario]:
+    if profile not in SYNTHETIC_PROFILES:
+        raise ValueError(f"Unknown arrival profile '{profile}', expected one of {tuple(SYNTHETIC_PROFILES)}.")
+    scenarios = {}
+    for lane_id in lane_ids:
+        spec = SYNTHETIC_LANES.get(lane_id, {"rate": 0.6, "speed": 2.5})
+        scenarios[lane_id] = SyntheticScenario(
+            lane_id=lane_id,
+            rate=spec["rate"] * rate_scale,
+            speed=spec["speed"],
+            profile=SYNTHETIC_PROFILES[profile],
+            duration_seconds=duration_seconds,
+            fps=fps,
+            frame_size=frame_size,
+            seed=seed + lane_id,
+        )
+    return scenarios
+
+
+def arrival_rates(scenario: SyntheticScenario) -> np.ndarray:
+    # Vehicles per second at every frame, interpolated between the profile breakpoints.
+    progress = np.arange(scenario.total_frames) / max(scenario.total_frames, 1)
+    points, multipliers = zip(*scenario.profile)
+    return scenario.rate * np.interp(progress, points, multipliers)
+
+
+def channel_positions(frame_width: int) -> np.ndarray:
+    return np.array([int(frame_width * 0.30), int(frame_width * 0.47), int(frame_width * 0.64)])
+
+
+def plan_vehicles(scenario: SyntheticScenario) -> VehiclePlan:
+    generator = np.random.default_rng(scenario.seed)
+    width, height = scenario.frame_size
+    arrivals = generator.poisson(arrival_rates(scenario) / scenario.fps)
+    spawn_frame = np.repeat(np.arange(scenario.total_frames), arrivals)
+    channels = generator.integers(0, 3, size=spawn_frame.size)
+
+    # A vehicle waits at the bottom edge until the one ahead in its channel has moved clear,
+    # so demand above a channel's capacity shows up as delayed entries rather than overlapping boxes.
+    headway = math.ceil((VEHICLE_HEIGHT + VEHICLE_GAP) / scenario.speed)
+    next_free = np.zeros(3, dtype=np.int64)
+    for index, channel in enumerate(channels.tolist()):
+        spawn_frame[index] = max(spawn_frame[index], next_free[channel])
+        next_free[channel] = spawn_frame[index] + headway
+    keep = spawn_frame < scenario.total_frames
+    spawn_frame, channels = spawn_frame[keep], channels[keep]
+
+    x = channel_positions(width)[channels] + generator.integers(-4, 5, size=channels.size)
+    colors = np.stack(
+        [
+            generator.integers(60, 230, size=channels.size),
+            generator.integers(90, 240, size=channels.size),
+            generator.integers(120, 240, size=channels.size),
+        ],
+        axis=1,
+    ).astype(np.uint8)
+    life_frames = math.ceil((height + VEHICLE_HEIGHT) / scenario.speed) + 1
+    return VehiclePlan(spawn_frame=spawn_frame, x=x, colors=colors, life_frames=life_frames)
+
+
+def road_background(scenario: SyntheticScenario, profile_name: str = "") -> np.ndarray:
+    width, height = scenario.frame_size
+    frame = np.full((height, width, 3), ROAD_COLOR, dtype=np.uint8)
+    cv2.rectangle(frame, (0, 0), (width - 1, height - 1), (80, 80, 80), 4)
+    for divider_x in (int(width * 0.40), int(width * 0.56)):
+        cv2.line(frame, (divider_x, 0), (divider_x, height), (180, 180, 180), 2)
+    cv2.putText(
+        frame,
+        f"Synthetic Traffic Lane {scenario.lane_id}",
+        (14, 30),
+        cv2.FONT_HERSHEY_SIMPLEX,
+        0.8,
+        (240, 240, 240),
+        2,
+        cv2.LINE_AA,
+    )
+    cv2.putText(
+        frame,
+        f"Arrivals: {scenario.rate:.2f}/s {profile_name}".rstrip(),
+        (14, 58),
+        cv2.FONT_HERSHEY_SIMPLEX,
+        0.6,
+        (225, 225, 225),
+        2,
+        cv2.LINE_AA,
+    )
+    return frame
+
+
+class SyntheticLaneRenderer:
+    def __init__(self, scenario: SyntheticScenario) -> None:
+        self.scenario = scenario
+        self.plan = plan_vehicles(scenario)
+        profile_name = next((name for name, points in SYNTHETIC_PROFILES.items() if points == scenario.profile), "")
+        self.background = road_background(scenario, profile_name)
+        self.sprites = np.empty((self.plan.x.size, VEHICLE_HEIGHT, VEHICLE_WIDTH, 3), dtype=np.uint8)
+        self.sprites[:] = OUTLINE_COLOR
+        self.sprites[:, OUTLINE_WIDTH:-OUTLINE_WIDTH, OUTLINE_WIDTH:-OUTLINE_WIDTH] = self.plan.colors[:, None, None, :]
+        self._car_label = LABEL_NAMES.index("car")
+
+    def render(
+        self, start_frame: int, count: int, out: np.ndarray | None = None
+    ) -> Tuple[np.ndarray, List[np.ndarray]]:
+        # Positions, visibility and boxes for the whole batch come from one broadcast over
+        # (frame, vehicle); drawing is then one slice copy of a prebuilt sprite per visible vehicle.
+        width, height = self.scenario.frame_size
+        count = max(0, min(count, self.scenario.total_frames - start_frame))
+        frames = np.empty((count, height, width, 3), dtype=np.uint8) if out is None else out[:count]
+        frames[:] = self.background
+
+        plan = self.plan
+        active = np.flatnonzero(
+            (plan.spawn_frame < start_frame + count) & (plan.spawn_frame + plan.life_frames > start_frame)
+        )
+        frame_numbers = np.arange(start_frame, start_frame + count)
+        y1 = np.rint(height - (frame_numbers[:, None] - plan.spawn_frame[active][None, :]) * self.scenario.speed)
+        visible = (y1 < height) & (y1 > -VEHICLE_HEIGHT)
+        frame_index, vehicle_index = np.nonzero(visible)
+        top = y1[frame_index, vehicle_index].astype(np.int64)
+        vehicles = active[vehicle_index]
+        left = plan.x[vehicles]
+        clip_top = np.maximum(top, 0)
+        clip_bottom = np.minimum(top + VEHICLE_HEIGHT, height)
+
+        for frame, vehicle, x, y, row_start, row_end in zip(
+            frame_index.tolist(),
+            vehicles.tolist(),
+            left.tolist(),
+            top.tolist(),
+            clip_top.tolist(),
+            clip_bottom.tolist(),
+        ):
+            frames[frame, row_start:row_end, x : x + VEHICLE_WIDTH] = self.sprites[vehicle, row_start - y : row_end - y]
+
+        boxes = np.empty(frame_index.size, dtype=DETECTION_DTYPE)
+        boxes["x1"] = left
+        boxes["y1"] = clip_top
+        boxes["x2"] = left + VEHICLE_WIDTH - 1
+        boxes["y2"] = clip_bottom - 1
+        boxes["confidence"] = 1.0
+        boxes["label_id"] = self._car_label
+        # np.nonzero walks row-major, so boxes are already grouped by frame.
+        splits = np.searchsorted(frame_index, np.arange(1, count))
+        return frames, np.split(boxes, splits)
+
+
+def truth_path(video_path: Path) -> Path:
+    return Path(video_path).with_suffix(".truth.npz")
+
+
+def write_scenario_video(
+    scenario: SyntheticScenario, video_path: Path, batch_frames: int = SYNTHETIC_BATCH_FRAMES
+) -> Tuple[int, float]:
+    started = time.perf_counter()
+    video_path = Path(video_path)
+    writer = cv2.VideoWriter(str(video_path), cv2.VideoWriter_fourcc(*"mp4v"), scenario.fps, scenario.frame_size)
+    if not writer.isOpened():
+        raise RuntimeError(f"Could not create video file: {video_path}")
+
+    renderer = SyntheticLaneRenderer(scenario)
+    width, height = scenario.frame_size
+    # Frames go straight to the encoder, so one batch buffer is reused throughout.
+    buffer = np.empty((batch_frames, height, width, 3), dtype=np.uint8)
+    truth: List[np.ndarray] = []
+    try:
+        for start in range(0, scenario.total_frames, batch_frames):
+            frames, boxes = renderer.render(start, batch_frames, out=buffer)
+            for frame in frames:
+                writer.write(frame)
+            truth.extend(boxes)
+    finally:
+        writer.release()
+
+    offsets = np.cumsum([0] + [len(frame_boxes) for frame_boxes in truth])
+    np.savez_compressed(truth_path(video_path), offsets=offsets, boxes=np.concatenate(truth), fps=scenario.fps)
+    return scenario.lane_id, time.perf_counter() - started
+
+
+def load_ground_truth(video_path: Path) -> List[np.ndarray]:
+    with np.load(truth_path(video_path)) as data:
+        return np.split(data["boxes"], data["offsets"][1:-1])
+
+
+def generate_synthetic_videos(
+    video_dir: Path,
+    scenarios: Dict[int, SyntheticScenario],
+    workers: int = 0,
+    batch_frames: int = SYNTHETIC_BATCH_FRAMES,
+) -> Dict[int, float]:
+    # Lanes are independent, so each one renders and encodes in its own process.
+    video_dir = Path(video_dir)
+    video_dir.mkdir(parents=True, exist_ok=True)
+    jobs = [(scenario, video_dir / f"lane{lane_id}.mp4", batch_frames) for lane_id, scenario in scenarios.items()]
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers <= 1:
+        return dict(write_scenario_video(*job) for job in jobs)
+    # Spawned rather than forked: the dashboard calling this may already run model and capture threads.
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn")) as pool:
+        futures = [pool.submit(write_scenario_video, *job) for job in jobs]
+        return dict(future.result() for future in futures)
+
+
+class SyntheticFrameSource:
+    # In-memory stand-in for a capture group: frames are rendered on demand, never encoded or decoded,
+    # and ground_truth() returns the exact boxes behind the frames last returned by read().
+    def __init__(
+        self,
+        scenarios: Dict[int, SyntheticScenario],
+        batch_frames: int = SYNTHETIC_BATCH_FRAMES,
+        loop: bool = True,
+    ) -> None:
+        self.renderers = {lane_id: SyntheticLaneRenderer(scenario) for lane_id, scenario in scenarios.items()}
+        self.batch_frames = batch_frames
+        self.loop = loop
+        self.frame_index = -1
+        self.frame_timestamps: Dict[int, float] = {}
+        self.dropped_frames: Dict[int, int] = {lane_id: 0 for lane_id in scenarios}
+        self.frame_positions: Dict[int, int] = {}
+        self._batch_start = 0
+        self._frames: Dict[int, np.ndarray] = {}
+        self._boxes: Dict[int, List[np.ndarray]] = {}
+        self._last_boxes: Dict[int, np.ndarray] = {}
+        self._total_frames = min(scenario.total_frames for scenario in scenarios.values())
+
+    def start(self) -> "SyntheticFrameSource":
+        return self
+
+    @property
+    def exhausted(self) -> bool:
+        return not self.loop and self.frame_index + 1 >= self._total_frames
+
+    def _render_batch(self, start: int) -> None:
+        self._batch_start = start
+        for lane_id, renderer in self.renderers.items():
+            self._frames[lane_id], self._boxes[lane_id] = renderer.render(start, self.batch_frames)
+
+    def read(self, mode: str | None = None, timeout: float | None = None) -> Dict[int, np.ndarray]:
+        if self.exhausted:
+            raise RuntimeError("Synthetic scenario has no more frames.")
+        self.frame_index = (self.frame_index + 1) % self._total_frames
+        offset = self.frame_index - self._batch_start
+        if not self._frames or offset < 0 or offset >= len(next(iter(self._frames.values()))):
+            self._render_batch(self.frame_index)
+            offset = 0
+        now = time.time()
+        lane_frames = {}
+        for lane_id in self.renderers:
+            lane_frames[lane_id] = self._frames[lane_id][offset]
+            self._last_boxes[lane_id] = self._boxes[lane_id][offset]
+            self.frame_timestamps[lane_id] = now
+            self.frame_positions[lane_id] = self.frame_index
+        return lane_frames
+
+    def ground_truth(self) -> Dict[int, np.ndarray]:
+        return dict(self._last_boxes)
+
+    def stop(self) -> None:
+        self._frames.clear()
+        self._boxes.clear()
@@ -0,0 +1,329 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import hashlib
+import itertools
+import json
+import os
+import random
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Sequence
+
+import numpy as np
+
+from .config import (
+    HISTORY_DIR,
+    HISTORY_JUNCTION,
+    LANE_IDS,
+    SIGNAL_TIMING_FILE,
+    SIMULATION_SATURATION_FLOW,
+    SIMULATION_TICK_SECONDS,
+    TUNING_DIR,
+)
+from .history_store import TrafficHistoryStore, to_epoch_seconds
+from .signal_controller import SignalTiming
+from .signal_simulator import BatchSignalSimulator
+
+DEFAULT_SEARCH_SPACE: Dict[str, list] = {
+    "vehicle_weight": [0.4, 0.5, 0.6, 0.7, 0.8],
+    "waiting_weight": [0.2, 0.3, 0.4, 0.5, 0.6],
+    "min_green_time": [10, 15, 20],
+    "max_green_time": [45, 60, 75],
+    "total_cycle_time": [90, 120, 150],
+    "density_thresholds": [[5, 15, 30], [10, 25, 50], [15, 35, 70]],
+    "density_green_times": [[10, 20, 35, 55], [15, 25, 40, 60], [20, 30, 45, 60]],
+}
+
+_worker_state: dict = {}
+
+
+def read_log_columns(csv_paths: Iterable[Path], lane_ids: Sequence[int]) -> Dict[str, np.ndarray]:
+    rows = []
+    for csv_path in csv_paths:
+        with Path(csv_path).open("r", newline="", encoding="utf-8") as csv_file:
+            rows.extend(row for row in csv.DictReader(csv_file) if row.get("timestamp"))
+    rows.sort(key=lambda row: row["timestamp"])
+    columns = {
+        "timestamp": np.array([to_epoch_seconds(row["timestamp"]) for row in rows], dtype=np.int64),
+        "current_green_lane": np.array([int(row["current_green_lane"] or 0) for row in rows], dtype=np.int64),
+    }
+    for lane_id in lane_ids:
+        columns[f"lane{lane_id}_count"] = np.array([int(float(row[f"lane{lane_id}_count"])) for row in rows])
+    return columns
+
+
+def read_store_columns(
+    store: TrafficHistoryStore, start: str, end: str, junction: str, lane_ids: Sequence[int]
+) -> Dict[str, np.ndarray]:
+    columns = store.query(start, end, junction=junction, lanes=lane_ids, fields=["count"], include_signal=True)
+    if columns:
+        columns["timestamp"] = columns["timestamp"].astype(np.int64)
+    return columns
+
+
+def estimate_arrivals(
+    columns: Dict[str, np.ndarray],
+    lane_ids: Sequence[int],
+    window_ticks: int,
+    tick_seconds: float = SIMULATION_TICK_SECONDS,
+    saturation_flow: float = SIMULATION_SATURATION_FLOW,
+    max_gap_seconds: float = 10.0,
+) -> np.ndarray:
+    # Logged counts are queue lengths under the old timing. Demand is the count increase plus what the
+    # green lane is assumed to have discharged, so replaying it under new timing gives a counterfactual.
+    if not columns or len(columns.get("timestamp", ())) < 2:
+        raise ValueError("Not enough logged rows to build arrival traces.")
+    timestamps = columns["timestamp"]
+    counts = np.stack([columns[f"lane{lane_id}_count"] for lane_id in lane_ids], axis=1).astype(np.float64)
+    green = columns["current_green_lane"][:, None] == np.asarray(lane_ids)[None, :]
+
+    windows: List[np.ndarray] = []
+    breaks = np.flatnonzero(np.diff(timestamps) > max_gap_seconds) + 1
+    for segment in np.split(np.arange(len(timestamps)), breaks):
+        if len(segment) < 2:
+            continue
+        gaps = np.diff(timestamps[segment]).astype(np.float64)[:, None]
+        previous = counts[segment[:-1]]
+        served = np.where(green[segment[:-1]], np.minimum(previous, saturation_flow * gaps), 0.0)
+        demand = np.clip(counts[segment[1:]] - previous + served, 0.0, None)
+
+        # Spread each logged interval over whole simulator ticks, keeping integer totals exact.
+        ticks = np.maximum(np.rint(gaps[:, 0] / tick_seconds).astype(np.int64), 1)
+        per_tick = np.repeat(demand / ticks[:, None], ticks, axis=0)
+        cumulative = np.floor(np.cumsum(per_tick, axis=0) + 1e-9)
+        arrivals = np.diff(cumulative, axis=0, prepend=0.0).astype(np.int32)
+        arrivals[0] += counts[segment[0]].astype(np.int32)
+
+        for start in range(0, len(arrivals) - window_ticks + 1, window_ticks):
+            windows.append(arrivals[start : start + window_ticks])
+
+    if not windows:
+        raise ValueError(f"No gap-free stretch of {window_ticks} ticks in the logs; lower --window.")
+    return np.stack(windows)
+
+
+def parameter_grid(space: Dict[str, list]) -> Iterator[dict]:
+    names = list(space)
+    for values in itertools.product(*(space[name] for name in names)):
+        yield dict(zip(names, values))
+
+
+def sample_parameters(space: Dict[str, list], count: int, seed: int | None = None) -> Iterator[dict]:
+    generator = random.Random(seed)
+    seen = set()
+    total = int(np.prod([len(values) for values in space.values()]))
+    while len(seen) < min(count, total):
+        params = {name: generator.choice(values) for name, values in space.items()}
+        key = parameter_key(params)
+        if key not in seen:
+            seen.add(key)
+            yield params
+
+
+def parameter_key(params: dict) -> str:
+    return json.dumps(params, sort_keys=True)
+
+
+def _init_worker(arrivals: np.ndarray, lane_ids: List[int], tick_seconds: float, saturation_flow: float) -> None:
+    _worker_state.update(
+        arrivals=arrivals, lane_ids=lane_ids, tick_seconds=tick_seconds, saturation_flow=saturation_flow
+    )
+
+
+def evaluate_parameters(params: dict, max_wait_weight: float) -> dict:
+    record = {"key": parameter_key(params), "params": params}
+    try:
+        timing = SignalTiming.from_dict(params)
+    except ValueError as error:
+        record["invalid"] = str(error)
+        return record
+
+    simulator = BatchSignalSimulator(
+        lane_ids=_worker_state["lane_ids"],
+        delta_seconds=_worker_state["tick_seconds"],
+        saturation_flow=_worker_state["saturation_flow"],
+        timing=timing,
+    )
+    result = simulator.run(_worker_state["arrivals"])
+    lane_max_wait = result.max_waiting.max(axis=0)
+    record.update(
+        {
+            "mean_wait_s": float(result.mean_delay.mean()),
+            "max_wait_s": {str(lane_id): float(value) for lane_id, value in zip(result.lane_ids, lane_max_wait)},
+            "mean_queue": float(result.mean_queue.mean()),
+            "throughput": float(result.departures.sum() / max(result.arrivals.sum(), 1)),
+        }
+    )
+    record["score"] = record["mean_wait_s"] + max_wait_weight * float(lane_max_wait.max())
+    return record
+
+
+def _evaluate_chunk(chunk: List[dict], max_wait_weight: float) -> List[dict]:
+    return [evaluate_parameters(params, max_wait_weight) for params in chunk]
+
+
+def load_checkpoint(path: Path, header: dict) -> Dict[str, dict]:
+    if not path.exists():
+        return {}
+    completed: Dict[str, dict] = {}
+    with path.open("r", encoding="utf-8") as checkpoint:
+        for line_number, line in enumerate(checkpoint):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A sweep killed mid-write leaves at most one torn line at the end.
+                continue
+            if line_number == 0:
+                if record.get("header") != header:
+                    raise ValueError(f"{path} was written for different traces or settings; pass --fresh to restart.")
+                continue
+            completed[record["key"]] = record
+    return completed
+
+
+def run_sweep(
+    arrivals: np.ndarray,
+    candidates: Iterable[dict],
+    checkpoint_path: Path,
+    lane_ids: Sequence[int] = LANE_IDS,
+    tick_seconds: float = SIMULATION_TICK_SECONDS,
+    saturation_flow: float = SIMULATION_SATURATION_FLOW,
+    max_wait_weight: float = 0.1,
+    workers: int | None = None,
+    chunk_size: int = 4,
+    fresh: bool = False,
+) -> List[dict]:
+    header = {
+        "traces": hashlib.sha1(np.ascontiguousarray(arrivals).tobytes()).hexdigest(),
+        "shape": list(arrivals.shape),
+        "lane_ids": list(lane_ids),
+        "tick_seconds": tick_seconds,
+        "saturation_flow": saturation_flow,
+        "max_wait_weight": max_wait_weight,
+    }
+    checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+    if fresh and checkpoint_path.exists():
+        checkpoint_path.unlink()
+    completed = load_checkpoint(checkpoint_path, header)
+    if not checkpoint_path.exists():
+        checkpoint_path.write_text(json.dumps({"header": header}) + "\n", encoding="utf-8")
+
+    pending = [params for params in candidates if parameter_key(params) not in completed]
+    print(f"{len(completed)} parameter sets restored from {checkpoint_path}, {len(pending)} to evaluate")
+    chunks = [pending[index : index + chunk_size] for index in range(0, len(pending), chunk_size)]
+
+    workers = workers or os.cpu_count() or 1
+    initargs = (arrivals, list(lane_ids), tick_seconds, saturation_flow)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool, checkpoint_path.open(
+        "a", encoding="utf-8"
+    ) as checkpoint:
+        queued = iter(chunks)
+        in_flight = set()
+        finished = 0
+        while True:
+            # Keep the pool saturated without materialising every future up front.
+            while len(in_flight) < workers * 2:
+                chunk = next(queued, None)
+                if chunk is None:
+                    break
+                in_flight.add(pool.submit(_evaluate_chunk, chunk, max_wait_weight))
+            if not in_flight:
+                break
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                for record in future.result():
+                    completed[record["key"]] = record
+                    checkpoint.write(json.dumps(record) + "\n")
+                    finished += 1
+            checkpoint.flush()
+            os.fsync(checkpoint.fileno())
+            print(f"\r{finished}/{len(pending)} evaluated", end="", flush=True)
+        if pending:
+            print()
+
+    return sorted((record for record in completed.values() if "score" in record), key=lambda record: record["score"])
+
+
+def write_timing_file(path: Path, best: dict, baseline: dict, source: str) -> None:
+    timing = SignalTiming.from_dict(best["params"])
+    payload = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "source": source,
+        "timing": timing.to_dict(),
+        "score": best["score"],
+        "mean_wait_s": best["mean_wait_s"],
+        "max_wait_s": best["max_wait_s"],
+        "baseline": {key: baseline[key] for key in ("score", "mean_wait_s", "max_wait_s")},
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Tune signal timing by replaying logged lane counts in parallel.")
+    parser.add_argument("--csv", type=Path, nargs="*", default=[], help="traffic_log CSV files to replay.")
+    parser.add_argument("--start", help="History store range start, e.g. 2026-02-17T06:00 (used when --csv is empty).")
+    parser.add_argument("--end", help="History store range end.")
+    parser.add_argument("--junction", default=HISTORY_JUNCTION)
+    parser.add_argument("--history-root", type=Path, default=HISTORY_DIR)
+    parser.add_argument("--window", type=int, default=3600, help="Ticks per replayed scenario.")
+    parser.add_argument("--space", type=Path, help="JSON search space overriding DEFAULT_SEARCH_SPACE.")
+    parser.add_argument("--samples", type=int, default=0, help="Random parameter sets to try; 0 for the full grid.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-wait-weight", type=float, default=0.1, help="Score = mean wait + weight * worst lane max wait.")
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes; 0 uses every core.")
+    parser.add_argument("--checkpoint", type=Path, default=TUNING_DIR / "sweep.jsonl")
+    parser.add_argument("--fresh", action="store_true", help="Discard an existing checkpoint.")
+    parser.add_argument("--output", type=Path, default=SIGNAL_TIMING_FILE, help="Where to write the tuned timing.")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    lane_ids = sorted(LANE_IDS)
+    if args.csv:
+        columns = read_log_columns(args.csv, lane_ids)
+        source = ", ".join(str(path) for path in args.csv)
+    elif args.start and args.end:
+        columns = read_store_columns(TrafficHistoryStore(args.history_root), args.start, args.end, args.junction, lane_ids)
+        source = f"{args.junction} {args.start}..{args.end}"
+    else:
+        parser.error("pass --csv files or a --start/--end history range")
+    arrivals = estimate_arrivals(columns, lane_ids, args.window)
+    print(f"replaying {arrivals.shape[0]} scenarios of {arrivals.shape[1]} ticks from {source}")
+
+    space = json.loads(args.space.read_text(encoding="utf-8")) if args.space else DEFAULT_SEARCH_SPACE
+    candidates = list(sample_parameters(space, args.samples, args.seed) if args.samples else parameter_grid(space))
+    baseline_params = SignalTiming().to_dict()
+    candidates.append(baseline_params)
+
+    ranked = run_sweep(
+        arrivals,
+        candidates,
+        args.checkpoint,
+        lane_ids=lane_ids,
+        max_wait_weight=args.max_wait_weight,
+        workers=args.workers or None,
+        fresh=args.fresh,
+    )
+    if not ranked:
+        raise SystemExit("No valid parameter sets were evaluated.")
+
+    print(f"{'rank':<6}{'score':>9}{'mean wait':>11}{'worst max':>11}  params")
+    for rank, record in enumerate(ranked[: args.top], start=1):
+        print(
+            f"{rank:<6}{record['score']:>9.2f}{record['mean_wait_s']:>10.2f}s{max(record['max_wait_s'].values()):>10.1f}s  "
+            f"{json.dumps(record['params'], sort_keys=True)}"
+        )
+    baseline = next(record for record in ranked if record["key"] == parameter_key(baseline_params))
+    print(f"current config: score {baseline['score']:.2f}, mean wait {baseline['mean_wait_s']:.2f}s")
+
+    write_timing_file(args.output, ranked[0], baseline, source)
+    print(f"tuned timing written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
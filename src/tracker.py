@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import numpy as np
+
+from .config import TRACK_IOU_THRESHOLD, TRACK_MAX_MISSES, TRACK_MIN_HITS, TRACK_STATIONARY_SPEED
+from .detector import DETECTION_DTYPE
+
+# Constant-velocity Kalman state per track: cx, cy, w, h, vx, vy (pixels, pixels/second).
+STATE_SIZE = 6
+MEASUREMENT_MATRIX = np.hstack([np.eye(4), np.zeros((4, 2))])
+MEASUREMENT_NOISE = np.diag([4.0, 4.0, 16.0, 16.0])
+INITIAL_COVARIANCE = np.diag([10.0, 10.0, 10.0, 10.0, 400.0, 400.0])
+
+
+def boxes_to_measurements(boxes: np.ndarray) -> np.ndarray:
+    widths = boxes[:, 2] - boxes[:, 0]
+    heights = boxes[:, 3] - boxes[:, 1]
+    return np.stack([boxes[:, 0] + widths / 2, boxes[:, 1] + heights / 2, widths, heights], axis=1)
+
+
+def states_to_boxes(states: np.ndarray) -> np.ndarray:
+    half_w = states[:, 2] / 2
+    half_h = states[:, 3] / 2
+    return np.stack(
+        [states[:, 0] - half_w, states[:, 1] - half_h, states[:, 0] + half_w, states[:, 1] + half_h], axis=1
+    )
+
+
+def iou_matrix(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    top_left = np.maximum(boxes_a[:, None, :2], boxes_b[None, :, :2])
+    bottom_right = np.minimum(boxes_a[:, None, 2:], boxes_b[None, :, 2:])
+    intersection = np.clip(bottom_right - top_left, 0, None).prod(axis=2)
+    area_a = np.clip(boxes_a[:, 2:] - boxes_a[:, :2], 0, None).prod(axis=1)
+    area_b = np.clip(boxes_b[:, 2:] - boxes_b[:, :2], 0, None).prod(axis=1)
+    return intersection / np.maximum(area_a[:, None] + area_b[None, :] - intersection, 1e-6)
+
+
+def greedy_match(ious: np.ndarray, threshold: float) -> np.ndarray:
+    # Highest-IoU pairs first; each track and detection is used at most once.
+    rows, columns = np.nonzero(ious >= threshold)
+    order = np.argsort(-ious[rows, columns], kind="stable")
+    used_rows = np.zeros(ious.shape[0], dtype=bool)
+    used_columns = np.zeros(ious.shape[1], dtype=bool)
+    pairs = []
+    for row, column in zip(rows[order].tolist(), columns[order].tolist()):
+        if used_rows[row] or used_columns[column]:
+            continue
+        used_rows[row] = used_columns[column] = True
+        pairs.append((row, column))
+    return np.array(pairs, dtype=np.intp).reshape(-1, 2)
+
+
+class VehicleTracker:
+    def __init__(
+        self,
+        iou_threshold: float = TRACK_IOU_THRESHOLD,
+        min_hits: int = TRACK_MIN_HITS,
+        max_misses: int = TRACK_MAX_MISSES,
+        stationary_speed: float = TRACK_STATIONARY_SPEED,
+    ) -> None:
+        self.iou_threshold = iou_threshold
+        self.min_hits = max(1, min_hits)
+        self.max_misses = max(0, max_misses)
+        self.stationary_speed = stationary_speed
+
+        self._states = np.zeros((0, STATE_SIZE))
+        self._covariances = np.zeros((0, STATE_SIZE, STATE_SIZE))
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._hits = np.zeros(0, dtype=np.int32)
+        self._misses = np.zeros(0, dtype=np.int32)
+        self._confidences = np.zeros(0, dtype=np.float32)
+        self._labels = np.zeros(0, dtype=np.int8)
+        self._next_id = 1
+
+        self.arrivals = 0
+        self.departures = 0
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._confirmed()))
+
+    def _confirmed(self) -> np.ndarray:
+        return self._hits >= self.min_hits
+
+    def predict(self, delta_seconds: float) -> None:
+        if not len(self._states):
+            return
+        transition = np.eye(STATE_SIZE)
+        transition[0, 4] = transition[1, 5] = delta_seconds
+        process_noise = np.diag([1.0, 1.0, 1.0, 1.0, 50.0, 50.0]) * max(delta_seconds, 1e-3)
+
+        self._states = self._states @ transition.T
+        self._covariances = transition @ self._covariances @ transition.T + process_noise
+
+    def update(self, detections: np.ndarray, delta_seconds: float) -> None:
+        self.predict(delta_seconds)
+
+        boxes = np.stack([detections[name] for name in ("x1", "y1", "x2", "y2")], axis=1).astype(np.float64)
+        if len(self._states) and len(boxes):
+            pairs = greedy_match(iou_matrix(states_to_boxes(self._states), boxes), self.iou_threshold)
+        else:
+            pairs = np.zeros((0, 2), dtype=np.intp)
+        track_rows, detection_rows = pairs[:, 0], pairs[:, 1]
+
+        if len(pairs):
+            self._correct(track_rows, boxes_to_measurements(boxes[detection_rows]))
+            newly_confirmed = self._hits[track_rows] == self.min_hits - 1
+            self.arrivals += int(np.count_nonzero(newly_confirmed))
+            self._hits[track_rows] += 1
+            self._misses[track_rows] = 0
+            self._confidences[track_rows] = detections["confidence"][detection_rows]
+            self._labels[track_rows] = detections["label_id"][detection_rows]
+
+        unmatched_tracks = np.ones(len(self._states), dtype=bool)
+        unmatched_tracks[track_rows] = False
+        self._misses[unmatched_tracks] += 1
+
+        expired = self._misses > self.max_misses
+        self.departures += int(np.count_nonzero(expired & self._confirmed()))
+        if expired.any():
+            self._keep(~expired)
+
+        unmatched_detections = np.ones(len(boxes), dtype=bool)
+        unmatched_detections[detection_rows] = False
+        self._spawn(boxes[unmatched_detections], detections[unmatched_detections])
+
+    def _correct(self, rows: np.ndarray, measurements: np.ndarray) -> None:
+        states = self._states[rows]
+        covariances = self._covariances[rows]
+        innovation = measurements - states @ MEASUREMENT_MATRIX.T
+        innovation_covariance = MEASUREMENT_MATRIX @ covariances @ MEASUREMENT_MATRIX.T + MEASUREMENT_NOISE
+        gain = covariances @ MEASUREMENT_MATRIX.T @ np.linalg.inv(innovation_covariance)
+
+        self._states[rows] = states + np.einsum("nij,nj->ni", gain, innovation)
+        self._covariances[rows] = (np.eye(STATE_SIZE) - gain @ MEASUREMENT_MATRIX) @ covariances
+
+    def _spawn(self, boxes: np.ndarray, detections: np.ndarray) -> None:
+        count = len(boxes)
+        if not count:
+            return
+        states = np.zeros((count, STATE_SIZE))
+        states[:, :4] = boxes_to_measurements(boxes)
+
+        self._states = np.concatenate([self._states, states])
+        self._covariances = np.concatenate([self._covariances, np.repeat(INITIAL_COVARIANCE[None], count, axis=0)])
+        self._ids = np.concatenate([self._ids, np.arange(self._next_id, self._next_id + count)])
+        self._hits = np.concatenate([self._hits, np.ones(count, dtype=np.int32)])
+        self._misses = np.concatenate([self._misses, np.zeros(count, dtype=np.int32)])
+        self._confidences = np.concatenate([self._confidences, detections["confidence"]])
+        self._labels = np.concatenate([self._labels, detections["label_id"]])
+        self._next_id += count
+        if self.min_hits <= 1:
+            self.arrivals += count
+
+    def _keep(self, mask: np.ndarray) -> None:
+        self._states = self._states[mask]
+        self._covariances = self._covariances[mask]
+        self._ids = self._ids[mask]
+        self._hits = self._hits[mask]
+        self._misses = self._misses[mask]
+        self._confidences = self._confidences[mask]
+        self._labels = self._labels[mask]
+
+    def track_ids(self) -> np.ndarray:
+        return self._ids[self._confirmed()]
+
+    def stationary_count(self) -> int:
+        speeds = np.hypot(self._states[:, 4], self._states[:, 5])
+        return int(np.count_nonzero(self._confirmed() & (speeds < self.stationary_speed)))
+
+    def detections(self) -> np.ndarray:
+        confirmed = self._confirmed()
+        boxes = states_to_boxes(self._states[confirmed])
+        output = np.empty(len(boxes), dtype=DETECTION_DTYPE)
+        output["x1"], output["y1"], output["x2"], output["y2"] = boxes.T
+        output["confidence"] = self._confidences[confirmed]
+        output["label_id"] = self._labels[confirmed]
+        return output
+
+    def reset(self) -> None:
+        self._keep(np.zeros(len(self._states), dtype=bool))
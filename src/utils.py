@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-import csv
+import math
 from pathlib import Path
 from typing import Dict, Iterable
 
@@ -34,54 +34,88 @@ def open_video_captures(video_paths: Dict[int, Path]) -> Dict[int, cv2.VideoCapt
     return captures
 
 
-def read_simulation_frames(
-    captures: Dict[int, cv2.VideoCapture],
+def unavailable_lane_frame(
+    lane_id: int,
     frame_size: tuple[int, int] = (FRAME_WIDTH, FRAME_HEIGHT),
-) -> Dict[int, np.ndarray]:
-    lane_frames: Dict[int, np.ndarray] = {}
-    for lane_id, capture in captures.items():
+) -> np.ndarray:
+    frame = np.zeros((frame_size[1], frame_size[0], 3), dtype=np.uint8)
+    cv2.putText(
+        frame,
+        f"Lane {lane_id} feed unavailable",
+        (30, 80),
+        cv2.FONT_HERSHEY_SIMPLEX,
+        0.9,
+        (0, 0, 255),
+        2,
+        cv2.LINE_AA,
+    )
+    return frame
+
+
+def read_lane_frame(
+    capture: cv2.VideoCapture,
+    lane_id: int,
+    frame_size: tuple[int, int] = (FRAME_WIDTH, FRAME_HEIGHT),
+    out: np.ndarray | None = None,
+) -> np.ndarray:
+    success, frame = capture.read()
+    if not success:
+        capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
         success, frame = capture.read()
-        if not success:
+
+    if not success:
+        if out is None:
+            return unavailable_lane_frame(lane_id, frame_size)
+        np.copyto(out, unavailable_lane_frame(lane_id, frame_size))
+        return out
+    # With out given, the resize lands directly in the caller's buffer (e.g. a shared-memory slot).
+    return cv2.resize(frame, frame_size, dst=out)
+
+
+def skip_frames(capture: cv2.VideoCapture, count: int) -> None:
+    # grab() advances without converting the frame; long jumps seek instead.
+    fps = capture.get(cv2.CAP_PROP_FPS) or 20.0
+    if count > 2 * fps:
+        total = int(capture.get(cv2.CAP_PROP_FRAME_COUNT)) or 1
+        position = int(capture.get(cv2.CAP_PROP_POS_FRAMES))
+        capture.set(cv2.CAP_PROP_POS_FRAMES, (position + count) % total)
+        return
+    for _ in range(count):
+        if not capture.grab():
             capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
-            success, frame = capture.read()
+            capture.grab()
 
-        if not success:
-            frame = np.zeros((frame_size[1], frame_size[0], 3), dtype=np.uint8)
-            cv2.putText(
-                frame,
-                f"Lane {lane_id} feed unavailable",
-                (30, 80),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.9,
-                (0, 0, 255),
-                2,
-                cv2.LINE_AA,
-            )
-        else:
-            frame = cv2.resize(frame, frame_size)
 
-        lane_frames[lane_id] = frame
-    return lane_frames
+def read_simulation_frames(
+    captures: Dict[int, cv2.VideoCapture],
+    frame_size: tuple[int, int] = (FRAME_WIDTH, FRAME_HEIGHT),
+) -> Dict[int, np.ndarray]:
+    return {
+        lane_id: read_lane_frame(capture, lane_id, frame_size)
+        for lane_id, capture in captures.items()
+    }
 
 
 def split_webcam_into_lanes(
     frame: np.ndarray,
     lane_ids: Iterable[int],
     frame_size: tuple[int, int] = (FRAME_WIDTH, FRAME_HEIGHT),
+    out: Dict[int, np.ndarray] | None = None,
 ) -> Dict[int, np.ndarray]:
+    lane_ids = list(lane_ids)
     height, width = frame.shape[:2]
-    half_h, half_w = height // 2, width // 2
-
-    quadrants = [
-        frame[0:half_h, 0:half_w],
-        frame[0:half_h, half_w:width],
-        frame[half_h:height, 0:half_w],
-        frame[half_h:height, half_w:width],
-    ]
+    # Four lanes keep the original 2x2 quadrants; other counts use the smallest near-square grid.
+    columns = max(1, math.ceil(math.sqrt(len(lane_ids))))
+    rows = max(1, math.ceil(len(lane_ids) / columns))
+    cell_h, cell_w = height // rows, width // columns
 
     lane_frames: Dict[int, np.ndarray] = {}
-    for lane_id, region in zip(lane_ids, quadrants):
-        lane_frames[lane_id] = cv2.resize(region, frame_size)
+    for index, lane_id in enumerate(lane_ids):
+        row, column = divmod(index, columns)
+        bottom = height if row == rows - 1 else (row + 1) * cell_h
+        right = width if column == columns - 1 else (column + 1) * cell_w
+        region = frame[row * cell_h : bottom, column * cell_w : right]
+        lane_frames[lane_id] = cv2.resize(region, frame_size, dst=None if out is None else out[lane_id])
     return lane_frames
 
 
@@ -165,58 +199,6 @@ def build_junction_canvas(
     return grid
 
 
-def append_traffic_log(
-    log_file: Path,
-    timestamp: str,
-    lane_counts: Dict[int, int],
-    signal_state: dict,
-) -> None:
-    fieldnames = [
-        "timestamp",
-        "current_green_lane",
-        "countdown",
-        "cycle_elapsed",
-        "lane1_count",
-        "lane2_count",
-        "lane3_count",
-        "lane4_count",
-        "lane1_waiting",
-        "lane2_waiting",
-        "lane3_waiting",
-        "lane4_waiting",
-        "lane1_priority",
-        "lane2_priority",
-        "lane3_priority",
-        "lane4_priority",
-    ]
-
-    row = {
-        "timestamp": timestamp,
-        "current_green_lane": signal_state["current_green_lane"],
-        "countdown": signal_state["countdown"],
-        "cycle_elapsed": signal_state["cycle_elapsed"],
-        "lane1_count": lane_counts[1],
-        "lane2_count": lane_counts[2],
-        "lane3_count": lane_counts[3],
-        "lane4_count": lane_counts[4],
-        "lane1_waiting": signal_state["waiting_times"][1],
-        "lane2_waiting": signal_state["waiting_times"][2],
-        "lane3_waiting": signal_state["waiting_times"][3],
-        "lane4_waiting": signal_state["waiting_times"][4],
-        "lane1_priority": signal_state["priority_scores"][1],
-        "lane2_priority": signal_state["priority_scores"][2],
-        "lane3_priority": signal_state["priority_scores"][3],
-        "lane4_priority": signal_state["priority_scores"][4],
-    }
-
-    write_header = (not log_file.exists()) or log_file.stat().st_size == 0
-    with log_file.open("a", newline="", encoding="utf-8") as csv_file:
-        writer = csv.DictWriter(csv_file, fieldnames=fieldnames)
-        if write_header:
-            writer.writeheader()
-        writer.writerow(row)
-
-
 def release_captures(captures: Dict[int, cv2.VideoCapture]) -> None:
     for capture in captures.values():
         if capture is not None:
@@ -230,71 +212,7 @@ def generate_dummy_traffic_videos(
     fps: int = 20,
     frame_size: tuple[int, int] = (FRAME_WIDTH, FRAME_HEIGHT),
 ) -> None:
-    video_dir.mkdir(parents=True, exist_ok=True)
-    width, height = frame_size
-    fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-    total_frames = duration_seconds * fps
-
-    lane_density = {
-        1: {"vehicles": 10, "speed": 2.3},
-        2: {"vehicles": 14, "speed": 2.8},
-        3: {"vehicles": 20, "speed": 3.2},
-        4: {"vehicles": 30, "speed": 3.8},
-    }
-
-    for lane_id in lane_ids:
-        output_path = video_dir / f"lane{lane_id}.mp4"
-        writer = cv2.VideoWriter(str(output_path), fourcc, fps, frame_size)
-        if not writer.isOpened():
-            raise RuntimeError(f"Could not create video file: {output_path}")
-
-        spec = lane_density.get(lane_id, {"vehicles": 12, "speed": 2.5})
-        vehicle_count = spec["vehicles"]
-        speed = spec["speed"]
-        lane_x_positions = [int(width * 0.30), int(width * 0.47), int(width * 0.64)]
-
-        for frame_idx in range(total_frames):
-            frame = np.full((height, width, 3), (40, 40, 40), dtype=np.uint8)
-            cv2.rectangle(frame, (0, 0), (width - 1, height - 1), (80, 80, 80), 4)
-
-            for divider_x in [int(width * 0.40), int(width * 0.56)]:
-                cv2.line(frame, (divider_x, 0), (divider_x, height), (180, 180, 180), 2)
-
-            for vehicle_idx in range(vehicle_count):
-                lane_channel = vehicle_idx % 3
-                x = lane_x_positions[lane_channel] + (vehicle_idx % 2) * 8 - 4
-                y_offset = (frame_idx * speed + vehicle_idx * 48) % (height + 120)
-                y = int(height - y_offset)
-
-                if -60 <= y <= height + 20:
-                    vehicle_color = (
-                        int(60 + (vehicle_idx * 23) % 170),
-                        int(90 + (vehicle_idx * 17) % 150),
-                        int(120 + (vehicle_idx * 11) % 120),
-                    )
-                    cv2.rectangle(frame, (x, y), (x + 34, y + 58), vehicle_color, -1)
-                    cv2.rectangle(frame, (x, y), (x + 34, y + 58), (25, 25, 25), 2)
-
-            cv2.putText(
-                frame,
-                f"Dummy Traffic Lane {lane_id}",
-                (14, 30),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.8,
-                (240, 240, 240),
-                2,
-                cv2.LINE_AA,
-            )
-            cv2.putText(
-                frame,
-                f"Density profile: {vehicle_count} vehicles",
-                (14, 58),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.6,
-                (225, 225, 225),
-                2,
-                cv2.LINE_AA,
-            )
-            writer.write(frame)
+    from .synthetic import default_scenarios, generate_synthetic_videos
 
-        writer.release()
+    scenarios = default_scenarios(lane_ids, duration_seconds=duration_seconds, fps=fps, frame_size=frame_size)
+    generate_synthetic_videos(video_dir, scenarios)
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import threading
+from typing import Dict, Hashable, List
+
+import numpy as np
+import pytest
+
+from src.batching import BatchingDetector
+from src.detector import DETECTION_DTYPE
+
+
+class RecordingDetector:
+    # Returns one detection per frame whose x1 is the frame's fill value, and records each batch.
+    def __init__(self) -> None:
+        self.batches: List[List[Hashable]] = []
+        self.options: List[dict] = []
+        self.fail = False
+
+    def detect_batch(self, frames: Dict[Hashable, np.ndarray], **options) -> Dict[Hashable, np.ndarray]:
+        if self.fail:
+            raise ValueError("inference failed")
+        self.batches.append(list(frames))
+        self.options.append(options)
+        results = {}
+        for key, frame in frames.items():
+            detections = np.zeros(1, dtype=DETECTION_DTYPE)
+            detections["x1"] = int(frame[0, 0])
+            results[key] = detections
+        return results
+
+
+def frames_for(value: int, lanes: int = 2) -> Dict[int, np.ndarray]:
+    return {lane_id: np.full((4, 4), value, dtype=np.uint8) for lane_id in range(1, lanes + 1)}
+
+
+def run_concurrently(batcher: BatchingDetector, requests: Dict[str, tuple]) -> Dict[str, dict]:
+    results: Dict[str, dict] = {}
+    errors: Dict[str, Exception] = {}
+
+    def submit(junction_id: str, frames, options) -> None:
+        try:
+            results[junction_id] = batcher.submit(junction_id, frames, options)
+        except Exception as error:
+            errors[junction_id] = error
+
+    threads = [
+        threading.Thread(target=submit, args=(junction_id, frames, options))
+        for junction_id, (frames, options) in requests.items()
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5.0)
+    results.update(errors)
+    return results
+
+
+@pytest.fixture
+def detector() -> RecordingDetector:
+    return RecordingDetector()
+
+
+def test_requests_from_every_junction_share_one_batch(detector: RecordingDetector) -> None:
+    batcher = BatchingDetector(detector, max_batch_size=16, max_wait=5.0)
+    clients = {junction_id: batcher.client(junction_id) for junction_id in ("a", "b", "c")}
+    batcher.start()
+    try:
+        results = run_concurrently(
+            batcher, {junction_id: (frames_for(index), {}) for index, junction_id in enumerate(clients)}
+        )
+    finally:
+        batcher.stop()
+
+    # All junctions were waiting, so the batch went out without waiting for max_wait.
+    assert len(detector.batches) == 1
+    assert len(detector.batches[0]) == 6
+    for index, junction_id in enumerate(clients):
+        assert sorted(results[junction_id]) == [1, 2]
+        assert all(detections["x1"][0] == index for detections in results[junction_id].values())
+
+
+def test_batches_respect_max_size(detector: RecordingDetector) -> None:
+    batcher = BatchingDetector(detector, max_batch_size=4, max_wait=0.01)
+    for junction_id in ("a", "b", "c"):
+        batcher.client(junction_id)
+    batcher.start()
+    try:
+        results = run_concurrently(batcher, {junction_id: (frames_for(1), {}) for junction_id in ("a", "b", "c")})
+    finally:
+        batcher.stop()
+
+    assert all(len(batch) <= 4 for batch in detector.batches)
+    assert sum(len(batch) for batch in detector.batches) == 6
+    assert all(isinstance(result, dict) for result in results.values())
+
+
+def test_requests_with_different_settings_are_not_mixed(detector: RecordingDetector) -> None:
+    batcher = BatchingDetector(detector, max_batch_size=16, max_wait=0.01)
+    batcher.client("a")
+    batcher.client("b")
+    batcher.start()
+    try:
+        run_concurrently(
+            batcher, {"a": (frames_for(1), {"confidence_threshold": 0.25}), "b": (frames_for(2), {"confidence_threshold": 0.5})}
+        )
+    finally:
+        batcher.stop()
+
+    assert len(detector.batches) == 2
+    assert sorted(options["confidence_threshold"] for options in detector.options) == [0.25, 0.5]
+
+
+def test_detector_errors_reach_every_request_in_the_batch(detector: RecordingDetector) -> None:
+    detector.fail = True
+    batcher = BatchingDetector(detector, max_batch_size=16, max_wait=5.0)
+    batcher.client("a")
+    batcher.client("b")
+    batcher.start()
+    try:
+        results = run_concurrently(batcher, {"a": (frames_for(1), {}), "b": (frames_for(2), {})})
+    finally:
+        batcher.stop()
+    assert all(isinstance(result, ValueError) for result in results.values())
+
+
+def test_stopped_or_unknown_junctions_are_rejected(detector: RecordingDetector) -> None:
+    batcher = BatchingDetector(detector)
+    batcher.client("a")
+    batcher.start()
+    with pytest.raises(RuntimeError, match="no detector client"):
+        batcher.submit("missing", frames_for(1), {})
+    batcher.stop()
+    with pytest.raises(RuntimeError, match="stopped"):
+        batcher.submit("a", frames_for(1), {})
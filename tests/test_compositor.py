@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import numpy as np
+
+from src.compositor import BORDER_WIDTH, GREEN_BORDER, RED_BORDER, JunctionCompositor
+
+LANE_IDS = [1, 2, 3, 4]
+LANE_NAMES = {1: "North", 2: "East", 3: "South", 4: "West"}
+
+
+def state(green_lane: int) -> tuple[dict, dict]:
+    counts = {lane_id: 3 for lane_id in LANE_IDS}
+    signal_state = {
+        "current_green_lane": green_lane,
+        "countdown": 12,
+        "waiting_times": {lane_id: 0.0 for lane_id in LANE_IDS},
+        "priority_scores": {lane_id: 0.5 for lane_id in LANE_IDS},
+    }
+    return counts, signal_state
+
+
+def frames(value: int) -> dict:
+    return {lane_id: np.full((360, 640, 3), value, dtype=np.uint8) for lane_id in LANE_IDS}
+
+
+def test_borders_are_only_redrawn_when_the_green_lane_changes() -> None:
+    compositor = JunctionCompositor(LANE_IDS, LANE_NAMES, rgb_output=False)
+    for value in range(10):
+        canvas = compositor.compose(frames(value * 20), *state(green_lane=1))
+    assert compositor.border_renders == len(LANE_IDS)
+
+    # Lane 3 sits bottom-left, below the header.
+    cell = canvas[360:, :640]
+    assert (cell[-1, 100] == RED_BORDER).all()
+    assert (cell[200, BORDER_WIDTH - 1] == RED_BORDER).all()
+    assert (cell[200, BORDER_WIDTH] == 180).all()
+
+    canvas = compositor.compose(frames(0), *state(green_lane=3))
+    assert compositor.border_renders == len(LANE_IDS) + 2
+    assert (canvas[360:, :640][-1, 100] == GREEN_BORDER).all()
+
+
+def test_static_labels_are_stamped_over_each_new_frame() -> None:
+    compositor = JunctionCompositor(LANE_IDS, LANE_NAMES, rgb_output=False)
+    title = (slice(360 + 14, 360 + 34), slice(14, 200))
+    red_label = (slice(720 - 40, 720 - 18), slice(14, 70))
+
+    first = compositor.compose(frames(0), *state(green_lane=1)).copy()
+    second = compositor.compose(frames(0), *state(green_lane=1))
+    np.testing.assert_array_equal(first, second)
+    assert (second[title] == 255).all(axis=2).any()
+    assert (second[red_label] > 0).any()
+
+
+def test_missing_frames_leave_a_blank_cell_inside_the_border() -> None:
+    compositor = JunctionCompositor(LANE_IDS, LANE_NAMES, rgb_output=False)
+    compositor.compose(frames(200), *state(green_lane=1))
+    lane_frames = frames(200)
+    del lane_frames[4]
+    canvas = compositor.compose(lane_frames, *state(green_lane=1))
+    cell = canvas[360:, 640:]
+    assert (cell[200, 300] == 0).all()
+    assert (cell[200, 0] == RED_BORDER).all()
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import time
+
+import numpy as np
+
+from src.density import AdaptiveDetector, BackgroundSubtractionDetector
+from src.detector import empty_detections
+
+
+class TimedDetector:
+    # Stands in for the model: sleeps `delay` seconds per batch.
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.calls = 0
+        self.confidence_threshold = 0.25
+        self.iou_threshold = 0.45
+
+    def detect_batch(self, frames, **options):
+        self.calls += 1
+        time.sleep(self.delay)
+        return {key: empty_detections() for key in frames}
+
+
+class CountingFallback(BackgroundSubtractionDetector):
+    def __init__(self) -> None:
+        super().__init__(warmup_frames=0)
+        self.counted = 0
+        self.learned = 0
+
+    def detect_batch(self, frames, **options):
+        self.counted += 1
+        return super().detect_batch(frames, **options)
+
+    def learn_batch(self, frames) -> None:
+        self.learned += 1
+        super().learn_batch(frames)
+
+
+def frames(step: int) -> dict:
+    frame = np.zeros((72, 128, 3), dtype=np.uint8)
+    frame[20:40, (step * 4) % 100 : (step * 4) % 100 + 20] = 255
+    return {1: frame}
+
+
+def test_background_model_only_learns_while_the_model_counts() -> None:
+    fallback = CountingFallback()
+    detector = AdaptiveDetector(TimedDetector(), fallback=fallback, budget=1.0, patience=2, probe_interval=5)
+    for step in range(20):
+        detector.detect_batch(frames(step))
+    assert detector.active == "yolo"
+    assert fallback.counted == 0
+    assert fallback.learned == 20
+    assert fallback._lanes[1].frames == 20
+
+
+def test_switches_to_background_subtraction_and_back_on_the_next_fast_probe() -> None:
+    primary = TimedDetector(delay=0.02)
+    fallback = CountingFallback()
+    detector = AdaptiveDetector(primary, fallback=fallback, budget=0.01, patience=3, probe_interval=4)
+    for step in range(30):
+        detector.detect_batch(frames(step))
+    assert detector.active == "bgsub"
+    assert detector.switches == 1
+    # Only every probe_interval-th batch reaches the slow model.
+    assert primary.calls < 3 + 30 // 4 + 1
+
+    primary.delay = 0.0
+    for step in range(30, 30 + 4):
+        detector.detect_batch(frames(step))
+    assert detector.active == "yolo"
+    assert detector.switches == 2
+    # The slow spell's average does not count against the model after switching back.
+    for step in range(34, 40):
+        detector.detect_batch(frames(step))
+    assert detector.active == "yolo"
+
+
+def test_counts_with_background_subtraction_while_the_model_loads() -> None:
+    class LoadingDetector(TimedDetector):
+        is_ready = False
+
+    fallback = CountingFallback()
+    primary = LoadingDetector()
+    detector = AdaptiveDetector(primary, fallback=fallback)
+    for step in range(5):
+        detector.detect_batch(frames(step))
+    assert primary.calls == 0
+    assert fallback.counted == 5
+    assert detector.identity == fallback.identity
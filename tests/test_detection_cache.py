@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.detection_cache import DetectionCache, DetectionLog, settings_digest
+from src.detector import DETECTION_DTYPE
+
+
+def make_detections(count: int) -> np.ndarray:
+    detections = np.zeros(count, dtype=DETECTION_DTYPE)
+    detections["x1"] = np.arange(count)
+    detections["x2"] = np.arange(count) + 10
+    detections["confidence"] = 0.5
+    return detections
+
+
+def test_lookup_requires_configure() -> None:
+    with pytest.raises(RuntimeError):
+        DetectionCache().get("source", 0)
+
+
+def test_memory_hits_misses_and_copies() -> None:
+    cache = DetectionCache(capacity=8)
+    cache.configure(settings_digest("model", 0.25))
+    assert cache.get("source", 0) is None
+    cache.put("source", 0, make_detections(3))
+
+    hit = cache.get("source", 0)
+    np.testing.assert_array_equal(hit, make_detections(3))
+    # Callers may modify what they get back without corrupting the cache.
+    hit["x1"] = -1
+    np.testing.assert_array_equal(cache.get("source", 0), make_detections(3))
+    assert cache.stats()["memory_hits"] == 2
+    assert cache.stats()["misses"] == 1
+
+
+def test_capacity_evicts_least_recently_used() -> None:
+    cache = DetectionCache(capacity=2)
+    cache.configure("settings")
+    cache.put("source", 0, make_detections(1))
+    cache.put("source", 1, make_detections(1))
+    cache.get("source", 0)
+    cache.put("source", 2, make_detections(1))
+    assert cache.get("source", 1) is None
+    assert cache.get("source", 0) is not None
+    assert cache.stats()["entries"] == 2
+
+
+def test_new_settings_invalidate_memory_entries() -> None:
+    cache = DetectionCache()
+    cache.configure(settings_digest("model", 0.25))
+    cache.put("source", 0, make_detections(2))
+    cache.configure(settings_digest("model", 0.25))
+    assert cache.get("source", 0) is not None
+
+    cache.configure(settings_digest("model", 0.5))
+    assert cache.get("source", 0) is None
+    assert cache.invalidations == 1
+
+
+def test_disk_entries_survive_a_new_cache(tmp_path: Path) -> None:
+    cache = DetectionCache(disk_dir=tmp_path)
+    cache.configure("settings")
+    cache.put("source", 7, make_detections(4))
+    cache.put("source", 8, make_detections(0))
+    cache.close()
+
+    reopened = DetectionCache(disk_dir=tmp_path)
+    reopened.configure("settings")
+    np.testing.assert_array_equal(reopened.get("source", 7), make_detections(4))
+    assert len(reopened.get("source", 8)) == 0
+    assert reopened.disk_hits == 2
+
+    reopened.configure("other-settings")
+    assert reopened.get("source", 7) is None
+    reopened.close()
+
+
+def test_detection_log_drops_a_truncated_record(tmp_path: Path) -> None:
+    path = tmp_path / "source.detlog"
+    log = DetectionLog(path)
+    log.append(0, make_detections(2))
+    log.append(1, make_detections(3))
+    log.close()
+    # An interrupted run cut the last record short.
+    with path.open("r+b") as handle:
+        handle.truncate(path.stat().st_size - 2)
+
+    log = DetectionLog(path)
+    np.testing.assert_array_equal(log.read(0), make_detections(2))
+    assert log.read(1) is None
+    log.append(1, make_detections(3))
+    log.close()
+    np.testing.assert_array_equal(DetectionLog(path).read(1), make_detections(3))
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import csv
+from pathlib import Path
+
+import numpy as np
+
+from src.history_store import TrafficHistoryStore, import_csv
+from src.log_writer import build_log_row, log_fieldnames
+
+LANE_IDS = [1, 2]
+
+
+def make_row(timestamp: str, count: int) -> dict:
+    signal_state = {
+        "current_green_lane": 1,
+        "countdown": 10,
+        "cycle_elapsed": 5,
+        "waiting_times": {lane_id: 1.5 for lane_id in LANE_IDS},
+        "priority_scores": {lane_id: 0.25 for lane_id in LANE_IDS},
+    }
+    return build_log_row(timestamp, {lane_id: count + lane_id for lane_id in LANE_IDS}, signal_state)
+
+
+def write_csv(path: Path, rows) -> None:
+    with path.open("w", newline="", encoding="utf-8") as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=log_fieldnames(LANE_IDS))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def test_append_and_query_range(tmp_path: Path) -> None:
+    store = TrafficHistoryStore(tmp_path)
+    rows = [make_row(f"2026-02-17T08:{minute:02d}:00", minute) for minute in range(30)]
+    assert store.append(rows, "junction") == 30
+
+    result = store.query("2026-02-17T08:10", "2026-02-17T08:20", "junction", lanes=[2], fields=["count"])
+    assert sorted(result) == ["lane2_count", "timestamp"]
+    assert result["lane2_count"].tolist() == [minute + 2 for minute in range(10, 20)]
+    assert result["timestamp"][0] == np.datetime64("2026-02-17T08:10:00")
+
+
+def test_out_of_order_rows_are_merged_in_time_order(tmp_path: Path) -> None:
+    store = TrafficHistoryStore(tmp_path)
+    store.append([make_row(f"2026-02-17T09:{minute:02d}:00", minute) for minute in range(10, 20)], "junction")
+    # A late batch overlapping the stored range, itself unsorted.
+    store.append([make_row(f"2026-02-17T09:{minute:02d}:00", minute) for minute in (25, 5, 15, 0)], "junction")
+
+    result = store.query("2026-02-17T09:00", "2026-02-17T10:00", "junction", lanes=[1], fields=["count"])
+    timestamps = result["timestamp"].astype(np.int64)
+    assert (np.diff(timestamps) >= 0).all()
+    assert len(timestamps) == 14
+    # Every column was reordered with the timestamps.
+    minutes = (timestamps - timestamps[0]) // 60
+    assert result["lane1_count"].tolist() == (minutes + 1).tolist()
+
+
+def test_reimporting_a_csv_adds_no_rows(tmp_path: Path) -> None:
+    csv_path = tmp_path / "traffic_log.csv"
+    rows = [make_row(f"2026-02-17T10:00:{second:02d}", second) for second in range(40)]
+    write_csv(csv_path, rows + rows[:5])
+    store = TrafficHistoryStore(tmp_path / "history")
+
+    assert import_csv(csv_path, store, "junction") == 40
+    assert import_csv(csv_path, store, "junction") == 0
+    result = store.query("2026-02-17T10:00", "2026-02-17T11:00", "junction")
+    assert len(result["timestamp"]) == 40
+
+
+def test_columns_longer_than_meta_are_truncated(tmp_path: Path) -> None:
+    store = TrafficHistoryStore(tmp_path)
+    store.append([make_row(f"2026-02-17T11:00:{second:02d}", second) for second in range(5)], "junction")
+    # A crash after the column write but before the meta update leaves a stray tail.
+    partition = tmp_path / "junction" / "2026-02-17"
+    with (partition / "lane1_count.bin").open("ab") as handle:
+        np.arange(3, dtype=np.int32).tofile(handle)
+
+    store.append([make_row(f"2026-02-17T11:00:{second:02d}", second) for second in range(5, 8)], "junction")
+    result = store.query("2026-02-17T11:00", "2026-02-17T12:00", "junction", lanes=[1], fields=["count"])
+    assert result["lane1_count"].tolist() == [second + 1 for second in range(8)]
+
+
+def test_rows_are_partitioned_by_day(tmp_path: Path) -> None:
+    store = TrafficHistoryStore(tmp_path)
+    store.append([make_row("2026-02-17T23:59:59", 1), make_row("2026-02-18T00:00:00", 2)], "junction")
+    assert store.partitions("junction") == ["2026-02-17", "2026-02-18"]
+    result = store.query("2026-02-17T23:00", "2026-02-18T01:00", "junction", lanes=[1], fields=["count"])
+    assert result["lane1_count"].tolist() == [2, 3]
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from src.config import JUNCTION_CAPTURE_PROCESSES
+from src.junction_server import engine_config_from_dict, load_junction_configs
+
+
+def test_loaded_junctions_default_to_few_capture_processes(tmp_path: Path) -> None:
+    path = tmp_path / "junctions.json"
+    path.write_text(
+        json.dumps({"junctions": [{"junction_id": "a"}, {"junction_id": "b", "capture_processes": 2}]}),
+        encoding="utf-8",
+    )
+    configs = load_junction_configs(path)
+    assert [config.capture_processes for config in configs] == [JUNCTION_CAPTURE_PROCESSES, 2]
+    assert configs[0].log_file.name == "traffic_log_a.csv"
+
+
+def test_junction_settings_are_validated(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="Unknown junction settings"):
+        engine_config_from_dict({"junction_id": "a", "frame_rate": 30})
+    path = tmp_path / "junctions.json"
+    path.write_text(json.dumps([{"junction_id": "a"}, {"junction_id": "a"}]), encoding="utf-8")
+    with pytest.raises(ValueError, match="unique"):
+        load_junction_configs(path)
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import csv
+from pathlib import Path
+
+import pytest
+
+from src.log_writer import TrafficLogWriter
+
+LANE_IDS = [1, 2]
+
+
+def signal_state() -> dict:
+    return {
+        "current_green_lane": 1,
+        "countdown": 10,
+        "cycle_elapsed": 5,
+        "waiting_times": {lane_id: 0.0 for lane_id in LANE_IDS},
+        "priority_scores": {lane_id: 0.5 for lane_id in LANE_IDS},
+    }
+
+
+def read_rows(path: Path) -> list:
+    with path.open("r", newline="", encoding="utf-8") as csv_file:
+        return list(csv.DictReader(csv_file))
+
+
+def write(writer: TrafficLogWriter, timestamp: str, count: int = 1) -> None:
+    writer.write(timestamp=timestamp, lane_counts={lane_id: count for lane_id in LANE_IDS}, signal_state=signal_state())
+
+
+def test_close_flushes_every_queued_row(tmp_path: Path) -> None:
+    log_file = tmp_path / "traffic_log.csv"
+    # Large batch and long interval: nothing is written until close() drains the queue.
+    writer = TrafficLogWriter(log_file, batch_size=10_000, flush_interval=60.0, max_bytes=0, rotate_daily=False)
+    writer.start()
+    for second in range(500):
+        write(writer, f"2026-02-17T08:{second // 60:02d}:{second % 60:02d}", second)
+    writer.close()
+
+    rows = read_rows(log_file)
+    assert len(rows) == 500
+    assert writer.rows_written == 500
+    assert rows[-1]["lane1_count"] == "499"
+
+
+def test_daily_rotation_archives_the_previous_day(tmp_path: Path) -> None:
+    log_file = tmp_path / "traffic_log.csv"
+    writer = TrafficLogWriter(log_file, batch_size=1, flush_interval=0.01, max_bytes=0, rotate_daily=True)
+    writer.start()
+    write(writer, "2026-02-17T23:59:58")
+    write(writer, "2026-02-17T23:59:59")
+    write(writer, "2026-02-18T00:00:00")
+    writer.close()
+
+    archived = tmp_path / "traffic_log.2026-02-17.csv"
+    assert [row["timestamp"] for row in read_rows(archived)] == ["2026-02-17T23:59:58", "2026-02-17T23:59:59"]
+    assert [row["timestamp"] for row in read_rows(log_file)] == ["2026-02-18T00:00:00"]
+
+
+def test_size_rotation_keeps_every_row(tmp_path: Path) -> None:
+    log_file = tmp_path / "traffic_log.csv"
+    writer = TrafficLogWriter(log_file, batch_size=1, flush_interval=0.01, max_bytes=400, rotate_daily=False)
+    writer.start()
+    for second in range(40):
+        write(writer, f"2026-02-17T08:00:{second:02d}", second)
+    writer.close()
+
+    files = sorted(tmp_path.glob("traffic_log*.csv"))
+    assert len(files) > 2
+    assert all(read_rows(path)[0].keys() == read_rows(log_file)[0].keys() for path in files)
+    assert sum(len(read_rows(path)) for path in files) == 40
+
+
+def test_new_columns_start_a_new_file(tmp_path: Path) -> None:
+    log_file = tmp_path / "traffic_log.csv"
+    writer = TrafficLogWriter(log_file, batch_size=1, flush_interval=0.01, max_bytes=0, rotate_daily=False)
+    writer.start()
+    write(writer, "2026-02-17T08:00:00")
+    writer.write(
+        timestamp="2026-02-17T08:00:01",
+        lane_counts={1: 1, 2: 1, 3: 1},
+        signal_state={**signal_state(), "waiting_times": {1: 0, 2: 0, 3: 0}, "priority_scores": {1: 0, 2: 0, 3: 0}},
+    )
+    writer.close()
+
+    assert "lane3_count" in read_rows(log_file)[0]
+    assert len(read_rows(tmp_path / "traffic_log.2026-02-17.csv")) == 1
+
+
+def test_history_store_failure_does_not_stop_csv_logging(tmp_path: Path) -> None:
+    class FailingStore:
+        def append(self, rows, junction):
+            raise OSError("disk full")
+
+    log_file = tmp_path / "traffic_log.csv"
+    writer = TrafficLogWriter(log_file, batch_size=1, flush_interval=0.01, history_store=FailingStore())
+    writer.start()
+    for second in range(5):
+        write(writer, f"2026-02-17T08:00:{second:02d}")
+    writer.close()
+
+    assert len(read_rows(log_file)) == 5
+    assert isinstance(writer.history_error, OSError)
+    assert writer.error is None
+
+
+def test_write_raises_once_the_writer_thread_has_failed(tmp_path: Path) -> None:
+    writer = TrafficLogWriter(tmp_path / "traffic_log.csv", batch_size=1, flush_interval=0.01)
+
+    def fail(rows):
+        raise OSError("read-only file system")
+
+    writer._write_rows = fail
+    writer.start()
+    write(writer, "2026-02-17T08:00:00")
+    writer.join(timeout=5.0)
+    assert not writer.is_alive()
+    with pytest.raises(RuntimeError, match="read-only"):
+        write(writer, "2026-02-17T08:00:01")
+
+
+def test_rows_from_an_earlier_run_do_not_trigger_rotation(tmp_path: Path) -> None:
+    log_file = tmp_path / "traffic_log.csv"
+    earlier = TrafficLogWriter(log_file, batch_size=1, flush_interval=0.01, max_bytes=0, rotate_daily=True)
+    earlier.start()
+    write(earlier, "2026-02-16T12:00:00")
+    earlier.close()
+
+    writer = TrafficLogWriter(log_file, batch_size=1, flush_interval=0.01, max_bytes=0, rotate_daily=True)
+    writer.start()
+    write(writer, "2026-02-17T08:00:00")
+    write(writer, "2026-02-17T08:00:01")
+    writer.close()
+
+    assert [path.name for path in tmp_path.glob("traffic_log*.csv")] == ["traffic_log.csv"]
+    assert len(read_rows(log_file)) == 3
+
+
+def test_a_file_with_other_columns_is_archived_under_its_own_day(tmp_path: Path) -> None:
+    log_file = tmp_path / "traffic_log.csv"
+    log_file.write_text("timestamp,lane1_count\n2026-02-10T09:00:00,4\n", encoding="utf-8")
+
+    writer = TrafficLogWriter(log_file, batch_size=1, flush_interval=0.01, max_bytes=0, rotate_daily=True)
+    writer.start()
+    write(writer, "2026-02-17T08:00:00")
+    writer.close()
+
+    assert read_rows(tmp_path / "traffic_log.2026-02-10.csv") == [{"timestamp": "2026-02-10T09:00:00", "lane1_count": "4"}]
+    assert len(read_rows(log_file)) == 1
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from src.signal_controller import SignalTiming
+from src.signal_simulator import BatchSignalSimulator, poisson_arrival_traces, simulate_with_controller
+
+LANE_IDS = [1, 2, 3, 4]
+TIMINGS = {
+    "default": SignalTiming(),
+    "tuned": SignalTiming(
+        vehicle_weight=0.5,
+        waiting_weight=0.5,
+        min_green_time=10,
+        max_green_time=45,
+        total_cycle_time=90,
+        density_thresholds=(5, 15, 30),
+        density_green_times=(10, 20, 30, 45),
+    ),
+}
+
+
+@pytest.mark.parametrize("timing_name", sorted(TIMINGS))
+@pytest.mark.parametrize("seed", [3, 7, 11])
+def test_batch_simulator_matches_scalar_controller(timing_name: str, seed: int) -> None:
+    timing = TIMINGS[timing_name]
+    generator = np.random.default_rng(seed)
+    rates = np.array([0.08, 0.12, 0.05, 0.10]) * generator.uniform(0.5, 1.5, size=(6, len(LANE_IDS)))
+    arrivals = poisson_arrival_traces(6, 1800, rates, seed=seed)
+
+    simulator = BatchSignalSimulator(lane_ids=LANE_IDS, timing=timing)
+    result = simulator.run(arrivals, record_trace=True)
+
+    for scenario in range(len(arrivals)):
+        reference = simulate_with_controller(
+            arrivals[scenario], lane_ids=LANE_IDS, delta_seconds=simulator.delta_seconds, timing=timing
+        )
+        np.testing.assert_array_equal(result.green_trace[scenario], reference["green_trace"])
+        np.testing.assert_array_equal(result.countdown_trace[scenario], reference["countdown_trace"])
+        np.testing.assert_array_equal(result.final_queue[scenario], reference["final_queue"])
+
+
+def test_batch_simulator_switches_under_load() -> None:
+    arrivals = poisson_arrival_traces(2, 1800, [0.1, 0.1, 0.1, 0.1], seed=1)
+    result = BatchSignalSimulator(lane_ids=LANE_IDS).run(arrivals, record_trace=True)
+    assert (result.switches > 0).all()
+    assert set(np.unique(result.green_trace)) == set(range(len(LANE_IDS)))
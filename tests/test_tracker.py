@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import numpy as np
+
+from src.detector import DETECTION_DTYPE, empty_detections
+from src.tracker import VehicleTracker, greedy_match, iou_matrix
+
+
+def make_detections(boxes) -> np.ndarray:
+    detections = np.empty(len(boxes), dtype=DETECTION_DTYPE)
+    for index, (x1, y1, x2, y2) in enumerate(boxes):
+        detections[index] = (x1, y1, x2, y2, 0.9, 2)
+    return detections
+
+
+def test_iou_matrix_and_greedy_match() -> None:
+    a = np.array([[0, 0, 10, 10], [20, 20, 30, 30]], dtype=float)
+    b = np.array([[21, 21, 31, 31], [0, 0, 10, 10], [100, 100, 110, 110]], dtype=float)
+    ious = iou_matrix(a, b)
+    assert ious[0, 1] == 1.0
+    assert ious[0, 2] == 0.0
+    assert greedy_match(ious, 0.3).tolist() == [[0, 1], [1, 0]]
+
+
+def test_track_is_confirmed_after_min_hits_and_keeps_its_id() -> None:
+    tracker = VehicleTracker(min_hits=2, max_misses=2)
+    tracker.update(make_detections([(10, 10, 50, 40)]), 0.1)
+    assert len(tracker) == 0
+    assert tracker.arrivals == 0
+
+    ids = None
+    for step in range(1, 6):
+        # Moves 2 px per frame: well inside the IoU gate.
+        tracker.update(make_detections([(10 + 2 * step, 10, 50 + 2 * step, 40)]), 0.1)
+        if ids is None:
+            ids = tracker.track_ids().tolist()
+        assert tracker.track_ids().tolist() == ids
+    assert len(tracker) == 1
+    assert tracker.arrivals == 1
+    assert len(tracker.detections()) == 1
+
+
+def test_track_survives_short_gaps_and_departs_after_max_misses() -> None:
+    tracker = VehicleTracker(min_hits=1, max_misses=2)
+    box = make_detections([(100, 100, 140, 130)])
+    tracker.update(box, 0.1)
+    tracker.update(empty_detections(), 0.1)
+    tracker.update(empty_detections(), 0.1)
+    assert len(tracker) == 1
+    tracker.update(box, 0.1)
+    assert tracker.arrivals == 1
+
+    for _ in range(3):
+        tracker.update(empty_detections(), 0.1)
+    assert len(tracker) == 0
+    assert tracker.departures == 1
+
+
+def test_stationary_and_moving_vehicles() -> None:
+    tracker = VehicleTracker(min_hits=1, max_misses=1, stationary_speed=8.0)
+    for step in range(10):
+        parked = (10, 10, 50, 40)
+        moving = (200 + 4 * step, 10, 240 + 4 * step, 40)
+        tracker.update(make_detections([parked, moving]), 0.1)
+    assert len(tracker) == 2
+    assert tracker.stationary_count() == 1
+
+
+def test_separate_vehicles_get_separate_tracks() -> None:
+    tracker = VehicleTracker(min_hits=1)
+    tracker.update(make_detections([(0, 0, 20, 20), (100, 0, 120, 20), (200, 0, 220, 20)]), 0.1)
+    assert len(set(tracker.track_ids().tolist())) == 3
+    tracker.reset()
+    assert len(tracker) == 0